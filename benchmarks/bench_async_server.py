@@ -0,0 +1,129 @@
+"""
+Load test the asyncio webhook server with concurrent tool calls
+
+Starts the async serving mode (uvicorn, ``pip install -e ".[async]"``) on
+a free local port and drives /callbacks
+from a stand-in client with many keep-alive connections. A few connections
+send tool calls that block for a while in the thread pool, to show that
+they do not hold up the fast calls behind them (no head-of-line blocking).
+
+Usage:
+    python benchmarks/bench_async_server.py [connections] [requests_each]
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+from convolingo.api.asgi import create_app, create_server
+from convolingo.api.server import WebhookServer
+from convolingo.tools.storage import JsonVocabularyStore
+from convolingo.tools.vocabulary import VocabularyTool
+
+SLOW_CALL_SECONDS = 0.2
+SLOW_CONNECTIONS = 4
+
+
+def build_server(tmp: str) -> WebhookServer:
+    """Create a webhook server whose 'slow' tool calls block"""
+    server = WebhookServer()
+    tool = VocabularyTool(
+        store=JsonVocabularyStore(Path(tmp) / "vocabulary.json")
+    )
+    handle = tool.handle_tool_call
+
+    def handle_tool_call(text, *args, **kwargs):
+        if "slow" in str(text):
+            time.sleep(SLOW_CALL_SECONDS)
+        return handle(text, *args, **kwargs)
+
+    tool.handle_tool_call = handle_tool_call
+    server.vocabulary_tool = tool
+    return server
+
+
+def request_bytes(tool_id: str, slow: bool) -> bytes:
+    """Encode one /callbacks tool call request"""
+    body = json.dumps({
+        "type": "tool-call",
+        "toolId": tool_id,
+        "input": {"action": "list", "language": "German",
+                  "word": "slow" if slow else "fast"},
+    }).encode("utf-8")
+    return (b"POST /callbacks HTTP/1.1\r\nhost: localhost\r\n"
+            b"content-type: application/json\r\n"
+            + f"content-length: {len(body)}\r\n\r\n".encode("ascii") + body)
+
+
+async def client(port: int, payload: bytes, count: int, latencies: list):
+    """Send count requests over one keep-alive connection"""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    for _ in range(count):
+        began = time.perf_counter()
+        writer.write(payload)
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = int(head.lower().split(b"content-length: ")[1]
+                     .split(b"\r\n")[0])
+        await reader.readexactly(length)
+        latencies.append(time.perf_counter() - began)
+    writer.close()
+
+
+async def load(port: int, tool_id: str, connections: int, each: int):
+    """Run fast and slow clients concurrently and report results"""
+    fast, slow = [], []
+    fast_payload = request_bytes(tool_id, slow=False)
+    slow_payload = request_bytes(tool_id, slow=True)
+    began = time.perf_counter()
+    await asyncio.gather(
+        *(client(port, fast_payload, each, fast)
+          for _ in range(connections)),
+        *(client(port, slow_payload, 3, slow)
+          for _ in range(SLOW_CONNECTIONS)),
+    )
+    elapsed = time.perf_counter() - began
+
+    fast.sort()
+    print(f"fast calls:  {len(fast)} in {elapsed:.2f}s "
+          f"= {len(fast) / elapsed:.0f} req/s")
+    print(f"fast p50/p99: {statistics.median(fast) * 1e3:.2f} / "
+          f"{fast[int(len(fast) * 0.99)] * 1e3:.2f} ms")
+    print(f"slow calls:  {len(slow)}, each blocking "
+          f"{SLOW_CALL_SECONDS * 1e3:.0f} ms in the thread pool")
+
+
+def main():
+    """Run the load test"""
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    each = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = build_server(tmp)
+        http_server = create_server(create_app(server))
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM,
+                             socket.IPPROTO_TCP)
+        sock.bind(("127.0.0.1", 0))
+        thread = threading.Thread(
+            target=http_server.run, kwargs={"sockets": [sock]}, daemon=True
+        )
+        thread.start()
+        while not http_server.started:
+            time.sleep(0.01)
+        asyncio.run(load(sock.getsockname()[1],
+                         server.vocabulary_tool.tool_id, connections, each))
+        http_server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
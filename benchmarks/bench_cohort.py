@@ -0,0 +1,113 @@
+"""
+Run a large cohort of sessions against the fake transport
+
+Runs SessionManager over many sessions whose calls go to the in-process
+fake transport, which takes a fixed time to start a call. Reports the
+wall-clock time, connect latency percentiles and the peak number of
+active sessions next to the time the same sessions take one after
+another.
+
+The script also checks how the manager behaves. No more than the allowed
+number of sessions are active at once. Every session ends, with its words
+in the shared vocabulary store. Stopping the cohort halfway ends the
+running sessions and cancels the waiting ones. It exits with an assertion
+error if any of these checks fails.
+
+Usage:
+    python benchmarks/bench_cohort.py [sessions] [concurrency]
+"""
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+from convolingo.api.client import VapiClient
+from convolingo.api.transport import FakeTransport
+from convolingo.cli.cohort import (
+    SessionManager, SessionSpec, ENDED, CANCELLED
+)
+from convolingo.utils.config import config
+
+# Time the fake transport takes to start a call, and how long each session lasts
+START_SECONDS = 0.02
+DURATION_SECONDS = 0.1
+
+
+def fake_client() -> VapiClient:
+    """Create a session client using the fake transport"""
+    return VapiClient(transport=FakeTransport(start_latency=START_SECONDS))
+
+
+def specs(sessions: int, duration):
+    """Settings of a cohort of students of the same lesson"""
+    return [
+        SessionSpec(
+            f"student-{i}", user_id=f"student-{i}", duration=duration,
+            messages=["Hallo!"],
+            words=[{"word": f"Wort{i}", "translation": f"word {i}"}]
+        )
+        for i in range(sessions)
+    ]
+
+
+def main() -> None:
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    logging.disable(logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.history_dir = Path(tmp)
+        # Imported after pointing the store at the temporary directory
+        from convolingo.tools.vocabulary import VocabularyTool
+        vocabulary = VocabularyTool()
+
+        manager = SessionManager(
+            specs(sessions, DURATION_SECONDS), concurrency=concurrency,
+            client_factory=fake_client, vocabulary_tool=vocabulary
+        )
+        manager.run()
+        summary = manager.summary()
+        sequential = sessions * (START_SECONDS + DURATION_SECONDS)
+        print(f"{sessions} sessions, {concurrency} at a time: "
+              f"{summary['elapsed_seconds']:.2f} s "
+              f"(one after another: {sequential:.2f} s)")
+        print(f"connect p50 {summary['connect_p50_ms']} ms, "
+              f"p95 {summary['connect_p95_ms']} ms, "
+              f"peak active {summary['peak_active']}")
+
+        assert summary["states"] == {ENDED: sessions}, summary["states"]
+        assert summary["peak_active"] <= concurrency, summary
+        assert all(session.messages_sent == 1 for session in manager.sessions)
+        for i in range(sessions):
+            found = vocabulary.search_word("German", f"Wort{i}",
+                                           user_id=f"student-{i}")
+            assert found["success"] and found["results"], i
+
+        # Sessions without a duration run until the cohort is stopped
+        stopped = SessionManager(
+            specs(sessions, None), concurrency=concurrency,
+            client_factory=fake_client, vocabulary_tool=vocabulary
+        )
+        timer = threading.Timer(0.5, stopped.stop, args=("benchmark",))
+        timer.start()
+        began = time.perf_counter()
+        stopped.run()
+        elapsed = time.perf_counter() - began
+        states = stopped.summary()["states"]
+        print(f"stopped after {elapsed:.2f} s: {states}")
+        assert elapsed < 2, elapsed
+        assert set(states) == {ENDED, CANCELLED}, states
+        assert states[ENDED] >= concurrency, states
+
+        vocabulary.close()
+        print("checks passed: bounded concurrency, shared vocabulary store, "
+              "stop ends running sessions and cancels waiting ones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Measure the per-connect CPU and allocation cost of VapiClient.connect
+
+Connects and disconnects a VapiClient to an in-process stand-in for the
+SDK client with the same lesson over and over, as a classroom of students
+reconnecting does, and reports CPU time and peak traced allocation per
+connect for:
+
+- the former connect, which formatted the prompt and its log messages,
+  built the nested assistant dict and created a new SDK client every time
+- a cache miss (a cache that keeps nothing)
+- a cache hit, with and without a user ID
+
+Usage:
+    python benchmarks/bench_connect.py [connects]
+"""
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+from convolingo.api.assistants import AssistantConfigCache
+from convolingo.api.client import VapiClient
+from convolingo.api.transport import SdkTransport
+from convolingo.utils.config import (
+    DEFAULT_TARGET_LANGUAGE, DEFAULT_ORIGIN_LANGUAGE, DEFAULT_CHAPTER
+)
+
+
+class StandInVapi:
+    """Stand-in for the SDK client"""
+
+    def __init__(self, api_key=None):
+        self.api_key = api_key
+
+    def start(self, assistant=None, **kwargs):
+        self.assistant = assistant
+
+    def stop(self):
+        pass
+
+
+logger = logging.getLogger("convolingo.api.client")
+
+
+def former_connect(user_id):
+    """What connect did on every call before the cache"""
+    sdk = StandInVapi(api_key="benchmark")
+    logger.info(
+        f"Connecting with: target={DEFAULT_TARGET_LANGUAGE}, "
+        f"native={DEFAULT_ORIGIN_LANGUAGE}, chapter='{DEFAULT_CHAPTER[:30]}...'"
+    )
+    system_prompt = (
+        "You are a language learning teaching assistant named Emma.\n"
+        "You will begin a lesson plan starting in {native_language} "
+        "and begin role playing speaking in {target_language}.\n\n"
+        "native_language = \"{native_language}\"\n"
+        "target_language = \"{target_language}\"\n\n"
+        "{chapter}"
+    ).format(
+        native_language=DEFAULT_ORIGIN_LANGUAGE,
+        target_language=DEFAULT_TARGET_LANGUAGE,
+        chapter=DEFAULT_CHAPTER
+    )
+    assistant = {
+        "model": {
+            "model": "gpt-3.5-turbo", "provider": "openai",
+            "temperature": 0.7,
+            "messages": [{"role": "system", "content": system_prompt}]
+        },
+        "voice": {
+            "model": "eleven_multilingual_v2",
+            "voiceId": "S9EGwlCtMF7VXtENq79v", "provider": "11labs",
+            "stability": 0.5, "similarityBoost": 0.75
+        },
+        "transcriber": {
+            "model": "nova-3", "language": "en-US", "provider": "deepgram"
+        }
+    }
+    if user_id:
+        assistant["userId"] = user_id
+    sdk.start(assistant=assistant)
+    logger.info(f"Created custom assistant with chapter: {DEFAULT_CHAPTER}")
+    logger.info(
+        f"Connected to VAPI assistant for {DEFAULT_TARGET_LANGUAGE} learning"
+    )
+
+
+def client_connect(client: VapiClient, user_id):
+    """One connect and disconnect through VapiClient"""
+    client.connect(user_id=user_id)
+    client.is_connected = False
+
+
+def measure(label: str, connects: int, connect) -> None:
+    """Print CPU time and peak allocation per connect"""
+    for _ in range(100):
+        connect()
+
+    started = time.process_time()
+    for _ in range(connects):
+        connect()
+    cpu_us = (time.process_time() - started) / connects * 1e6
+
+    tracemalloc.start()
+    peaks = []
+    for _ in range(min(connects, 2000)):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        connect()
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    print(f"{label:>24}: {cpu_us:7.2f} us CPU  "
+          f"{sum(peaks) / len(peaks):7.0f} B peak allocation")
+
+
+def main() -> None:
+    connects = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    logging.disable(logging.CRITICAL)
+
+    def client_with(cache: AssistantConfigCache) -> VapiClient:
+        return VapiClient(config_cache=cache,
+                          transport=SdkTransport(StandInVapi()))
+
+    measure("former connect", connects, lambda: former_connect(None))
+    measure("former, with user", connects, lambda: former_connect("u1"))
+
+    missing = client_with(AssistantConfigCache(capacity=0))
+    measure("cache miss", connects, lambda: client_connect(missing, None))
+
+    cached = client_with(AssistantConfigCache())
+    measure("cache hit", connects, lambda: client_connect(cached, None))
+    measure("cache hit, with user", connects,
+            lambda: client_connect(cached, "u1"))
+
+
+if __name__ == "__main__":
+    main()
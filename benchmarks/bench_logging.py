@@ -0,0 +1,92 @@
+"""
+Measure the cost of logging on the webhook request path
+
+Posts tool calls to /callbacks through Flask's test client with the three
+logging setups: synchronous handlers, the queued mode (records written by
+a background listener thread) and the queued mode with the per-logger rate
+limits the CLI uses. Log output goes to a stand-in for a slow console that
+takes a moment per write, like a terminal or a pipe that is read slowly.
+Reports request latency percentiles and how many lines were written.
+
+Usage:
+    python benchmarks/bench_logging.py [requests] [write_delay_ms]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+from convolingo.api.server import WebhookServer
+from convolingo.tools.storage import JsonVocabularyStore
+from convolingo.tools.vocabulary import VocabularyTool
+from convolingo.utils.config import LOG_RATE_LIMITS
+from convolingo.utils.logging_setup import configure_logging, stop_logging
+
+
+class SlowStream:
+    """Stand-in for a console that takes a while to accept each write"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.lines = 0
+
+    def write(self, text: str) -> None:
+        time.sleep(self.delay)
+        self.lines += text.count("\n")
+
+    def flush(self) -> None:
+        pass
+
+
+def run(label: str, requests: int, delay: float, tmp: str, **options) -> None:
+    """Send the tool calls with one logging setup and print the results"""
+    stream = SlowStream(delay)
+    stderr, sys.stderr = sys.stderr, stream
+    try:
+        configure_logging(**options)
+    finally:
+        sys.stderr = stderr
+
+    server = WebhookServer(VocabularyTool(
+        store=JsonVocabularyStore(Path(tmp) / f"{label}.json")
+    ))
+    client = server.app.test_client()
+    body = {
+        "type": "tool-call",
+        "toolId": server.vocabulary_tool.tool_id,
+        "input": {"action": "list", "language": "German"},
+    }
+
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        began = time.perf_counter()
+        client.post("/callbacks", json=body)
+        latencies.append(time.perf_counter() - began)
+    elapsed = time.perf_counter() - started
+    stop_logging()
+    server.vocabulary_tool.close()
+
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f"{label:>20}: p50 {quantiles[49] * 1000:6.2f} ms  "
+          f"p99 {quantiles[98] * 1000:6.2f} ms  "
+          f"{requests / elapsed:7.0f} req/s  {stream.lines} log lines")
+
+
+def main() -> None:
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    delay = (float(sys.argv[2]) if len(sys.argv) > 2 else 0.2) / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run("synchronous", requests, delay, tmp)
+        run("queued", requests, delay, tmp, queued=True)
+        run("queued, rate limited", requests, delay, tmp,
+            queued=True, rate_limits=LOG_RATE_LIMITS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Measure the overhead of the webhook server metrics
+
+Times the metrics recorded for one tool call request (in-flight gauge,
+route histogram, action histogram) on their own, from one and from several
+threads at once, and the cost of rendering /metrics. Then compares the
+Flask test client latency of /api/vocabulary with recording switched on
+and off.
+
+Usage:
+    python benchmarks/bench_metrics.py [iterations]
+"""
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+from convolingo.api.server import WebhookServer
+from convolingo.tools.storage import JsonVocabularyStore
+from convolingo.tools.vocabulary import VocabularyTool
+from convolingo.utils.metrics import (
+    Metrics, metrics, REQUEST_SECONDS, REQUESTS_IN_FLIGHT, TOOL_CALL_SECONDS
+)
+
+
+def record_request() -> None:
+    """Record what one tool call request records"""
+    metrics.inc(REQUESTS_IN_FLIGHT)
+    metrics.observe(TOOL_CALL_SECONDS, 0.0002, ("list",))
+    metrics.observe(REQUEST_SECONDS, 0.0004, ("/api/vocabulary",))
+    metrics.inc(REQUESTS_IN_FLIGHT, amount=-1)
+
+
+def recording_cost(iterations: int, threads: int) -> float:
+    """Time record_request from several threads, in microseconds per call"""
+    def work():
+        for _ in range(iterations):
+            record_request()
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return (time.perf_counter() - started) / (iterations * threads) * 1e6
+
+
+def request_latency(client, requests: int) -> float:
+    """Median latency of /api/vocabulary list calls in milliseconds"""
+    latencies = []
+    for _ in range(requests):
+        began = time.perf_counter()
+        client.post("/api/vocabulary",
+                    json={"arguments": {"action": "list"}})
+        latencies.append(time.perf_counter() - began)
+    return statistics.median(latencies) * 1000
+
+
+class DisabledMetrics(Metrics):
+    """Metrics that record nothing"""
+
+    def inc(self, *args, **kwargs):
+        pass
+
+    def observe(self, *args, **kwargs):
+        pass
+
+
+def main() -> None:
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    for threads in (1, 8):
+        print(f"record one request, {threads} thread(s): "
+              f"{recording_cost(iterations // threads, threads):6.2f} us")
+
+    started = time.perf_counter()
+    text = metrics.render()
+    print(f"render /metrics ({len(text.splitlines())} lines): "
+          f"{(time.perf_counter() - started) * 1000:6.2f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = WebhookServer(VocabularyTool(
+            store=JsonVocabularyStore(Path(tmp) / "vocabulary.json")
+        ))
+        client = server.app.test_client()
+        request_latency(client, 200)
+
+        # Alternate the two setups so drift affects both alike
+        enabled, off = [], []
+        disabled = DisabledMetrics()
+        for _ in range(5):
+            enabled.append(request_latency(client, 500))
+            # The modules share this instance, so swap its methods
+            metrics.inc, metrics.observe = disabled.inc, disabled.observe
+            try:
+                off.append(request_latency(client, 500))
+            finally:
+                del metrics.inc, metrics.observe
+        server.vocabulary_tool.close()
+
+    print(f"/api/vocabulary median: {min(enabled):.3f} ms with metrics, "
+          f"{min(off):.3f} ms without")
+
+
+if __name__ == "__main__":
+    main()
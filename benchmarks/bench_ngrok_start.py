@@ -0,0 +1,124 @@
+"""
+Measure how quickly NgrokTunnel.start notices the tunnel is up
+
+Puts a fake ``ngrok`` executable first on PATH. After a random startup delay
+it logs the "started tunnel" JSON line and serves the tunnel on a local
+stand-in of the ngrok agent API (port 4040). Each start is timed once with
+the log-driven readiness and once with only the polling fallback, and the
+time past the fake's actual readiness is reported. Finally, starts are
+timed while the fake agent is already running a tunnel to the port, which
+NgrokTunnel adopts without killing or spawning anything.
+
+Usage:
+    python benchmarks/bench_ngrok_start.py [starts]
+"""
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from convolingo.utils.ngrok_helper import NgrokTunnel
+
+FAKE_NGROK = r'''#!{python}
+import json, random, sys, threading, time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+URL = "https://fake.ngrok-free.app"
+READY_FILE = {ready!r}
+time.sleep(random.uniform(0.2, 0.8))
+
+class Api(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+    def do_GET(self):
+        body = json.dumps({{"tunnels": [{{
+            "proto": "https", "public_url": URL,
+            "config": {{"addr": "http://localhost:5000"}}
+        }}]}})
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+api = HTTPServer(("127.0.0.1", 4040), Api)
+threading.Thread(target=api.serve_forever, daemon=True).start()
+with open(READY_FILE, "w") as f:
+    f.write(repr(time.time()))
+print(json.dumps({{"lvl": "info", "msg": "started tunnel", "url": URL}}), flush=True)
+time.sleep(60)
+'''
+
+
+class PollingTunnel(NgrokTunnel):
+    """NgrokTunnel that only drains the log and relies on polling"""
+
+    def _read_log(self, stream) -> None:
+        for _ in iter(stream.readline, b""):
+            pass
+
+
+def ready_file(tmp: Path) -> Path:
+    """Path the fake ngrok writes its readiness time to"""
+    return tmp / "ngrok.ready"
+
+
+def time_start(tunnel: NgrokTunnel, tmp: Path) -> float:
+    """Start a tunnel and return the wait past the fake's readiness"""
+    marker = ready_file(tmp)
+    if marker.exists():
+        marker.unlink()
+    assert tunnel.start(5000, adopt=False)
+    finished = time.time()
+    ready_at = float(marker.read_text())
+    tunnel.stop()
+    time.sleep(0.2)  # let the fake release port 4040
+    return finished - ready_at
+
+
+def main() -> None:
+    starts = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    logging.basicConfig(level=logging.ERROR)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        fake = tmp / "ngrok"
+        fake.write_text(FAKE_NGROK.format(
+            python=sys.executable, ready=str(ready_file(tmp))
+        ))
+        fake.chmod(0o755)
+        os.environ["PATH"] = f"{tmp}{os.pathsep}{os.environ['PATH']}"
+
+        for label, cls in (("log events", NgrokTunnel),
+                           ("polling only", PollingTunnel)):
+            tunnel = cls()
+            tunnel._kill_existing_ngrok = lambda: None
+            waits = [time_start(tunnel, tmp) for _ in range(starts)]
+            print(f"{label:>13}: extra wait mean "
+                  f"{statistics.mean(waits) * 1000:6.1f} ms  "
+                  f"max {max(waits) * 1000:6.1f} ms")
+
+        # Restarts while an agent already runs a tunnel to the port
+        owner = NgrokTunnel()
+        owner._kill_existing_ngrok = lambda: None
+        assert owner.start(5000, adopt=False)
+        try:
+            durations = []
+            for _ in range(starts):
+                tunnel = NgrokTunnel()
+                started = time.perf_counter()
+                assert tunnel.start(5000) == owner.public_url
+                durations.append(time.perf_counter() - started)
+                assert tunnel.adopted
+                tunnel.stop()
+        finally:
+            owner.stop()
+        print(f"{'adopt':>13}: start took mean "
+              f"{statistics.mean(durations) * 1000:6.1f} ms  "
+              f"max {max(durations) * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
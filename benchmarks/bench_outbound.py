@@ -0,0 +1,152 @@
+"""
+Measure how long typing waits on sending, with and without OutboundQueue
+
+Sends lines through a stand-in send function that takes SEND_SECONDS per
+call, like an SDK call in flight, and reports:
+
+- typing: how long the input thread is held up per line when it calls
+  send itself, and when it hands the line to an OutboundQueue
+- pasting: a burst of lines, sent one call per line or coalesced
+- backpressure: a small queue with a fast writer and a slow sender
+- retries: a sender failing part of its calls
+
+The script also checks the queue. Every line arrives once and in order.
+The depth never goes past the capacity. Failed sends are retried until
+they succeed. It exits with an assertion error if any of these checks
+fails.
+
+Usage:
+    python benchmarks/bench_outbound.py [lines]
+"""
+import logging
+import random
+import statistics
+import sys
+import time
+
+from convolingo.api.outbound import OutboundQueue
+
+# Time the stand-in takes to send one message
+SEND_SECONDS = 0.02
+
+
+class StandInSender:
+    """Stand-in send function recording what it sent"""
+
+    def __init__(self, seconds: float = SEND_SECONDS,
+                 failure_rate: float = 0.0):
+        self.seconds = seconds
+        self.failure_rate = failure_rate
+        self.random = random.Random(0)
+        self.sent = []
+        self.calls = 0
+
+    def __call__(self, text: str) -> bool:
+        self.calls += 1
+        time.sleep(self.seconds)
+        if self.random.random() < self.failure_rate:
+            return False
+        self.sent.append(text)
+        return True
+
+    def lines(self):
+        return [line for text in self.sent for line in text.split("\n")]
+
+
+def typed_lines(count: int):
+    """Lines a learner types"""
+    return [f"line {i}" for i in range(count)]
+
+
+def typing(lines) -> None:
+    """Time how long each typed line holds up the input thread"""
+    sender = StandInSender()
+    held = []
+    for line in lines[:50]:
+        began = time.perf_counter()
+        sender(line)
+        held.append(time.perf_counter() - began)
+    print(f"{'typing, direct send':>24}: held up "
+          f"{statistics.median(held) * 1000:8.3f} ms per line")
+
+    sender = StandInSender()
+    queue = OutboundQueue(sender, coalesce_window=0.0)
+    held = []
+    for line in lines[:50]:
+        began = time.perf_counter()
+        queue.put(line)
+        held.append(time.perf_counter() - began)
+        time.sleep(0.05)
+    queue.close()
+    print(f"{'typing, queued':>24}: held up "
+          f"{statistics.median(held) * 1000:8.3f} ms per line  "
+          f"send p50 {queue.stats()['send_p50_ms']} ms")
+    assert sender.lines() == lines[:50]
+
+
+def pasting(lines) -> None:
+    """Send a burst of lines with and without coalescing"""
+    for label, max_lines in (("pasting, line by line", 1),
+                             ("pasting, coalesced", 10)):
+        sender = StandInSender()
+        queue = OutboundQueue(sender, max_lines=max_lines,
+                              capacity=len(lines))
+        began = time.perf_counter()
+        for line in lines:
+            queue.put(line)
+        queue.wait_idle()
+        elapsed = time.perf_counter() - began
+        queue.close()
+        stats = queue.stats()
+        print(f"{label:>24}: {sender.calls:4d} sends, all delivered in "
+              f"{elapsed * 1000:7.1f} ms  latency p95 "
+              f"{stats['latency_p95_ms']:.1f} ms")
+        assert sender.lines() == lines
+        assert stats["lines"] == len(lines) and stats["failed"] == 0
+
+
+def backpressure(lines) -> None:
+    """Write faster than the queue sends into a small queue"""
+    sender = StandInSender(seconds=0.002)
+    queue = OutboundQueue(sender, capacity=8, coalesce_window=0.0,
+                          max_lines=1)
+    for line in lines:
+        assert queue.put(line)
+    queue.close()
+    stats = queue.stats()
+    print(f"{'backpressure':>24}: max depth {stats['max_depth']} of "
+          f"{stats['capacity']}, writer waited "
+          f"{stats['blocked_seconds'] * 1000:.0f} ms, nothing dropped")
+    assert sender.lines() == lines
+    assert stats["max_depth"] <= 8 and stats["blocked_seconds"] > 0
+
+
+def retries(lines) -> None:
+    """Send through a sender failing 30% of its calls"""
+    sender = StandInSender(seconds=0.0, failure_rate=0.3)
+    queue = OutboundQueue(sender, coalesce_window=0.0, max_lines=1,
+                          max_retries=10, retry_delay=0.0001)
+    for line in lines:
+        queue.put(line)
+    queue.close()
+    stats = queue.stats()
+    print(f"{'retries':>24}: {stats['retries']} retries, "
+          f"{stats['failed']} failed")
+    assert sender.lines() == lines and stats["failed"] == 0
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    logging.disable(logging.CRITICAL)
+    lines = typed_lines(count)
+
+    typing(lines)
+    pasting(lines)
+    backpressure(lines)
+    retries(lines)
+    print("checks passed: lines delivered once and in order, bounded "
+          "depth, failed sends retried")
+
+
+if __name__ == "__main__":
+    main()
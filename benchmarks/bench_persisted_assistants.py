@@ -0,0 +1,202 @@
+"""
+Compare inline and persisted assistants when starting calls
+
+Runs VapiClient.connect against a local stand-in for the VAPI endpoints
+involved: POST /assistant, which creates an assistant, and POST /call/web,
+which starts a call. The stand-in SDK client posts the same payload as
+the real one, so the request size and round trip are measured for:
+
+- inline: the whole assistant configuration, chapter text included,
+  goes with every call
+- persisted: the assistant is created once and calls are started by ID
+
+The script also checks how persisted assistants behave. Reconnects create
+no new assistant. A changed chapter creates exactly one new assistant. A
+call that fails to start falls back to an inline assistant and keeps the
+persisted one. An assistant deleted in VAPI is recreated on the next
+connect. It exits with an assertion error if any of these checks fails.
+
+Usage:
+    python benchmarks/bench_persisted_assistants.py [connects]
+"""
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+from convolingo.api.assistants import AssistantConfigCache, AssistantRegistry
+from convolingo.api.client import VapiClient
+from convolingo.api.rest import VapiRestClient
+from convolingo.api.transport import SdkTransport
+from convolingo.utils.config import DEFAULT_CHAPTER
+from convolingo.utils.setup_state import SetupState
+
+
+class StandInApi(BaseHTTPRequestHandler):
+    """Stand-in for the VAPI assistant and web call endpoints"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    assistants = {}
+    created = 0
+    call_bytes = []
+    failing_calls = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        assistant_id = self.path.rsplit("/", 1)[-1]
+        if assistant_id in StandInApi.assistants:
+            self._reply(200, {"id": assistant_id})
+        else:
+            self._reply(404, {"message": "assistant not found"})
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        payload = json.loads(raw)
+        if self.path == "/assistant":
+            StandInApi.created += 1
+            assistant_id = f"assistant-{StandInApi.created}"
+            StandInApi.assistants[assistant_id] = payload
+            self._reply(201, {"id": assistant_id})
+        elif self.path == "/call/web":
+            StandInApi.call_bytes.append(len(raw))
+            assistant_id = payload.get("assistantId")
+            if assistant_id and StandInApi.failing_calls:
+                StandInApi.failing_calls -= 1
+                self._reply(500, {"message": "could not join the room"})
+            elif assistant_id and assistant_id not in StandInApi.assistants:
+                self._reply(404, {"message": "assistant not found"})
+            else:
+                self._reply(201, {"id": "call", "webCallUrl": "https://x"})
+        else:
+            self._reply(404, {})
+
+
+class StandInVapi:
+    """Stand-in for the SDK client, posting what the SDK posts"""
+
+    def __init__(self, api_url):
+        self.api_url = api_url
+        self.session = requests.Session()
+
+    def start(self, *, assistant_id=None, assistant=None,
+              assistant_overrides=None, **kwargs):
+        if assistant_id:
+            payload = {"assistantId": assistant_id,
+                       "assistantOverrides": assistant_overrides}
+        else:
+            payload = {"assistant": assistant,
+                       "assistantOverrides": assistant_overrides}
+        response = self.session.post(f"{self.api_url}/call/web",
+                                     json=payload)
+        if response.status_code != 201:
+            raise Exception(f"Error: {response.json()}")
+
+    def stop(self):
+        pass
+
+
+def connect_times(client: VapiClient, connects: int, persist: bool,
+                  chapter: str = DEFAULT_CHAPTER):
+    """Connect repeatedly and return the latency of each connect"""
+    latencies = []
+    for i in range(connects):
+        began = time.perf_counter()
+        assert client.connect(chapter=chapter, user_id=f"student-{i % 30}",
+                              persist=persist)
+        latencies.append(time.perf_counter() - began)
+        client.is_connected = False
+    return latencies
+
+
+def report(label: str, latencies, call_bytes) -> None:
+    """Print the median connect latency and call payload size"""
+    print(f"{label:>10}: connect {statistics.median(latencies) * 1000:6.2f} ms"
+          f"  call payload {statistics.mean(call_bytes):6.0f} B")
+
+
+def main() -> None:
+    connects = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    logging.basicConfig(level=logging.ERROR)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInApi)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_port}"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        state = SetupState(Path(tmp) / "setup_state.json", "benchmark",
+                           api_url)
+        client = VapiClient(
+            config_cache=AssistantConfigCache(),
+            registry=AssistantRegistry(
+                state, VapiRestClient(api_key="benchmark", api_base=api_url)
+            ),
+            transport=SdkTransport(StandInVapi(api_url))
+        )
+        # Warm up the connections of both stand-in clients
+        connect_times(client, 5, persist=False)
+
+        StandInApi.call_bytes.clear()
+        inline = connect_times(client, connects, persist=False)
+        report("inline", inline, StandInApi.call_bytes)
+        assert not StandInApi.assistants
+
+        StandInApi.call_bytes.clear()
+        persisted = connect_times(client, connects, persist=True)
+        report("persisted", persisted, StandInApi.call_bytes)
+        assert len(StandInApi.assistants) == 1, StandInApi.assistants
+
+        # A restarted client reuses the assistant recorded in the state
+        restarted = VapiClient(
+            config_cache=AssistantConfigCache(),
+            registry=AssistantRegistry(
+                SetupState(Path(tmp) / "setup_state.json", "benchmark",
+                           api_url),
+                VapiRestClient(api_key="benchmark", api_base=api_url)
+            ),
+            transport=client.transport
+        )
+        connect_times(restarted, 3, persist=True)
+        assert len(StandInApi.assistants) == 1, "restart"
+
+        connect_times(client, 3, persist=True, chapter="Chapter 4 - Trains")
+        assert len(StandInApi.assistants) == 2, "changed chapter"
+
+        # A transient failure falls back to inline and keeps the assistant
+        StandInApi.failing_calls = 3
+        connect_times(client, 3, persist=True)
+        assert len(StandInApi.assistants) == 2, "transient failure"
+        assert StandInApi.created == 2, "transient failure"
+
+        StandInApi.assistants.pop("assistant-1")
+        connect_times(client, 3, persist=True)
+        assert len(StandInApi.assistants) == 2, "deleted assistant"
+        assert "assistant-3" in StandInApi.assistants
+        print("checks passed: one assistant per configuration, reused "
+              "after a restart and a failed start, recreated after deletion")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Benchmark webhook throughput of the pre-fork server by worker count
+
+Starts the pre-fork supervisor with 1, 2 and 4 workers on a free local port
+and drives /callbacks from several client processes over keep-alive
+connections, printing requests per second for each worker count. Every
+worker count uses the SQLite backend, so only the number of workers
+changes, and the vocabulary lives in a temporary history directory.
+
+Usage:
+    python benchmarks/bench_prefork.py [client_processes] [requests_each] [mode]
+"""
+import http.client
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORKER_COUNTS = (1, 2, 4)
+
+SERVER_CODE = """
+import logging, sys
+logging.disable(logging.INFO)
+from convolingo.api.prefork import PreforkServer
+PreforkServer(workers=int(sys.argv[1]), port=int(sys.argv[2]),
+              mode=sys.argv[3], backend="sqlite").run()
+"""
+
+BODY = json.dumps({
+    "type": "tool-call",
+    "toolId": "vocabulary-tool",
+    "input": {"action": "list", "language": "German"},
+})
+
+
+def free_port() -> int:
+    """Find a free local port"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float = 10.0) -> None:
+    """Wait until the server accepts connections"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.2).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server did not start on port {port}")
+
+
+def client(args) -> int:
+    """Send requests over one keep-alive connection"""
+    port, count = args
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    headers = {"Content-Type": "application/json"}
+    for _ in range(count):
+        conn.request("POST", "/callbacks", BODY, headers)
+        conn.getresponse().read()
+    conn.close()
+    return count
+
+
+def run(workers: int, clients: int, each: int, mode: str, tmp: str) -> float:
+    """Measure requests per second for a worker count"""
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT_DIR, CONVOLINGO_HISTORY_DIR=tmp)
+    server = subprocess.Popen(
+        [sys.executable, "-c", SERVER_CODE, str(workers), str(port), mode],
+        cwd=tmp, env=env
+    )
+    try:
+        wait_for_port(port)
+        with multiprocessing.Pool(clients) as pool:
+            began = time.perf_counter()
+            total = sum(pool.map(client, [(port, each)] * clients))
+            elapsed = time.perf_counter() - began
+        return total / elapsed
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=10)
+
+
+def main():
+    """Run the pre-fork throughput benchmark"""
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    each = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    mode = sys.argv[3] if len(sys.argv) > 3 else "flask"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'workers':>8} {'req/s':>10}")
+        for workers in WORKER_COUNTS:
+            rate = run(workers, clients, each, mode, tmp)
+            print(f"{workers:>8} {rate:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Measure time to ready of an interactive session with and without pre-warm
+
+Starts InteractiveSession the way `convolingo interactive` does. The
+vocabulary store holds a large vocabulary, so loading it takes a while.
+The SDK is a stand-in whose client takes SDK_INIT_SECONDS to create and
+START_SECONDS to start a call, like the audio stack and call set-up of
+the real one. The time from the command starting to a usable call is
+reported:
+
+- cold: the SDK client is created and the assistant built inside connect,
+  after the vocabulary has loaded
+- pre-warmed: VapiClient.prewarm creates them in the background while the
+  session and its vocabulary load
+
+The script also checks the session stats file. Every session leaves one
+record, the records hold every phase, and the summary of the `stats`
+command covers them all. It exits with an assertion error if any of
+these checks fails.
+
+Usage:
+    python benchmarks/bench_prewarm.py [sessions] [words]
+"""
+import contextlib
+import io
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+from convolingo.api.client import VapiClient
+from convolingo.tools.storage import JsonVocabularyStore
+from convolingo.utils.config import config
+from convolingo.utils.telemetry import (
+    PHASES, READY, SESSION_STATS_FILE_NAME, load_session_stats,
+    summarize_session_stats
+)
+
+# Time the stand-in SDK takes to create a client and to start a call
+SDK_INIT_SECONDS = 0.15
+START_SECONDS = 0.05
+
+
+class StandInVapi:
+    """Stand-in for the SDK client"""
+
+    def __init__(self, api_key=None):
+        time.sleep(SDK_INIT_SECONDS)
+
+    def start(self, **kwargs):
+        time.sleep(START_SECONDS)
+
+    def send_text(self, text):
+        pass
+
+    def stop(self):
+        pass
+
+
+def ready_time(prewarm: bool) -> float:
+    """Start an interactive session and time it until the call is usable"""
+    # Imported here since the store location is set by the caller
+    from convolingo.cli.interactive import InteractiveSession
+
+    began = time.perf_counter()
+    client = VapiClient()
+    if prewarm:
+        client.prewarm()
+    session = InteractiveSession(client)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert session.client.connect()
+    ready = time.perf_counter() - began
+    session.client.send_message("Hallo")
+    session.client.disconnect()
+    session.vocabulary_tool.close()
+    return ready
+
+
+def main() -> None:
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    words = int(sys.argv[2]) if len(sys.argv) > 2 else 100000
+    logging.disable(logging.CRITICAL)
+    sys.modules["vapi_python"] = types.SimpleNamespace(Vapi=StandInVapi)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.history_dir = Path(tmp)
+        store = JsonVocabularyStore(Path(tmp) / "vocabulary.json")
+        for i in range(words):
+            store.add_entry("German", {"word": f"Wort{i}",
+                                       "translation": f"word {i}"})
+        store.close()
+
+        for label, prewarm in (("cold", False), ("pre-warmed", True)):
+            times = [ready_time(prewarm) for _ in range(sessions)]
+            print(f"{label:>10}: time to ready "
+                  f"{statistics.median(times) * 1000:7.1f} ms")
+
+        records = load_session_stats(Path(tmp) / SESSION_STATS_FILE_NAME)
+        assert len(records) == 2 * sessions, len(records)
+        for record in records:
+            assert record["ok"] and set(record["seconds"]) == set(PHASES), record
+        summary = summarize_session_stats(records)
+        assert summary[READY]["count"] == 2 * sessions, summary
+        for phase in PHASES:
+            print(f"{phase:>16}: p50 {summary[phase]['p50_ms']:7.1f} ms  "
+                  f"p95 {summary[phase]['p95_ms']:7.1f} ms")
+        print("checks passed: one stats record per session with every phase")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Benchmark the review due queue against scanning and sorting the vocabulary
+
+Fills a vocabulary with synthetic entries added over the past year, some of
+them already reviewed and due in the future, and prints:
+
+- queue build: the first VocabularyTool.due_words call, which builds the
+  language's due queue
+- next due: the mean latency of fetching the next REVIEW_BATCH_SIZE due
+  words from the queue, by sorting the whole list on due time, and by a
+  heapq.nsmallest scan
+- review: the mean latency of VocabularyTool.review_word on due words
+
+The script also checks the queue. After every review the due words match
+the scan-and-sort result. The reviews are still there after the store is
+closed and reopened from its journal. The JSON and SQLite backends return
+the same due words for the same reviews. It exits with an assertion error
+if any of these checks fails.
+
+Usage:
+    python benchmarks/bench_review.py [entries] [reviews]
+"""
+import heapq
+import logging
+import os
+import random
+import string
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+from convolingo.tools.review import due_at, schedule_review
+from convolingo.tools.storage import JsonVocabularyStore, SqliteVocabularyStore
+from convolingo.tools.vocabulary import VocabularyTool
+from convolingo.utils.config import REVIEW_BATCH_SIZE
+
+
+def random_word(rng: random.Random) -> str:
+    """Generate a random lowercase word"""
+    return "".join(rng.choice(string.ascii_lowercase)
+                   for _ in range(rng.randint(4, 12)))
+
+
+def random_entry(rng: random.Random, now: datetime) -> dict:
+    """Generate a word added in the past year, a third of them reviewed"""
+    entry = {
+        "word": random_word(rng),
+        "translation": random_word(rng),
+        "added_at": (now - timedelta(days=rng.uniform(0, 365))).isoformat(),
+        "review_count": 0,
+        "last_reviewed": None
+    }
+    if rng.random() < 0.33:
+        entry["due"] = (now + timedelta(days=rng.uniform(-30, 30))).isoformat()
+    return entry
+
+
+def sorted_due(entries, now: str, limit: int):
+    """Scan the list and sort it on due time"""
+    due = sorted(
+        (due_at(entry), position) for position, entry in enumerate(entries)
+    )
+    return [entries[position] for d, position in due[:limit] if d <= now]
+
+
+def nsmallest_due(entries, now: str, limit: int):
+    """Scan the list keeping the earliest due entries in a small heap"""
+    due = heapq.nsmallest(
+        limit, ((due_at(entry), position)
+                for position, entry in enumerate(entries))
+    )
+    return [entries[position] for d, position in due if d <= now]
+
+
+def timed(func, repeat: int) -> float:
+    """Return the mean runtime of func in microseconds"""
+    began = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - began) / repeat * 1e6
+
+
+def benchmark(total: int, reviews: int) -> None:
+    """Time the due queue on a large JSON vocabulary"""
+    rng = random.Random(42)
+    now = datetime.now()
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JsonVocabularyStore(Path(tmp) / "vocabulary.json")
+        tool = VocabularyTool(store=store)
+        store.vocabulary["German"] = [
+            random_entry(rng, now) for _ in range(total)
+        ]
+        entries = store.vocabulary["German"]
+
+        began = time.perf_counter()
+        tool.due_words("German")
+        print(f"queue build: {(time.perf_counter() - began) * 1e3:.1f} ms "
+              f"for {len(entries)} entries")
+
+        clock = datetime.now().isoformat()
+        words = tool.due_words("German")["words"]
+        assert words == sorted_due(entries, clock, REVIEW_BATCH_SIZE)
+        assert words == nsmallest_due(entries, clock, REVIEW_BATCH_SIZE)
+        queued = timed(lambda: tool.due_words("German"), 200)
+        scanned = timed(
+            lambda: sorted_due(entries, clock, REVIEW_BATCH_SIZE), 1
+        )
+        smallest = timed(
+            lambda: nsmallest_due(entries, clock, REVIEW_BATCH_SIZE), 1
+        )
+        print(f"next {REVIEW_BATCH_SIZE} due: queue {queued:10.1f} us  "
+              f"sort {scanned:12.1f} us  nsmallest {smallest:12.1f} us")
+
+        durations = []
+        for i in range(reviews):
+            word = tool.due_words("German", limit=1)["words"][0]["word"]
+            began = time.perf_counter()
+            result = tool.review_word("German", word, rng.randint(0, 5))
+            durations.append(time.perf_counter() - began)
+            assert result["success"], result
+            if i % 100 == 0:
+                clock = datetime.now().isoformat()
+                assert (tool.due_words("German")["words"]
+                        == sorted_due(entries, clock, REVIEW_BATCH_SIZE))
+        print(f"review: {sum(durations) / len(durations) * 1e6:10.1f} us "
+              f"per word over {reviews} reviews")
+        # Stopped without close(), which would snapshot the whole vocabulary
+        store.journal.stop_flusher()
+
+
+def backend_parity(total: int = 2000, reviews: int = 500) -> None:
+    """Check both backends schedule the same reviews the same way"""
+    rng = random.Random(7)
+    now = datetime.now()
+    entries = [random_entry(rng, now) for _ in range(total)]
+    grades = [rng.randint(0, 5) for _ in range(reviews)]
+    with tempfile.TemporaryDirectory() as tmp:
+        json_file = Path(tmp) / "vocabulary.json"
+        results = []
+        for store in (JsonVocabularyStore(json_file),
+                      SqliteVocabularyStore(Path(tmp) / "vocabulary.db")):
+            for entry in entries:
+                store.add_entry("German", dict(entry))
+            grade_at = now
+            for grade in grades:
+                word = store.due_entries("German", now.isoformat(), 1)[0]
+                grade_at += timedelta(seconds=1)
+                store.update_entry(
+                    "German", word["word"],
+                    lambda e: schedule_review(e, grade, grade_at)
+                )
+            results.append(store.due_entries(
+                "German", (now + timedelta(days=40)).isoformat(), total
+            ))
+            store.close()
+        assert results[0] == results[1]
+
+        # Reviews are journaled and replayed on load
+        reopened = JsonVocabularyStore(json_file, flush_interval=0)
+        assert reopened.due_entries(
+            "German", (now + timedelta(days=40)).isoformat(), total
+        ) == results[0]
+        reopened.close()
+    print(f"checks passed: due words match scan-and-sort, reviews survive "
+          f"a reload, json and sqlite agree on {len(results[0])} due words")
+
+
+def main():
+    """Run the review benchmark"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    reviews = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    logging.disable(logging.CRITICAL)
+    benchmark(total, reviews)
+    backend_parity()
+
+
+if __name__ == "__main__":
+    main()
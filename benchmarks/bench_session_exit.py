@@ -0,0 +1,110 @@
+"""
+Measure exit-to-disconnect latency of a session
+
+Keeps a VapiClient "connected" to an in-process stand-in for the SDK client
+and, from another thread, ends the session the ways a real session does:
+the interactive input thread asking to stop, and the SDK's call object
+leaving the call on its own (the assistant hung up). The time from the
+stop to the stand-in's stop() call is reported, next to the 0.5 s polling
+loop that maintain_connection used to run.
+
+Usage:
+    python benchmarks/bench_session_exit.py [rounds]
+"""
+import logging
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+from convolingo.api.client import VapiClient
+from convolingo.api.transport import SdkTransport
+
+
+class StandInCall:
+    """Stand-in for the SDK's call object"""
+
+    def leave(self):
+        pass
+
+
+class StandInVapi:
+    """Stand-in for the SDK client, recording when it is stopped"""
+
+    def __init__(self):
+        self._Vapi__client = StandInCall()
+        self.stopped_at = None
+
+    def stop(self):
+        self.stopped_at = time.perf_counter()
+
+
+def connected_client() -> VapiClient:
+    """Create a client that looks connected to the stand-in SDK"""
+    client = VapiClient()
+    client.client = SdkTransport(StandInVapi())
+    client.is_connected = True
+    client.stop_event.clear()
+    client._watch_call_end()
+    return client
+
+
+def exit_latency(stop) -> float:
+    """Run maintain_connection and time stop() until the disconnect"""
+    client = connected_client()
+    sdk = client.client.sdk
+    stamp = {}
+
+    def stopper():
+        time.sleep(random.uniform(0.05, 0.15))
+        stamp["at"] = time.perf_counter()
+        stop(client, sdk)
+
+    threading.Thread(target=stopper).start()
+    client.maintain_connection()
+    return sdk.stopped_at - stamp["at"]
+
+
+def polling_latency() -> float:
+    """Time the former loop that re-checked a running flag every 0.5 s"""
+    state = {"running": True}
+    stamp = {}
+
+    def stopper():
+        time.sleep(random.uniform(0.05, 0.15))
+        stamp["at"] = time.perf_counter()
+        state["running"] = False
+
+    threading.Thread(target=stopper).start()
+    while state["running"]:
+        time.sleep(0.5)
+    return time.perf_counter() - stamp["at"]
+
+
+def report(label: str, latencies) -> None:
+    """Print the mean and worst latency"""
+    print(f"{label:>16}: mean {statistics.mean(latencies) * 1000:7.2f} ms  "
+          f"max {max(latencies) * 1000:7.2f} ms")
+
+
+def main() -> None:
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    logging.basicConfig(level=logging.ERROR)
+
+    report("exit command", [
+        exit_latency(lambda client, sdk: client.request_stop("exit"))
+        for _ in range(rounds)
+    ])
+    report("call ended", [
+        exit_latency(lambda client, sdk: sdk._Vapi__client.leave())
+        for _ in range(rounds)
+    ])
+    report("0.5 s polling", [polling_latency() for _ in range(rounds)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Compare sequential and concurrent cold setup
+
+Runs the setup steps against a local stand-in for the VAPI API that adds a
+fixed latency to every request, with a stand-in ngrok tunnel that takes a
+while to come up and a webhook server that takes a while to load its
+vocabulary. Each round starts from an empty setup state (a cold setup).
+The same steps are run once one after another, as setup used to, and once
+as the concurrent pipeline.
+
+Usage:
+    python benchmarks/bench_setup_pipeline.py [rounds] [api_latency_ms]
+"""
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+import convolingo.utils.config as config_module
+from convolingo.api.rest import VapiRestClient
+from convolingo.cli import setup as setup_module
+from convolingo.cli.setup import SetupTool
+from convolingo.utils.setup_state import SetupState
+
+API_LATENCY_SECONDS = 0.1
+TUNNEL_SECONDS = 1.0
+SERVER_LOAD_SECONDS = 0.3
+
+
+class StandInApi(BaseHTTPRequestHandler):
+    """Stand-in for the VAPI endpoints used during setup"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    created = 0
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload):
+        time.sleep(API_LATENCY_SECONDS)
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length)
+
+    def do_GET(self):
+        self._reply(200, [] if self.path == "/assistants" else {"tools": []})
+
+    def do_POST(self):
+        self._read_body()
+        StandInApi.created += 1
+        self._reply(201, {"id": f"tool-{StandInApi.created}"})
+
+    def do_PATCH(self):
+        self._read_body()
+        self._reply(200, {})
+
+
+class StandInTunnel:
+    """ngrok stand-in that takes a while to come up"""
+
+    def start(self, adopt=True):
+        time.sleep(TUNNEL_SECONDS)
+        return "https://example.invalid"
+
+    def get_api_url(self, path):
+        return f"https://example.invalid/{path}"
+
+    def stop(self):
+        pass
+
+
+class StandInServer:
+    """Webhook server stand-in that takes a while to load"""
+
+    def __init__(self):
+        time.sleep(SERVER_LOAD_SECONDS)
+
+    def run(self, **kwargs):
+        pass
+
+
+def run_sequential(tool: SetupTool) -> bool:
+    """Run the setup steps one after another in dependency order"""
+    pipeline = tool.build_pipeline()
+    results = {}
+    for name in ("key", "tunnel", "server", "tool", "url", "assign"):
+        step = pipeline.steps[name]
+        results[name] = step.func(**{dep: results[dep] for dep in step.requires})
+    return True
+
+
+def measure(label: str, rounds: int, api_base: str, tmp: str, run) -> None:
+    """Time several cold setups"""
+    timings = []
+    for i in range(rounds):
+        tool = SetupTool()
+        tool.rest = VapiRestClient(api_base=api_base)
+        tool.state = SetupState(
+            Path(tmp) / f"{label}-{i}.json", "benchmark", api_base
+        )
+        tool.ngrok = StandInTunnel()
+        started = time.perf_counter()
+        assert run(tool)
+        timings.append(time.perf_counter() - started)
+        tool.rest.close()
+    print(f"{label:>11}: mean {statistics.mean(timings):6.2f} s  "
+          f"median {statistics.median(timings):6.2f} s")
+
+
+def main() -> None:
+    global API_LATENCY_SECONDS
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    if len(sys.argv) > 2:
+        API_LATENCY_SECONDS = float(sys.argv[2]) / 1000
+    logging.basicConfig(level=logging.ERROR)
+
+    # The assistant to assign the tool to is normally set in the config
+    if not hasattr(config_module, "ASSISTANT_ID"):
+        config_module.ASSISTANT_ID = "benchmark-assistant"
+    setup_module.WebhookServer = StandInServer
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInApi)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    api_base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    print(f"{rounds} cold setups, {API_LATENCY_SECONDS * 1000:.0f} ms per "
+          f"API call, {TUNNEL_SECONDS:.1f} s tunnel startup, "
+          f"{SERVER_LOAD_SECONDS:.1f} s server startup")
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            measure("sequential", rounds, api_base, tmp, run_sequential)
+            measure("pipeline", rounds, api_base, tmp,
+                    lambda tool: tool.build_pipeline().run())
+    finally:
+        httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Measure the VAPI REST calls made during setup against a local stand-in API
+
+Starts a keep-alive HTTP/1.1 stand-in for the VAPI API on a free local
+port. Each new connection pays a fixed handshake delay, standing in for the
+TCP + TLS setup to the real API, and every few tool creations are answered
+with a 503 to exercise the retry path. The setup REST sequence (validate
+key, create tool, update server URL) is run repeatedly, once with a fresh
+connection per call (as with bare ``requests.get``/``requests.post``) and
+once with the pooled shared client.
+
+Usage:
+    python benchmarks/bench_setup_rest.py [rounds] [handshake_ms]
+"""
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+from convolingo.api.rest import VapiRestClient
+from convolingo.cli.setup import SetupTool
+from convolingo.utils.setup_state import SetupState
+
+HANDSHAKE_SECONDS = 0.02
+FAIL_EVERY = 5
+
+
+class StandInApi(BaseHTTPRequestHandler):
+    """Tiny stand-in for the VAPI endpoints used during setup"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    created = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        time.sleep(HANDSHAKE_SECONDS)
+        super().setup()
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length)
+
+    def do_GET(self):
+        self._reply(200, [])
+
+    def do_POST(self):
+        self._read_body()
+        with StandInApi.lock:
+            StandInApi.created += 1
+            fail = StandInApi.created % FAIL_EVERY == 0
+        if fail:
+            self._reply(503, {"error": "try again"})
+        else:
+            self._reply(201, {"id": f"tool-{StandInApi.created}"})
+
+    def do_PATCH(self):
+        self._read_body()
+        self._reply(200, {})
+
+
+def run_round(tool: SetupTool) -> float:
+    """Run the setup REST sequence once and return its duration"""
+    started = time.perf_counter()
+    assert tool.check_api_key()
+    tool_id = tool.create_vocabulary_tool()
+    assert tool_id
+    assert tool.reconcile_server_url(
+        tool_id, "https://example.invalid/api"
+    ) == tool_id
+    return time.perf_counter() - started
+
+
+def measure(label: str, rounds: int, make_client, api_base: str,
+            tmp: str) -> None:
+    """Time several setup rounds with the given client factory"""
+    tool = SetupTool()
+    # Keep the fake tools out of the real setup state
+    tool.state = SetupState(
+        Path(tmp) / f"{label}.json", "benchmark", api_base
+    )
+    timings = []
+    for _ in range(rounds):
+        tool.rest = make_client()
+        timings.append(run_round(tool))
+    print(f"{label:>22}: mean {statistics.mean(timings) * 1000:7.1f} ms  "
+          f"median {statistics.median(timings) * 1000:7.1f} ms")
+
+
+def main() -> None:
+    global HANDSHAKE_SECONDS
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    if len(sys.argv) > 2:
+        HANDSHAKE_SECONDS = float(sys.argv[2]) / 1000
+    logging.basicConfig(level=logging.ERROR)
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StandInApi)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    api_base = f"http://127.0.0.1:{httpd.server_address[1]}"
+    print(f"{rounds} rounds, {HANDSHAKE_SECONDS * 1000:.0f} ms per new "
+          f"connection, every {FAIL_EVERY}th tool creation fails with 503")
+
+    def per_call_connections():
+        client = VapiRestClient(api_base=api_base, backoff_factor=0.01)
+        client.session.headers["Connection"] = "close"
+        return client
+
+    pooled = VapiRestClient(api_base=api_base, backoff_factor=0.01)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            measure("connection per call", rounds, per_call_connections,
+                    api_base, tmp)
+            measure("pooled keep-alive", rounds, lambda: pooled,
+                    api_base, tmp)
+    finally:
+        pooled.close()
+        httpd.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Run thousands of synthetic turns end to end through the fake transport
+
+Drives the real InteractiveSession and Session with the in-process fake
+transport in place of VAPI, so no network, microphone or API key is
+needed:
+
+- interactive: a scripted learner types messages into
+  InteractiveSession. The fake transport answers part of them with a
+  vocabulary tool call and delivers it to a WebhookServer, either
+  directly in this process or over HTTP to a local Flask server.
+- session: basic Sessions whose calls the fake assistant hangs up.
+
+It reports turns per second and the turn latency (message sent to tool
+call answered), next to the cost of send_message dispatching with the
+former per-call hasattr probing and with the transport's send method
+resolved once at connect time.
+
+The script also checks the fake transport. Two runs with the same seed
+make the same tool calls. Every message is delivered, every tool call is
+answered without an error, and the added words are in the learner's
+vocabulary. It exits with an assertion error if any of these checks
+fails.
+
+Usage:
+    python benchmarks/bench_transport.py [turns]
+"""
+import builtins
+import contextlib
+import io
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+from werkzeug.serving import make_server
+
+from convolingo.api.client import VapiClient
+from convolingo.api.transport import (
+    FakeTransport, SdkTransport, call_webhook, post_webhook
+)
+from convolingo.utils.config import config
+
+
+class StandInVapi:
+    """Stand-in for the SDK client of a version with message()"""
+
+    def message(self, text):
+        pass
+
+
+def former_send(client, text):
+    """What send_message did on every call before the transport"""
+    if hasattr(client, 'send_text'):
+        client.send_text(text)
+    elif hasattr(client, 'user_message'):
+        client.user_message(text)
+    else:
+        client.message(text)
+
+
+def dispatch_cost(sends: int) -> None:
+    """Print the CPU time of dispatching one message"""
+    sdk = StandInVapi()
+    transport = SdkTransport(sdk)
+    for label, send in (
+            ("former hasattr probing", lambda: former_send(sdk, "Hallo")),
+            ("resolved at connect", lambda: transport.send("Hallo"))):
+        started = time.process_time()
+        for _ in range(sends):
+            send()
+        cost = (time.process_time() - started) / sends * 1e9
+        print(f"{label:>24}: {cost:6.0f} ns per message")
+
+
+def learner_input(turns: int, session, transport: FakeTransport):
+    """
+    Replace input() with a learner typing numbered messages, then exit
+
+    Like a real learner, each message waits for the previous turn.
+    """
+    lines = iter([f"Wort{i % 500} bitte" for i in range(turns)] + ["exit"])
+
+    def learner(prompt=""):
+        session.outbound.wait_idle()
+        transport.wait_delivered()
+        return next(lines)
+    return learner
+
+
+def interactive_run(turns: int, seed: int, user_id: str,
+                    webhook_for) -> FakeTransport:
+    """Run one InteractiveSession through the fake transport"""
+    # Imported here since the store location is set by the caller
+    from convolingo.api.server import WebhookServer
+    from convolingo.cli.interactive import InteractiveSession
+
+    # Each turn waits for the last, so there is nothing to coalesce
+    session = InteractiveSession(coalesce_window=0)
+    server = WebhookServer(vocabulary_tool=session.vocabulary_tool)
+    transport = FakeTransport(seed=seed, webhook=webhook_for(server))
+    session.client = VapiClient(transport=transport)
+
+    original_input = builtins.input
+    builtins.input = learner_input(turns, session, transport)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            session.start(user_id=user_id)
+    finally:
+        builtins.input = original_input
+        server.executor.shutdown()
+    return transport
+
+
+def http_webhook_for(server):
+    """Serve the webhook server on a local port and post to it"""
+    httpd = make_server("127.0.0.1", 0, server.app, threaded=True)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return post_webhook(f"http://127.0.0.1:{httpd.server_port}/callbacks")
+
+
+def report(label: str, transport: FakeTransport, elapsed: float) -> None:
+    """Print throughput and turn latency of a run"""
+    turns = sorted(transport.turn_seconds)
+    print(f"{label:>24}: {len(turns) / elapsed:8.0f} turns/s  "
+          f"p50 {statistics.median(turns) * 1e6:7.0f} us  "
+          f"p95 {turns[int(len(turns) * 0.95)] * 1e6:7.0f} us  "
+          f"({transport.tool_calls} tool calls)")
+
+
+def check(transport: FakeTransport, turns: int) -> None:
+    """Check a run delivered every message and every tool call worked"""
+    kinds = [kind for kind, detail in transport.events]
+    assert kinds.count("message") == turns, kinds.count("message")
+    assert transport.webhook_errors == 0, transport.webhook_errors
+    assert kinds[0] == "start" and kinds[-1] == "stop", kinds
+
+
+def main() -> None:
+    turns = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    logging.disable(logging.CRITICAL)
+
+    dispatch_cost(200000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config.history_dir = Path(tmp)
+
+        runs = {}
+        for label, seed, user_id, webhook_for in (
+                ("interactive, in-process", 1, "learner-1", call_webhook),
+                ("interactive, repeated", 1, "learner-2", call_webhook),
+                ("interactive, over HTTP", 1, "learner-3", http_webhook_for)):
+            began = time.perf_counter()
+            transport = interactive_run(turns, seed, user_id, webhook_for)
+            report(label, transport, time.perf_counter() - began)
+            check(transport, turns)
+            runs[label] = transport
+
+        first = runs["interactive, in-process"].events
+        repeated = runs["interactive, repeated"].events
+        assert first == repeated, "same seed, different events"
+
+        # Words added by the tool calls are in the learner's vocabulary
+        from convolingo.tools.vocabulary import VocabularyTool
+        vocabulary = VocabularyTool()
+        listed = vocabulary.list_words("German", user_id="learner-1")
+        added = {detail for kind, detail in first if kind == "tool-call"}
+        assert "add" in added and listed["success"] and listed["words"]
+        vocabulary.close()
+
+        # Basic sessions end when the fake assistant hangs up
+        from convolingo.cli.session import Session
+        began = time.perf_counter()
+        for i in range(20):
+            session = Session()
+            session.client = VapiClient(
+                transport=FakeTransport(seed=i, call_seconds=0.01)
+            )
+            with contextlib.redirect_stdout(io.StringIO()):
+                session.start()
+            assert ("hang-up", None) in session.client.transport.events
+        per_call = (time.perf_counter() - began) / 20 * 1000
+        print(f"{'session, hung up':>24}: {per_call:8.2f} ms per 10 ms call")
+
+    print("checks passed: deterministic tool calls, all messages delivered, "
+          "all tool calls answered, calls end on hang-up")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Benchmark VocabularyTool.add_word latency as the vocabulary grows
+
+Adds words in batches to a fresh vocabulary in a temporary directory and
+prints the mean add latency per batch, once with every add written
+synchronously and once in write-behind mode. With the journaled store the
+latency should stay flat instead of growing with the number of stored
+words, and write-behind adds should not pay for disk I/O at all.
+
+Usage:
+    python benchmarks/bench_vocabulary_add.py [total_words] [batch_size]
+"""
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+from convolingo.tools.storage import JsonVocabularyStore
+from convolingo.tools.vocabulary import VocabularyTool
+
+
+def main():
+    """Run the add_word latency benchmark"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    batch = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+
+    for label, interval in (("synchronous", 0.0), ("write-behind", 1.0)):
+        print(f"{label}:")
+        with tempfile.TemporaryDirectory() as tmp:
+            tool = VocabularyTool(store=JsonVocabularyStore(
+                Path(tmp) / "vocabulary.json", flush_interval=interval
+            ))
+            print(f"{'words':>10} {'mean add (us)':>15}")
+            for start in range(0, total, batch):
+                began = time.perf_counter()
+                for i in range(start, start + batch):
+                    tool.add_word("German", f"wort{i}", f"word{i}")
+                elapsed = time.perf_counter() - began
+                print(f"{start + batch:>10} {elapsed / batch * 1e6:>15.1f}")
+            tool.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Benchmark VocabularyTool.search_word against a linear scan
+
+Fills a vocabulary with synthetic entries, checks that the trigram index
+returns exactly the same results as the original linear scan, and prints the
+time and memory the index build takes and the mean latency of both for a
+handful of queries.
+
+Usage:
+    python benchmarks/bench_vocabulary_search.py [entries]
+"""
+import os
+import random
+import resource
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+from convolingo.tools.storage import JsonVocabularyStore
+from convolingo.tools.vocabulary import VocabularyTool
+
+QUERIES = ["haus", "Zei", "tion", "qqq", "ab", "e"]
+
+
+def random_word(rng: random.Random) -> str:
+    """Generate a random lowercase word"""
+    return "".join(rng.choice(string.ascii_lowercase)
+                   for _ in range(rng.randint(4, 12)))
+
+
+def linear_search(entries, query):
+    """The original linear scan search"""
+    return [
+        word for word in entries
+        if query.lower() in word["word"].lower() or
+           query.lower() in word["translation"].lower()
+    ]
+
+
+def timed(func, repeat: int) -> float:
+    """Return the mean runtime of func in microseconds"""
+    began = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - began) / repeat * 1e6
+
+
+def main():
+    """Run the search benchmark"""
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = random.Random(42)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = JsonVocabularyStore(Path(tmp) / "vocabulary.json",
+                                    build_index=False)
+        tool = VocabularyTool(store=store)
+        store.vocabulary["German"] = [
+            {"word": random_word(rng), "translation": random_word(rng)}
+            for _ in range(total)
+        ]
+        store.vocabulary["German"].append(
+            {"word": "Zeitung", "translation": "newspaper"}
+        )
+        entries = store.vocabulary["German"]
+
+        # Searches scan until the index is built
+        assert (tool.search_word("German", "warm")["results"]
+                == linear_search(entries, "warm"))
+
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        began = time.perf_counter()
+        store.build_search_index("German")
+        grown = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss
+        print(f"index build: {(time.perf_counter() - began) * 1e3:.1f} ms, "
+              f"peak RSS +{grown / 1024:.0f} MiB for {len(entries)} entries")
+
+        print(f"{'query':>8} {'matches':>8} {'index (us)':>12} {'scan (us)':>12}")
+        for query in QUERIES:
+            results = tool.search_word("German", query)["results"]
+            assert results == linear_search(entries, query), query
+            indexed = timed(lambda: tool.search_word("German", query), 50)
+            scanned = timed(lambda: linear_search(entries, query), 3)
+            print(f"{query:>8} {len(results):>8} {indexed:>12.1f} "
+                  f"{scanned:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
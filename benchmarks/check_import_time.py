@@ -0,0 +1,142 @@
+"""
+Check the import time of each CLI subcommand against a budget
+
+Runs a fresh interpreter with ``-X importtime`` for every subcommand,
+importing the CLI entry point plus the modules that subcommand loads, and
+sums the cumulative time of the top-level imports (interpreter start-up
+imports done by ``site`` are excluded). The best of several runs is
+compared with the budget. The wall-clock time ``python -m convolingo --help``
+adds on top of a bare ``python -c pass`` is checked as well. Exits with
+status 1 if anything is over budget, so it can guard against import-time
+regressions.
+
+Budgets leave about twice the best time measured when they were set, as
+single runs on a busy host vary by tens of percent. They are scaled up on
+hosts slower than that one: a fixed set of standard library imports is
+timed alongside, and compared with REFERENCE_MS.
+
+``setup --no-server``, ``setup`` and ``serve`` do not get under 100 ms.
+``setup --no-server`` needs requests (about 100 ms with urllib3 and
+certifi) for the VAPI REST calls, and ``setup`` and ``serve`` need Flask
+(about 170 ms) for the webhook server. Only the commands that use them
+import them.
+
+Usage:
+    python benchmarks/check_import_time.py [runs]
+"""
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules each subcommand imports on top of convolingo.__main__
+COMMAND_MODULES = {
+    "--help": [],
+    "setup --no-server": ["convolingo.cli.setup"],
+    "setup": ["convolingo.cli.setup", "convolingo.api.server"],
+    "interactive": ["convolingo.cli.interactive"],
+    "session": ["convolingo.cli.session"],
+    "serve": ["convolingo.api.prefork"],
+    "cohort": ["convolingo.cli.cohort"],
+    "stats": ["convolingo.cli.stats"],
+}
+
+# Import time budgets in milliseconds, on a host where the reference
+# imports take REFERENCE_MS
+IMPORT_BUDGETS_MS = {
+    "--help": 50,
+    "setup --no-server": 250,
+    "setup": 500,
+    "interactive": 100,
+    "session": 80,
+    "serve": 350,
+    "cohort": 100,
+    "stats": 60,
+}
+
+# Standard library imports timed to scale the budgets to the host
+REFERENCE_MODULES = ["argparse", "json", "logging", "http.client"]
+REFERENCE_MS = 33
+
+# Wall-clock budget of what `python -m convolingo --help` adds on top of
+# starting the interpreter (the sub-100 ms goal on a ~60 ms interpreter)
+HELP_WALL_BUDGET_MS = 60
+
+
+def child_env() -> dict:
+    """Environment for the measured interpreters (no API key needed)"""
+    env = dict(os.environ)
+    env.pop("VAPI_API_KEY", None)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(ROOT), env.get("PYTHONPATH")])
+    )
+    return env
+
+
+def import_time_ms(modules) -> float:
+    """Measure the import time of some modules"""
+    code = "; ".join(f"import {module}" for module in modules)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=child_env(), check=True
+    )
+
+    total = 0
+    after_site = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|", 2)
+        if name.strip() == "site" and not name.startswith("  "):
+            after_site = True
+            continue
+        # Top-level imports have a single space before their name
+        if after_site and not name.startswith("  ") and cumulative.strip().isdigit():
+            total += int(cumulative)
+    return total / 1000
+
+
+def wall_ms(args) -> float:
+    """Measure the wall-clock time of running the interpreter"""
+    started = time.perf_counter()
+    subprocess.run(
+        [sys.executable, *args],
+        stdout=subprocess.DEVNULL, env=child_env(), check=True
+    )
+    return (time.perf_counter() - started) * 1000
+
+
+def main() -> int:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    failed = False
+
+    reference = min(import_time_ms(REFERENCE_MODULES) for _ in range(runs))
+    scale = max(1.0, reference / REFERENCE_MS)
+    print(f"{'reference':>18}: imports {reference:7.1f} ms "
+          f"(budgets scaled by {scale:.2f})")
+
+    for command, modules in COMMAND_MODULES.items():
+        best = min(import_time_ms(["convolingo.__main__", *modules])
+                   for _ in range(runs))
+        budget = IMPORT_BUDGETS_MS[command] * scale
+        status = "ok" if best <= budget else "OVER BUDGET"
+        failed |= best > budget
+        print(f"{command:>18}: imports {best:7.1f} ms "
+              f"(budget {budget:.0f} ms) {status}")
+
+    bare = min(wall_ms(["-c", "pass"]) for _ in range(runs))
+    best = min(wall_ms(["-m", "convolingo", "--help"]) for _ in range(runs))
+    budget = HELP_WALL_BUDGET_MS * scale
+    status = "ok" if best - bare <= budget else "OVER BUDGET"
+    failed |= best - bare > budget
+    print(f"{'--help wall time':>18}: {best:7.1f} ms, {best - bare:.1f} ms "
+          f"over the interpreter (budget {budget:.0f} ms) {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
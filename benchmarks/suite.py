@@ -0,0 +1,525 @@
+"""
+Offline benchmark suite for the vocabulary tool and the webhook server
+
+Runs every benchmark case in a fresh interpreter (so each reports its own
+peak RSS), prints a summary table and writes the results as JSON. Each
+result has p50/p95/p99 latency in milliseconds, throughput in operations
+per second and the peak RSS of the case's process in MiB.
+
+Cases:
+    vocabulary  VocabularyTool.add_word, list_words and search_word,
+                JsonVocabularyStore.build_search_index and
+                JsonVocabularyStore._load_vocabulary, at each vocabulary
+                size (1k, 10k, 100k and 1M entries by default)
+    test-client WebhookServer's /callbacks and /api/vocabulary through
+                Flask's test client, at each concurrency level
+    socket      /api/vocabulary over a real local socket, served by
+                Flask (werkzeug) and by uvicorn in the async mode (skipped
+                when uvicorn is not installed), at each concurrency level
+
+The results are compared with a stored baseline (benchmarks/baseline.json
+by default). A result regresses when its p95 latency or peak RSS grows, or
+its throughput drops, by more than the tolerance; any regression is listed
+and the suite exits with status 1. Baselines are machine specific: record
+one with --save-baseline on the machine that runs the comparisons.
+
+Usage:
+    python benchmarks/suite.py [--quick] [--sizes 1000,10000]
+        [--concurrency 1,4,16] [--only vocabulary,socket]
+        [--output results.json] [--baseline PATH | --no-baseline]
+        [--tolerance 0.5] [--save-baseline]
+"""
+import argparse
+import http.client
+import importlib.util
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import socket
+import string
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+os.environ.setdefault("VAPI_API_KEY", "benchmark")
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+ROOT = BENCHMARK_DIR.parent
+DEFAULT_BASELINE = BENCHMARK_DIR / "baseline.json"
+
+SIZES = (1000, 10000, 100000, 1000000)
+QUICK_SIZES = (1000, 10000)
+CONCURRENCY = (1, 4, 16)
+CASES = ("vocabulary", "test-client", "socket")
+SOCKET_MODES = ("flask", "async")
+
+# Operations timed per vocabulary benchmark, and the number of requests
+# per webhook benchmark (split between the concurrent clients)
+VOCABULARY_OPERATIONS = 500
+LOAD_REPEATS = 3
+WEBHOOK_REQUESTS = 1000
+
+# Allowed relative change before a result counts as a regression
+DEFAULT_TOLERANCE = 0.5
+# Latency differences below this are noise, whatever the ratio
+LATENCY_NOISE_MS = 0.05
+
+LANGUAGE = "German"
+
+
+# Measurement helpers
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an ascending list"""
+    index = min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    """
+    Summarize timed operations
+
+    Args:
+        latencies: Latency of each operation in seconds
+        elapsed: Wall-clock time of all operations in seconds
+
+    Returns:
+        Dict with latency percentiles, throughput and peak RSS
+    """
+    ordered = sorted(latencies)
+    return {
+        "operations": len(ordered),
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 4),
+        "throughput_per_s": round(len(ordered) / elapsed, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def time_each(func: Callable[[int], Any], count: int) -> Dict[str, float]:
+    """Call func(i) count times and summarize the latencies"""
+    latencies = []
+    started = time.perf_counter()
+    for i in range(count):
+        began = time.perf_counter()
+        func(i)
+        latencies.append(time.perf_counter() - began)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def time_concurrently(func: Callable[[Any, int], Any], count: int,
+                      concurrency: int,
+                      setup: Optional[Callable[[], Any]] = None
+                      ) -> Dict[str, float]:
+    """
+    Call func from several threads and summarize the latencies
+
+    Args:
+        func: Called as func(state, i) where state is what setup returned
+              for the calling thread
+        count: Total number of calls, split between the threads
+        concurrency: Number of threads
+        setup: Optional per-thread setup (e.g. opening a connection)
+
+    Returns:
+        Summary of all calls
+    """
+    latencies: List[float] = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(concurrency + 1)
+    each = max(1, count // concurrency)
+
+    def worker():
+        state = setup() if setup else None
+        own = []
+        barrier.wait()
+        for i in range(each):
+            began = time.perf_counter()
+            func(state, i)
+            own.append(time.perf_counter() - began)
+        with lock:
+            latencies.extend(own)
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def random_word(rng: random.Random) -> str:
+    """Generate a random lowercase word"""
+    return "".join(rng.choice(string.ascii_lowercase)
+                   for _ in range(rng.randint(4, 12)))
+
+
+# Cases (each runs in its own process)
+
+def write_vocabulary(vocabulary_file: Path, size: int,
+                     rng: random.Random) -> List[str]:
+    """Write a snapshot with size entries and return the words"""
+    words = [random_word(rng) for _ in range(size)]
+    entries = [
+        {"word": word, "translation": random_word(rng),
+         "added_at": "2025-01-01T00:00:00", "review_count": 0,
+         "last_reviewed": None}
+        for word in words
+    ]
+    with open(vocabulary_file, "w", encoding="utf-8") as f:
+        json.dump({LANGUAGE: entries}, f, ensure_ascii=False)
+    return words
+
+
+def run_vocabulary(size: int, tmp: Path, **_) -> Dict[str, Dict]:
+    """Benchmark the vocabulary operations at one vocabulary size"""
+    from convolingo.tools.storage import JsonVocabularyStore
+    from convolingo.tools.vocabulary import VocabularyTool
+
+    rng = random.Random(size)
+    vocabulary_file = tmp / "vocabulary.json"
+    words = write_vocabulary(vocabulary_file, size, rng)
+    queries = [
+        word[start:start + 3]
+        for word in rng.sample(words, min(len(words), 100))
+        for start in (rng.randrange(len(word) - 2),)
+    ]
+
+    store = JsonVocabularyStore(vocabulary_file, build_index=False)
+    tool = VocabularyTool(store=store)
+    results = {}
+    tag = f"[n={size}]"
+
+    results["vocabulary.load" + tag] = time_each(
+        lambda i: store._load_vocabulary(), LOAD_REPEATS
+    )
+    results["vocabulary.list_words" + tag] = time_each(
+        lambda i: tool.list_words(LANGUAGE), VOCABULARY_OPERATIONS
+    )
+    results["vocabulary.search_index_build" + tag] = time_each(
+        lambda i: store.build_search_index(LANGUAGE), 1
+    )
+    results["vocabulary.search_word" + tag] = time_each(
+        lambda i: tool.search_word(LANGUAGE, queries[i % len(queries)]),
+        VOCABULARY_OPERATIONS
+    )
+    results["vocabulary.add_word" + tag] = time_each(
+        lambda i: tool.add_word(LANGUAGE, f"neu{i}", f"new{i}"),
+        VOCABULARY_OPERATIONS
+    )
+    tool.close()
+    return results
+
+
+def webhook_server(tmp: Path, size: int = 1000):
+    """Create a WebhookServer over a vocabulary of the given size"""
+    from convolingo.api.server import WebhookServer
+    from convolingo.tools.storage import JsonVocabularyStore
+    from convolingo.tools.vocabulary import VocabularyTool
+
+    vocabulary_file = tmp / "vocabulary.json"
+    write_vocabulary(vocabulary_file, size, random.Random(size))
+    return WebhookServer(VocabularyTool(
+        store=JsonVocabularyStore(vocabulary_file)
+    ))
+
+
+def request_bodies(server) -> Dict[str, Callable[[int], Dict]]:
+    """Request bodies by route: a tool-calls callback and a search"""
+    def callback(i: int) -> Dict:
+        return {"message": {"type": "tool-calls", "toolCallList": [{
+            "id": f"call-{i}",
+            "function": {"name": "manage_vocabulary", "arguments": {
+                "action": "add", "language": LANGUAGE,
+                "word": f"wort{i}", "translation": f"word{i}",
+            }},
+        }]}}
+
+    def vocabulary(i: int) -> Dict:
+        return {"arguments": {"action": "search", "language": LANGUAGE,
+                              "word": "abc"}}
+
+    return {"/callbacks": callback, "/api/vocabulary": vocabulary}
+
+
+def run_test_client(tmp: Path, concurrency: List[int],
+                    **_) -> Dict[str, Dict]:
+    """Benchmark the webhook routes through Flask's test client"""
+    server = webhook_server(tmp)
+    bodies = request_bodies(server)
+    results = {}
+    for route, body in bodies.items():
+        for level in concurrency:
+            def send(client, i, route=route, body=body):
+                response = client.post(route, json=body(i))
+                assert response.status_code == 200, response.status_code
+
+            results[f"webhook.test_client[route={route},"
+                    f"concurrency={level}]"] = time_concurrently(
+                send, WEBHOOK_REQUESTS, level,
+                setup=server.app.test_client
+            )
+    server.vocabulary_tool.close()
+    return results
+
+
+def start_socket_server(server, mode: str):
+    """Serve a WebhookServer on a free local port in a background thread"""
+    if mode == "flask":
+        from werkzeug.serving import make_server
+        http_server = make_server("127.0.0.1", 0, server.app, threaded=True)
+        threading.Thread(target=http_server.serve_forever,
+                         daemon=True).start()
+        return http_server.server_port, http_server.shutdown
+
+    from convolingo.api.asgi import create_app, create_server
+    http_server = create_server(create_app(server))
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM,
+                         socket.IPPROTO_TCP)
+    sock.bind(("127.0.0.1", 0))
+    thread = threading.Thread(
+        target=http_server.run, kwargs={"sockets": [sock]}, daemon=True
+    )
+    thread.start()
+    while not http_server.started:
+        time.sleep(0.01)
+
+    def stop():
+        http_server.should_exit = True
+        thread.join()
+
+    return sock.getsockname()[1], stop
+
+
+def run_socket(tmp: Path, mode: str, concurrency: List[int],
+               **_) -> Dict[str, Dict]:
+    """Benchmark /api/vocabulary over a real socket"""
+    server = webhook_server(tmp)
+    body = request_bodies(server)["/api/vocabulary"]
+    port, stop = start_socket_server(server, mode)
+    results = {}
+    for level in concurrency:
+        def send(connection, i):
+            connection.request(
+                "POST", "/api/vocabulary", body=json.dumps(body(i)),
+                headers={"Content-Type": "application/json"}
+            )
+            response = connection.getresponse()
+            response.read()
+            assert response.status == 200, response.status
+
+        results[f"webhook.socket[mode={mode},concurrency={level}]"] = (
+            time_concurrently(
+                send, WEBHOOK_REQUESTS, level,
+                setup=lambda: http.client.HTTPConnection(
+                    "127.0.0.1", port, timeout=30
+                )
+            )
+        )
+    stop()
+    server.vocabulary_tool.close()
+    return results
+
+
+CASE_RUNNERS = {
+    "vocabulary": run_vocabulary,
+    "test-client": run_test_client,
+    "socket": run_socket,
+}
+
+
+def run_case_here(case: str, params: Dict[str, Any]) -> None:
+    """Run one case in this process and print its results as JSON"""
+    from convolingo.utils.config import config
+
+    logging.basicConfig(level=logging.ERROR)
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep per-user vocabulary shards out of the history directory
+        config.history_dir = Path(tmp)
+        results = CASE_RUNNERS[case](tmp=Path(tmp), **params)
+    print(json.dumps(results))
+
+
+# Runner
+
+def run_case(case: str, params: Dict[str, Any]) -> Dict[str, Dict]:
+    """Run one case in a fresh interpreter and return its results"""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [str(ROOT), env.get("PYTHONPATH")])
+    )
+    result = subprocess.run(
+        [sys.executable, __file__, "--run-case", case, json.dumps(params)],
+        capture_output=True, text=True, env=env
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"benchmark case {case} {params} failed:\n"
+                           f"{result.stderr}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict],
+            tolerance: float) -> List[str]:
+    """
+    Compare results with a baseline
+
+    Args:
+        results: Results by benchmark name
+        baseline: Baseline results by benchmark name
+        tolerance: Allowed relative change
+
+    Returns:
+        A description of every regression
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        limit = 1 + tolerance
+        if (result["p95_ms"] > base["p95_ms"] * limit
+                and result["p95_ms"] - base["p95_ms"] > LATENCY_NOISE_MS):
+            regressions.append(
+                f"{name}: p95 {result['p95_ms']:.3f} ms "
+                f"(baseline {base['p95_ms']:.3f} ms)"
+            )
+        # Compare the time per operation too, for the same noise floor
+        op_ms = 1000 / max(result["throughput_per_s"], 1e-9)
+        base_op_ms = 1000 / max(base["throughput_per_s"], 1e-9)
+        if (result["throughput_per_s"] * limit < base["throughput_per_s"]
+                and op_ms - base_op_ms > LATENCY_NOISE_MS):
+            regressions.append(
+                f"{name}: throughput {result['throughput_per_s']:.0f}/s "
+                f"(baseline {base['throughput_per_s']:.0f}/s)"
+            )
+        if result["peak_rss_mb"] > base["peak_rss_mb"] * limit:
+            regressions.append(
+                f"{name}: peak RSS {result['peak_rss_mb']:.1f} MiB "
+                f"(baseline {base['peak_rss_mb']:.1f} MiB)"
+            )
+    return regressions
+
+
+def print_table(results: Dict[str, Dict], baseline: Dict[str, Dict]) -> None:
+    """Print the results, with the baseline p95 where there is one"""
+    print(f"{'benchmark':<58} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+          f"{'ops/s':>9} {'RSS MiB':>8} {'base p95':>9}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        base_p95 = f"{base['p95_ms']:9.3f}" if base else f"{'new':>9}"
+        print(f"{name:<58} {result['p50_ms']:9.3f} {result['p95_ms']:9.3f} "
+              f"{result['p99_ms']:9.3f} {result['throughput_per_s']:9.0f} "
+              f"{result['peak_rss_mb']:8.1f} {base_p95}")
+
+
+def parse_list(text: str) -> List[int]:
+    """Parse a comma-separated list of integers"""
+    return [int(item) for item in text.split(",") if item]
+
+
+def main() -> int:
+    if len(sys.argv) > 1 and sys.argv[1] == "--run-case":
+        run_case_here(sys.argv[2], json.loads(sys.argv[3]))
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--quick", action="store_true",
+                        help="Only the 1k and 10k vocabulary sizes")
+    parser.add_argument("--sizes", type=parse_list,
+                        help="Vocabulary sizes (comma-separated)")
+    parser.add_argument("--concurrency", type=parse_list,
+                        default=list(CONCURRENCY),
+                        help="Concurrency levels of the webhook benchmarks")
+    parser.add_argument("--only", type=lambda text: text.split(","),
+                        default=list(CASES),
+                        help=f"Cases to run (of: {', '.join(CASES)})")
+    parser.add_argument("--output", type=Path,
+                        help="Write the results as JSON to this file")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE,
+                        help="Baseline results to compare with")
+    parser.add_argument("--no-baseline", action="store_true",
+                        help="Do not compare with a baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative change before a regression")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store the results as the new baseline")
+    args = parser.parse_args()
+
+    unknown = set(args.only) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+
+    plan = []
+    if "vocabulary" in args.only:
+        plan += [("vocabulary", {"size": size}) for size in sizes]
+    if "test-client" in args.only:
+        plan.append(("test-client", {"concurrency": args.concurrency}))
+    if "socket" in args.only:
+        modes = list(SOCKET_MODES)
+        if importlib.util.find_spec("uvicorn") is None:
+            print("uvicorn is not installed; skipping the async socket "
+                  "case", file=sys.stderr)
+            modes.remove("async")
+        plan += [("socket", {"mode": mode, "concurrency": args.concurrency})
+                 for mode in modes]
+
+    results: Dict[str, Dict] = {}
+    for case, params in plan:
+        print(f"running {case} {json.dumps(params)}", file=sys.stderr)
+        results.update(run_case(case, params))
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+
+    baseline: Dict[str, Dict] = {}
+    if not args.no_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())["results"]
+    print_table(results, baseline)
+
+    if args.save_baseline:
+        # Keep baseline entries of cases that were not run this time
+        merged = dict(report, results={**baseline, **results})
+        args.baseline.write_text(json.dumps(merged, indent=2) + "\n")
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} REGRESSION(S) against {args.baseline} "
+              f"(tolerance {args.tolerance:.0%}):")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
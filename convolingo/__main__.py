@@ -1,17 +1,18 @@
 import argparse
+import os
 import sys
 import logging
 
-from convolingo.cli.interactive import InteractiveSession
-from convolingo.cli.session import Session
-from convolingo.cli.setup import SetupTool
 from convolingo.utils.logging_setup import configure_logging
 from convolingo.utils.config import (
-    DEFAULT_TARGET_LANGUAGE, DEFAULT_ORIGIN_LANGUAGE, DEFAULT_CHAPTER
+    DEFAULT_TARGET_LANGUAGE, DEFAULT_ORIGIN_LANGUAGE, DEFAULT_CHAPTER,
+    WEBHOOK_PORT, FLASK_MODE, SERVER_MODES, LOG_RATE_LIMITS,
+    COHORT_CONCURRENCY
 )
 
-# Configure logging
-configure_logging()
+# Configure logging: records are written by a background thread, and the
+# per-request messages of the webhook server are rate limited
+configure_logging(queued=True, rate_limits=LOG_RATE_LIMITS)
 logger = logging.getLogger(__name__)
 
 
@@ -47,6 +48,14 @@ def main():
         '--user-id', '-u',
         help='User ID for personalized learning experience'
     )
+    interactive_parser.add_argument(
+        '--persist-assistant',
+        action='store_true',
+        default=None,
+        help='Start the call with an assistant created once in VAPI '
+             '(reused while the configuration is unchanged) instead of '
+             'sending the configuration with every call'
+    )
     
     # Basic session command
     session_parser = subparsers.add_parser(
@@ -77,6 +86,14 @@ def main():
         type=int,
         help='Session duration in seconds (default: indefinite)'
     )
+    session_parser.add_argument(
+        '--persist-assistant',
+        action='store_true',
+        default=None,
+        help='Start the call with an assistant created once in VAPI '
+             '(reused while the configuration is unchanged) instead of '
+             'sending the configuration with every call'
+    )
     
     # Setup command
     setup_parser = subparsers.add_parser(
@@ -92,35 +109,170 @@ def main():
         '--tool-id',
         help='Use existing tool ID instead of creating a new one'
     )
+    setup_parser.add_argument(
+        '--refresh',
+        action='store_true',
+        help='Ignore the cached setup state and reconcile from scratch'
+    )
+    setup_parser.add_argument(
+        '--new-tunnel',
+        action='store_true',
+        help='Start a new ngrok tunnel even if one to the webhook port is running'
+    )
+    setup_parser.add_argument(
+        '--server-mode',
+        choices=SERVER_MODES,
+        default=FLASK_MODE,
+        help='Webhook server mode: Flask development server or asyncio '
+             '(default: flask)'
+    )
+    
+    # Serve command
+    serve_parser = subparsers.add_parser(
+        'serve', 
+        help='Run the webhook server with several worker processes'
+    )
+    serve_parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=os.cpu_count() or 1,
+        help='Number of worker processes (default: number of CPUs)'
+    )
+    serve_parser.add_argument(
+        '--host',
+        default='127.0.0.1',
+        help='Interface to listen on (default: 127.0.0.1)'
+    )
+    serve_parser.add_argument(
+        '--port', '-p',
+        type=int,
+        default=WEBHOOK_PORT,
+        help=f'Port to listen on (default: {WEBHOOK_PORT})'
+    )
+    serve_parser.add_argument(
+        '--server-mode',
+        choices=SERVER_MODES,
+        default=FLASK_MODE,
+        help='Server mode for each worker (default: flask)'
+    )
+    serve_parser.add_argument(
+        '--backend',
+        choices=('json', 'sqlite'),
+        help='Vocabulary storage backend; several workers need sqlite '
+             '(default: VOCABULARY_BACKEND from .env)'
+    )
+    
+    # Cohort command
+    cohort_parser = subparsers.add_parser(
+        'cohort',
+        help='Run many sessions at once from a spec file'
+    )
+    cohort_parser.add_argument(
+        'spec',
+        help='JSON file listing the sessions to run'
+    )
+    cohort_parser.add_argument(
+        '--concurrency', '-n',
+        type=int,
+        help='Maximum number of sessions at once '
+             f'(default: the spec\'s value, or {COHORT_CONCURRENCY})'
+    )
+    cohort_parser.add_argument(
+        '--output',
+        help='Write the session stats to this JSON file'
+    )
+    
+    # Stats command
+    stats_parser = subparsers.add_parser(
+        'stats',
+        help='Show how long sessions took to get ready'
+    )
+    stats_parser.add_argument(
+        '--last', '-n',
+        type=int,
+        help='Only include the most recent sessions'
+    )
+    stats_parser.add_argument(
+        '--transport',
+        help='Only include sessions run with this transport (vapi or fake)'
+    )
+    stats_parser.add_argument(
+        '--json',
+        action='store_true',
+        help='Print the summary as JSON'
+    )
     
     # Parse args
     args = parser.parse_args()
     
     # Run the appropriate command
     try:
+        client = None
+        if args.command in ('interactive', 'session'):
+            # Create the SDK client and build the assistant in the
+            # background while the session module and vocabulary load
+            from convolingo.api.client import VapiClient
+            client = VapiClient()
+            client.prewarm(
+                target_language=args.target,
+                native_language=args.origin,
+                chapter=getattr(args, 'chapter', DEFAULT_CHAPTER),
+                persist=getattr(args, 'persist_assistant', None)
+            )
+        
+        # Command modules are imported on demand to keep startup fast
         if args.command == 'interactive':
-            session = InteractiveSession()
+            from convolingo.cli.interactive import InteractiveSession
+            session = InteractiveSession(client)
             session.start(
                 target_language=args.target,
                 origin_language=args.origin,
                 chapter=getattr(args, 'chapter', DEFAULT_CHAPTER),
-                user_id=getattr(args, 'user_id', None)
+                user_id=getattr(args, 'user_id', None),
+                persist_assistant=getattr(args, 'persist_assistant', None)
             )
         elif args.command == 'session':
-            session = Session()
+            from convolingo.cli.session import Session
+            session = Session(client)
             session.start(
                 target_language=args.target,
                 origin_language=args.origin,
                 chapter=getattr(args, 'chapter', DEFAULT_CHAPTER),
                 user_id=getattr(args, 'user_id', None),
-                duration=getattr(args, 'duration', None)
+                duration=getattr(args, 'duration', None),
+                persist_assistant=getattr(args, 'persist_assistant', None)
             )
         elif args.command == 'setup':
+            from convolingo.cli.setup import SetupTool
             setup = SetupTool()
             setup.run_setup(
                 not getattr(args, 'no_server', False),
-                getattr(args, 'tool_id', None)
+                getattr(args, 'tool_id', None),
+                server_mode=getattr(args, 'server_mode', FLASK_MODE),
+                refresh=getattr(args, 'refresh', False),
+                adopt_tunnel=not getattr(args, 'new_tunnel', False)
+            )
+        elif args.command == 'serve':
+            from convolingo.api.prefork import PreforkServer
+            server = PreforkServer(
+                workers=args.workers,
+                host=args.host,
+                port=args.port,
+                mode=args.server_mode,
+                backend=args.backend
+            )
+            server.run()
+        elif args.command == 'stats':
+            from convolingo.cli.stats import SessionStats
+            SessionStats().report(
+                last=args.last, transport=args.transport, as_json=args.json
             )
+        elif args.command == 'cohort':
+            from convolingo.cli.cohort import Cohort
+            cohort = Cohort()
+            if not cohort.start(args.spec, concurrency=args.concurrency,
+                                output=args.output):
+                sys.exit(1)
         else:
             # If no command provided, show help
             parser.print_help()
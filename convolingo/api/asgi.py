@@ -0,0 +1,237 @@
+import asyncio
+import logging
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from typing import Dict, Any, Callable, Optional, Tuple
+
+from convolingo.utils.config import WEBHOOK_PORT
+from convolingo.api.server import WebhookServer, HOME_PAGE
+from convolingo.utils.metrics import metrics, CONTENT_TYPE
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Seconds uvicorn keeps an idle keep-alive connection open
+KEEP_ALIVE_TIMEOUT = 75
+
+HOME_PAGE_BYTES = HOME_PAGE.encode("utf-8")
+METRICS_CONTENT_TYPE = CONTENT_TYPE.encode("ascii")
+
+# Routes whose requests are recorded in the metrics
+TRACKED_ROUTES = frozenset({"/callbacks", "/api/vocabulary"})
+
+
+class AsgiWebhookApp:
+    """
+    ASGI application exposing the WebhookServer routes
+
+    Serves the same routes as the Flask app (``/callbacks``,
+    ``/api/vocabulary``, ``/metrics`` and ``/``) on an asyncio event loop. Handlers that
+    touch vocabulary storage run in a thread pool so a slow save never
+    stalls other requests on the loop. Works with any ASGI server; ``serve``
+    runs it under uvicorn.
+    """
+
+    def __init__(self, server: WebhookServer, max_workers: int = 32):
+        """
+        Initialize the ASGI app
+
+        Args:
+            server: The WebhookServer whose handlers to expose
+            max_workers: Size of the thread pool for blocking work
+        """
+        self.server = server
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="webhook-worker"
+        )
+        # (method, path) -> (handler, run in thread pool)
+        self.routes: Dict[Tuple[str, str], Tuple[Callable, bool]] = {
+            ("POST", "/callbacks"): (server.process_callback, True),
+            ("POST", "/api/vocabulary"): (server.process_vocabulary, True),
+            ("POST", "/"): (server.process_root_post, False),
+        }
+
+    async def __call__(self, scope: Dict[str, Any],
+                       receive: Callable, send: Callable) -> None:
+        """Handle one ASGI connection scope"""
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method = scope["method"]
+        path = scope["path"]
+
+        if method == "GET" and path == "/":
+            await self._respond(send, 200, HOME_PAGE_BYTES,
+                                b"text/html; charset=utf-8")
+            return
+
+        if method == "GET" and path == "/metrics":
+            await self._respond(send, 200, metrics.render().encode("utf-8"),
+                                METRICS_CONTENT_TYPE)
+            return
+
+        route = self.routes.get((method, path))
+        if route is None:
+            allowed = any(p == path for _, p in self.routes)
+            status = 405 if allowed else 404
+            await self._respond_json(
+                send, {"success": False, "error": HTTPStatus(status).phrase},
+                status
+            )
+            return
+
+        tracked = path in TRACKED_ROUTES
+        if tracked:
+            started = self.server.request_started()
+        status = 500
+        try:
+            body = await self._read_body(receive)
+            try:
+                data = json.loads(body) if body else None
+            except ValueError:
+                data = None
+
+            handler, blocking = route
+            if blocking:
+                loop = asyncio.get_running_loop()
+                payload, status = await loop.run_in_executor(
+                    self.executor, handler, data
+                )
+            else:
+                payload, status = handler(data)
+            await self._respond_json(send, payload, status)
+        finally:
+            if tracked:
+                self.server.request_finished(path, started, status)
+
+    async def _lifespan(self, receive: Callable, send: Callable) -> None:
+        """Acknowledge ASGI lifespan events"""
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    async def _read_body(receive: Callable) -> bytes:
+        """Read the full request body"""
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+        return b"".join(chunks)
+
+    async def _respond_json(self, send: Callable,
+                            payload: Dict[str, Any], status: int) -> None:
+        """Send a JSON response"""
+        await self._respond(send, status, json.dumps(payload).encode("utf-8"),
+                            b"application/json")
+
+    @staticmethod
+    async def _respond(send: Callable, status: int, body: bytes,
+                       content_type: bytes) -> None:
+        """Send a complete response"""
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", content_type),
+                (b"content-length", str(len(body)).encode("ascii")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def create_app(server: Optional[WebhookServer] = None,
+               max_workers: int = 32) -> AsgiWebhookApp:
+    """
+    Create the ASGI app, e.g. for ``uvicorn --factory``
+
+    Args:
+        server: Optional WebhookServer (default: a new one)
+        max_workers: Size of the thread pool for blocking work
+
+    Returns:
+        The ASGI application
+    """
+    if server is None:
+        server = WebhookServer()
+    return AsgiWebhookApp(server, max_workers=max_workers)
+
+
+def import_uvicorn():
+    """
+    Import uvicorn, which the async serving mode runs under
+
+    Returns:
+        The uvicorn module
+
+    Raises:
+        RuntimeError: If uvicorn is not installed
+    """
+    try:
+        import uvicorn
+    except ImportError:
+        raise RuntimeError(
+            "The async server mode needs uvicorn; install it with "
+            "pip install -e \".[async]\" or use --server-mode flask"
+        ) from None
+    return uvicorn
+
+
+def create_server(app: AsgiWebhookApp, host: str = "127.0.0.1",
+                  port: int = WEBHOOK_PORT):
+    """
+    Create a uvicorn server for the ASGI app
+
+    Args:
+        app: The ASGI application
+        host: Interface to bind to
+        port: Port to listen on
+
+    Returns:
+        uvicorn.Server: The server; run it, or serve on its event loop
+
+    Raises:
+        RuntimeError: If uvicorn is not installed
+    """
+    uvicorn = import_uvicorn()
+    return uvicorn.Server(uvicorn.Config(
+        app, host=host, port=port, log_level="warning",
+        timeout_keep_alive=KEEP_ALIVE_TIMEOUT
+    ))
+
+
+def serve(server: WebhookServer, host: str = "127.0.0.1",
+          port: int = WEBHOOK_PORT,
+          max_workers: int = 32, sock=None) -> None:
+    """
+    Serve a WebhookServer under uvicorn until interrupted
+
+    Args:
+        server: The WebhookServer whose handlers to expose
+        host: Interface to bind to
+        port: Port to listen on
+        max_workers: Size of the thread pool for blocking work
+        sock: Optional already bound socket to serve on
+
+    Raises:
+        RuntimeError: If uvicorn is not installed
+    """
+    app = create_app(server, max_workers=max_workers)
+    try:
+        create_server(app, host=host, port=port).run(
+            sockets=[sock] if sock is not None else None
+        )
+    finally:
+        app.executor.shutdown(wait=False)
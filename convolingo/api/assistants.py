@@ -0,0 +1,384 @@
+import hashlib
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from convolingo.utils.config import (
+    ASSISTANT_CONFIG_CACHE_SIZE, DEFAULT_ASSISTANT_PROFILE,
+    DEFAULT_SYSTEM_PROMPT
+)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# System prompt of the language learning assistant, without the blank
+# lines around the triple-quoted config constant
+SYSTEM_PROMPT_TEMPLATE = DEFAULT_SYSTEM_PROMPT.strip("\n")
+
+# Model, voice and transcriber settings by profile name
+ASSISTANT_PROFILES: Dict[str, Dict[str, Any]] = {
+    DEFAULT_ASSISTANT_PROFILE: {
+        "model": {
+            "model": "gpt-3.5-turbo",
+            "provider": "openai",
+            "temperature": 0.7
+        },
+        "voice": {
+            "model": "eleven_multilingual_v2",
+            "voiceId": "S9EGwlCtMF7VXtENq79v",
+            "provider": "11labs",
+            "stability": 0.5,
+            "similarityBoost": 0.75
+        },
+        "transcriber": {
+            "model": "nova-3",
+            "language": "en-US",
+            "provider": "deepgram"
+        }
+    }
+}
+
+AssistantKey = Tuple[str, str, str, str]
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict
+
+    Still a dict, so it serializes to JSON and can be passed to the SDK as
+    is, but any attempt to change it raises TypeError.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("assistant configurations are read-only")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+
+def freeze(value: Any) -> Any:
+    """
+    Make a JSON-like value read-only
+
+    Args:
+        value: Dicts, lists and scalars
+
+    Returns:
+        The value with dicts as FrozenDicts and lists as tuples
+    """
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def config_hash(assistant: Mapping[str, Any]) -> str:
+    """
+    Hash an assistant configuration
+
+    The hash of a FrozenDict is computed once and remembered on it.
+
+    Args:
+        assistant: The assistant configuration
+
+    Returns:
+        Hex digest of the canonical JSON of the configuration
+    """
+    digest = getattr(assistant, "config_hash", None)
+    if digest is None:
+        canonical = json.dumps(assistant, sort_keys=True,
+                               separators=(",", ":"), ensure_ascii=False)
+        digest = hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+        if isinstance(assistant, FrozenDict):
+            assistant.config_hash = digest
+    return digest
+
+
+def build_assistant_config(target_language: str, native_language: str,
+                           chapter: str,
+                           profile: str = DEFAULT_ASSISTANT_PROFILE
+                           ) -> FrozenDict:
+    """
+    Build the assistant configuration for a lesson
+
+    Args:
+        target_language: The language to learn
+        native_language: The user's native language
+        chapter: The current chapter or module being studied
+        profile: Name of the model, voice and transcriber profile
+
+    Returns:
+        The read-only assistant configuration
+    """
+    try:
+        settings = ASSISTANT_PROFILES[profile]
+    except KeyError:
+        raise ValueError(
+            f"Unknown assistant profile '{profile}' "
+            f"(expected one of: {', '.join(ASSISTANT_PROFILES)})"
+        ) from None
+
+    system_prompt = SYSTEM_PROMPT_TEMPLATE.format(
+        native_language=native_language,
+        target_language=target_language,
+        chapter=chapter
+    )
+    assistant = {
+        "model": dict(settings["model"], messages=[
+            {"role": "system", "content": system_prompt}
+        ]),
+        "voice": settings["voice"],
+        "transcriber": settings["transcriber"]
+    }
+    return freeze(assistant)
+
+
+class AssistantConfigCache:
+    """
+    Bounded LRU cache of prebuilt assistant configurations
+
+    Configurations are keyed by (target language, native language,
+    chapter, profile) and built once; later lookups return the same
+    read-only object, so reconnecting with the same lesson does not format
+    the prompt or rebuild the nested dicts again.
+    """
+
+    def __init__(self, capacity: int = ASSISTANT_CONFIG_CACHE_SIZE):
+        """
+        Initialize the cache
+
+        Args:
+            capacity: Maximum number of configurations kept
+        """
+        self.capacity = capacity
+        self._configs: "OrderedDict[AssistantKey, FrozenDict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, target_language: str, native_language: str, chapter: str,
+            profile: str = DEFAULT_ASSISTANT_PROFILE) -> FrozenDict:
+        """
+        Get the configuration of a lesson, building it on first use
+
+        Args:
+            target_language: The language to learn
+            native_language: The user's native language
+            chapter: The current chapter or module being studied
+            profile: Name of the model, voice and transcriber profile
+
+        Returns:
+            The read-only assistant configuration
+        """
+        key = (target_language, native_language, chapter, profile)
+        with self._lock:
+            assistant = self._configs.get(key)
+            if assistant is not None:
+                self._configs.move_to_end(key)
+                self.hits += 1
+                return assistant
+            self.misses += 1
+
+        # Build outside the lock; a concurrent miss builds an equal config
+        assistant = build_assistant_config(
+            target_language, native_language, chapter, profile
+        )
+        with self._lock:
+            self._configs[key] = assistant
+            self._configs.move_to_end(key)
+            while len(self._configs) > self.capacity:
+                self._configs.popitem(last=False)
+        return assistant
+
+    def clear(self) -> None:
+        """Drop all cached configurations"""
+        with self._lock:
+            self._configs.clear()
+
+    def __len__(self) -> int:
+        return len(self._configs)
+
+
+_shared_cache: Optional[AssistantConfigCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_assistant_cache() -> AssistantConfigCache:
+    """
+    Get the process-wide shared configuration cache, creating it on first use
+
+    Returns:
+        The shared AssistantConfigCache
+    """
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = AssistantConfigCache()
+    return _shared_cache
+
+
+def with_user(assistant: Mapping[str, Any],
+              user_id: Optional[str]) -> Mapping[str, Any]:
+    """
+    Add a user ID to an assistant configuration
+
+    Args:
+        assistant: The shared assistant configuration
+        user_id: Optional user ID
+
+    Returns:
+        The configuration itself without a user ID, otherwise a shallow
+        copy carrying it
+    """
+    if not user_id:
+        return assistant
+    return FrozenDict(assistant, userId=user_id)
+
+
+def user_overrides(user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Build the assistant overrides carrying a user ID
+
+    Persisted assistants are shared by all users, so the user ID goes into
+    the call's assistant metadata instead of the assistant itself.
+
+    Args:
+        user_id: Optional user ID
+
+    Returns:
+        The overrides, or None without a user ID
+    """
+    if not user_id:
+        return None
+    return {"metadata": {"userId": user_id}}
+
+
+class AssistantRegistry:
+    """
+    Assistants created in VAPI once per distinct configuration
+
+    Creates an assistant through the REST API the first time a
+    configuration is used and remembers its ID in the setup state, keyed by
+    the configuration's hash. Later calls with the same configuration are
+    started by ID, so they no longer send the configuration (chapter text
+    included); a changed configuration gets a new assistant.
+    """
+
+    def __init__(self, state, rest):
+        """
+        Initialize the registry
+
+        Args:
+            state: SetupState recording the created assistants
+            rest: VapiRestClient used to create them
+        """
+        self.state = state
+        self.rest = rest
+        self._lock = threading.Lock()
+
+    def assistant_id(self, assistant: Mapping[str, Any]) -> Optional[str]:
+        """
+        Get the ID of the assistant for a configuration, creating it if needed
+
+        Args:
+            assistant: The assistant configuration
+
+        Returns:
+            The assistant ID, or None if it could not be created
+        """
+        digest = config_hash(assistant)
+        assistant_id = self.state.persisted_assistant(digest)
+        if assistant_id:
+            return assistant_id
+
+        # One creation per configuration, even with concurrent connects
+        with self._lock:
+            assistant_id = self.state.persisted_assistant(digest)
+            if assistant_id:
+                return assistant_id
+            try:
+                response = self.rest.post(
+                    "/assistant",
+                    json=dict(assistant, name=f"ConvoLingo {digest[:12]}")
+                )
+            except Exception as e:
+                logger.error(f"Error creating assistant: {e}")
+                return None
+            if response.status_code not in (200, 201):
+                logger.error(
+                    f"Failed to create assistant: {response.status_code} "
+                    f"{response.text}"
+                )
+                return None
+
+            assistant_id = response.json().get("id")
+            if not assistant_id:
+                logger.error("Assistant created without an ID in the response")
+                return None
+            self.state.set_persisted_assistant(digest, assistant_id)
+            logger.info(f"Created assistant {assistant_id} for configuration "
+                        f"{digest[:12]}")
+            return assistant_id
+
+    def is_deleted(self, assistant_id: str) -> bool:
+        """
+        Check whether an assistant no longer exists in VAPI
+
+        Args:
+            assistant_id: The assistant ID
+
+        Returns:
+            bool: True only if VAPI answers 404 for the assistant; errors
+            and other answers count as still existing
+        """
+        try:
+            response = self.rest.get(f"/assistant/{assistant_id}")
+        except Exception as e:
+            logger.warning(f"Could not look up assistant {assistant_id}: {e}")
+            return False
+        return response.status_code == 404
+
+    def forget(self, assistant: Mapping[str, Any]) -> None:
+        """
+        Forget the assistant of a configuration, e.g. after it was deleted
+
+        Args:
+            assistant: The assistant configuration
+        """
+        self.state.forget_persisted_assistant(config_hash(assistant))
+
+
+_shared_registry: Optional[AssistantRegistry] = None
+
+
+def get_assistant_registry() -> AssistantRegistry:
+    """
+    Get the process-wide shared assistant registry, creating it on first use
+
+    Returns:
+        The shared AssistantRegistry for the configured account
+    """
+    global _shared_registry
+    if _shared_registry is None:
+        with _shared_lock:
+            if _shared_registry is None:
+                # Imported here to keep requests off the connect-free paths
+                from convolingo.api.rest import get_rest_client
+                from convolingo.utils.config import config
+                from convolingo.utils.setup_state import (
+                    SetupState, SETUP_STATE_FILE_NAME
+                )
+                state = SetupState(
+                    config.history_dir / SETUP_STATE_FILE_NAME,
+                    config.api_key, config.api_base
+                )
+                _shared_registry = AssistantRegistry(state, get_rest_client())
+    return _shared_registry
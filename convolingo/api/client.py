@@ -1,56 +1,130 @@
-import time
 import logging
-import requests
-from typing import Callable, Optional
+import signal
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Mapping, Optional
 
-from vapi_python import Vapi
 from convolingo.utils.config import (
     config, DEFAULT_TARGET_LANGUAGE, 
-    DEFAULT_ORIGIN_LANGUAGE, DEFAULT_CHAPTER
+    DEFAULT_ORIGIN_LANGUAGE, DEFAULT_CHAPTER, DEFAULT_ASSISTANT_PROFILE
+)
+from convolingo.api.assistants import (
+    AssistantConfigCache, AssistantRegistry, get_assistant_cache,
+    get_assistant_registry, user_overrides, with_user
+)
+from convolingo.api.transport import Transport, create_transport
+from convolingo.tools.schema import (
+    TOOL_NAME, TOOL_DESCRIPTION, TOOL_PARAMETERS
+)
+from convolingo.utils.telemetry import (
+    SessionTimings, append_session_stats, SESSION_STATS_FILE_NAME,
+    ASSISTANT_BUILD_PHASE, START_PHASE, FIRST_MESSAGE_PHASE
 )
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Constants for vocabulary tool creation
-TOOL_NAME = 'vocabularyTool'
-TOOL_DESCRIPTION = 'Tool to add, review and search vocabulary words'
-TOOL_PARAMETERS = {
-    "type": "object",
-    "required": ["action"],
-    "properties": {
-        "word": {
-            "type": "string",
-            "description": "The vocabulary word to add or search for"
-        },
-        "action": {
-            "type": "string",
-            "description": "The action to perform (add, list, search)"
-        },
-        "language": {
-            "type": "string",
-            "description": "The language the word is in"
-        },
-        "translation": {
-            "type": "string",
-            "description": "The translation of the word"
-        },
-        "notes": {
-            "type": "string",
-            "description": "Additional notes about the word"
-        }
-    }
-}
-
 
 class VapiClient:
     """Client for interacting with the VAPI service"""
     
-    def __init__(self):
-        """Initialize the VAPI client"""
-        self.client = None
+    def __init__(self, config_cache: Optional[AssistantConfigCache] = None,
+                 registry: Optional[AssistantRegistry] = None,
+                 transport: Optional[Transport] = None):
+        """
+        Initialize the VAPI client
+        
+        Args:
+            config_cache: Optional cache of assistant configurations
+                          (default: the one shared by all clients)
+            registry: Optional registry of persisted assistants (default:
+                      the shared one, created when first needed)
+            transport: Optional transport running the calls (default: the
+                       VAPI_TRANSPORT setting, created on the first connect
+                       and reused afterwards)
+        """
+        self.client: Optional[Transport] = None
+        self.transport = transport
+        if config_cache is None:
+            config_cache = get_assistant_cache()
+        self.config_cache = config_cache
+        self.registry = registry
         self.is_connected = False
         self.vocabulary_tool_id = None
+        # Set by anything that ends the session: user input, signals,
+        # timers or the SDK noticing the call ended
+        self.stop_event = threading.Event()
+        # Phase timings of the current session, written to the session
+        # stats file when it ends
+        self.timings: Optional[SessionTimings] = None
+        self._prewarm_thread: Optional[threading.Thread] = None
+    
+    def prewarm(
+        self,
+        target_language: str = DEFAULT_TARGET_LANGUAGE,
+        native_language: str = DEFAULT_ORIGIN_LANGUAGE,
+        chapter: str = DEFAULT_CHAPTER,
+        profile: str = DEFAULT_ASSISTANT_PROFILE,
+        persist: Optional[bool] = None,
+    ) -> threading.Thread:
+        """
+        Get ready for connect in the background
+        
+        Imports and creates the transport, builds the assistant
+        configuration and, for persisted assistants, looks up or creates
+        the assistant, while the caller carries on (parsing arguments,
+        loading the vocabulary). connect waits for it to finish. The
+        session's time to ready is measured from here.
+        
+        Args:
+            target_language: The language to learn
+            native_language: The user's native language
+            chapter: The current chapter or module being studied
+            profile: Name of the model, voice and transcriber profile
+            persist: Whether the call will use a persisted assistant
+                     (default: the VAPI_PERSIST_ASSISTANTS setting)
+            
+        Returns:
+            The background thread
+        """
+        self.timings = SessionTimings()
+        self._prewarm_thread = threading.Thread(
+            target=self._prewarm,
+            args=(target_language, native_language, chapter, profile,
+                  persist),
+            name="vapi-prewarm",
+            daemon=True
+        )
+        self._prewarm_thread.start()
+        return self._prewarm_thread
+    
+    def _prewarm(self, target_language: str, native_language: str,
+                 chapter: str, profile: str, persist: Optional[bool]) -> None:
+        """Do the work of connect that does not start the call"""
+        try:
+            self._ensure_transport()
+            with self.timings.phase(ASSISTANT_BUILD_PHASE):
+                assistant = self.config_cache.get(
+                    target_language, native_language, chapter, profile
+                )
+            if persist is None:
+                persist = config.persist_assistants
+            if persist:
+                if self.registry is None:
+                    self.registry = get_assistant_registry()
+                self.registry.assistant_id(assistant)
+        except Exception as e:
+            # connect does the same work again and reports the error
+            logger.warning("Pre-warming failed: %s", e)
+    
+    def _ensure_transport(self) -> None:
+        """Create the transport unless an earlier connect already did"""
+        if self.transport is None:
+            self.transport = create_transport(
+                config.transport, api_key=config.api_key,
+                timings=self.timings
+            )
     
     def _create_vocabulary_tool(self) -> Optional[str]:
         """
@@ -60,10 +134,7 @@ class VapiClient:
             str: Tool ID if successful, None otherwise
         """
         try:
-            headers = {
-                "Authorization": f"Bearer {config.api_key}",
-                "Content-Type": "application/json"
-            }
+            from convolingo.api.rest import get_rest_client
             
             # Create the tool - note the correct endpoint is /tool (singular)
             payload = {
@@ -75,9 +146,8 @@ class VapiClient:
                 }
             }
             
-            response = requests.post(
-                f"{config.api_base}/tool",  # Fixed endpoint from /tools to /tool
-                headers=headers,
+            response = get_rest_client().post(
+                "/tool",  # Fixed endpoint from /tools to /tool
                 json=payload
             )
             
@@ -103,6 +173,8 @@ class VapiClient:
         native_language: str = DEFAULT_ORIGIN_LANGUAGE,
         chapter: str = DEFAULT_CHAPTER,
         user_id: Optional[str] = None,
+        profile: str = DEFAULT_ASSISTANT_PROFILE,
+        persist: Optional[bool] = None,
     ) -> bool:
         """
         Connect to the VAPI service
@@ -112,82 +184,166 @@ class VapiClient:
             native_language: The user's native language
             chapter: The current chapter or module being studied
             user_id: Optional user ID for personalization
+            profile: Name of the model, voice and transcriber profile
+            persist: Whether to start the call with an assistant created
+                     once in VAPI (default: the VAPI_PERSIST_ASSISTANTS
+                     setting) instead of sending the configuration inline
             
         Returns:
             bool: True if connection successful, False otherwise
         """
+        if self._prewarm_thread is not None:
+            self._prewarm_thread.join()
+            self._prewarm_thread = None
+        if self.timings is None:
+            self.timings = SessionTimings()
+        
         try:
-            # Initialize VAPI client
-            self.client = Vapi(api_key=config.api_key)
+            # Reuse the transport of earlier connects
+            self._ensure_transport()
+            
+            self.stop_event.clear()
+            self.client = self.transport
             
             # Log the configuration being sent
             logger.info(
-                f"Connecting with: target={target_language}, "
-                f"native={native_language}, chapter='{chapter[:30]}...'"
+                "Connecting with: target=%s, native=%s, chapter='%.30s...'",
+                target_language, native_language, chapter
             )
             
-            # Create the system prompt with the dynamic variables
-            system_prompt = (
-                "You are a language learning teaching assistant named Emma.\n"
-                "You will begin a lesson plan starting in {native_language} "
-                "and begin role playing speaking in {target_language}.\n\n"
-                "native_language = \"{native_language}\"\n"
-                "target_language = \"{target_language}\"\n\n"
-                "{chapter}"
-            ).format(
-                native_language=native_language,
-                target_language=target_language,
-                chapter=chapter
+            # Prebuilt configuration of this lesson, shared between connects
+            began = time.perf_counter()
+            assistant = self.config_cache.get(
+                target_language, native_language, chapter, profile
             )
+            built = time.perf_counter()
             
-            # Create a custom assistant configuration
-            assistant = {
-                "model": {
-                    "model": "gpt-3.5-turbo", 
-                    "provider": "openai",
-                    "temperature": 0.7,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": system_prompt
-                        }
-                    ]
-                },
-                "voice": {
-                    "model": "eleven_multilingual_v2",
-                    "voiceId": "S9EGwlCtMF7VXtENq79v",
-                    "provider": "11labs",
-                    "stability": 0.5,
-                    "similarityBoost": 0.75
-                },
-                "transcriber": {
-                    "model": "nova-3",
-                    "language": "en-US",
-                    "provider": "deepgram"
-                }
-            }
-            
-            # Add user ID if provided
-            if user_id:
-                assistant["userId"] = user_id
-            
-            # Use the assistant directly
-            self.client.start(assistant=assistant)
-            logger.info(f"Created custom assistant with chapter: {chapter}")
+            if persist is None:
+                persist = config.persist_assistants
+            if not (persist and self._start_persisted(assistant, user_id)):
+                # Send the assistant configuration with the call
+                self.client.start(assistant=with_user(assistant, user_id))
+                logger.info(
+                    "Created custom assistant with chapter: %s", chapter
+                )
+            self._watch_call_end()
             
             self.is_connected = True
+            self.timings.record(ASSISTANT_BUILD_PHASE, built - began)
+            self.timings.record(START_PHASE, time.perf_counter() - built)
+            self.timings.mark_ready()
             logger.info(
-                f"Connected to VAPI assistant for {target_language} learning"
+                "Connected to VAPI assistant for %s learning", target_language
             )
             return True
             
         except Exception as e:
             logger.error(f"Error connecting to VAPI: {e}")
             self.is_connected = False
+            self._save_timings(ok=False)
             return False
     
+    def _save_timings(self, ok: bool) -> None:
+        """
+        Append the current session's phase timings to the stats file
+        
+        Args:
+            ok: Whether the call was started
+        """
+        timings, self.timings = self.timings, None
+        if timings is None:
+            return
+        transport = getattr(self.transport, "name", None) or config.transport
+        append_session_stats(
+            config.history_dir / SESSION_STATS_FILE_NAME,
+            timings.to_record(transport, ok)
+        )
+    
+    def _start_persisted(self, assistant: Mapping[str, Any],
+                         user_id: Optional[str]) -> bool:
+        """
+        Start the call with the persisted assistant of a configuration
+        
+        If starting by ID fails and VAPI confirms the assistant was deleted
+        (404), it is forgotten and created again once. Any other failure
+        keeps the ID and falls back to an inline assistant for this call,
+        so transient errors do not create new assistants.
+        
+        Args:
+            assistant: The assistant configuration
+            user_id: Optional user ID, sent as an assistant override
+            
+        Returns:
+            bool: True if the call was started, False to fall back to an
+            inline assistant
+        """
+        if self.registry is None:
+            self.registry = get_assistant_registry()
+        overrides = user_overrides(user_id)
+        
+        for attempt in range(2):
+            assistant_id = self.registry.assistant_id(assistant)
+            if not assistant_id:
+                return False
+            try:
+                self.client.start(
+                    assistant_id=assistant_id, assistant_overrides=overrides
+                )
+                logger.info("Started call with assistant %s", assistant_id)
+                return True
+            except Exception as e:
+                logger.warning(
+                    "Could not start a call with assistant %s: %s",
+                    assistant_id, e
+                )
+                if not self.registry.is_deleted(assistant_id):
+                    return False
+                self.registry.forget(assistant)
+        return False
+    
+    def _watch_call_end(self) -> None:
+        """Stop the session when the call ends on its own"""
+        self.client.on_call_end(lambda: self.request_stop("call ended"))
+    
+    def request_stop(self, reason: Optional[str] = None) -> None:
+        """
+        Ask the session to end; safe to call from any thread
+        
+        Args:
+            reason: Optional reason for the log
+        """
+        if not self.stop_event.is_set():
+            logger.debug(f"Stop requested: {reason or 'no reason given'}")
+            self.stop_event.set()
+    
+    @contextmanager
+    def stop_on_signals(self) -> Iterator[None]:
+        """
+        Turn SIGINT and SIGTERM into stop requests while the block runs
+        
+        Only has an effect in the main thread, where signal handlers can be
+        installed.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            yield
+            return
+        
+        previous = {}
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            previous[sig] = signal.signal(
+                sig, lambda signum, frame: self.request_stop(
+                    signal.Signals(signum).name
+                )
+            )
+        try:
+            yield
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+    
     def disconnect(self) -> None:
         """Disconnect from the VAPI service"""
+        self.request_stop("disconnect")
         if self.client and self.is_connected:
             try:
                 self.client.stop()
@@ -197,6 +353,7 @@ class VapiClient:
             finally:
                 self.is_connected = False
                 self.client = None
+                self._save_timings(ok=True)
     
     def send_message(self, text: str) -> bool:
         """
@@ -213,32 +370,30 @@ class VapiClient:
             return False
             
         try:
-            # VAPI SDK method to send text
-            # The exact method name may vary based on the SDK version
-            # Try different methods that might be available
-            if hasattr(self.client, 'send_text'):
-                self.client.send_text(text)
-            elif hasattr(self.client, 'user_message'):
-                self.client.user_message(text)
+            if self.timings is not None and \
+                    FIRST_MESSAGE_PHASE not in self.timings.seconds:
+                with self.timings.phase(FIRST_MESSAGE_PHASE):
+                    self.client.send(text)
             else:
-                # Fallback - this might be the most recent one
-                self.client.message(text)
+                self.client.send(text)
             return True
         except Exception as e:
             logger.error(f"Error sending message to VAPI: {e}")
             return False
     
-    def maintain_connection(self, should_continue: Callable[[], bool]) -> None:
+    def maintain_connection(self, timeout: Optional[float] = None) -> None:
         """
-        Keep the connection alive until should_continue returns False
+        Keep the connection alive until a stop is requested
+        
+        Blocks on the stop event without waking up in between, so the
+        connection is closed as soon as request_stop is called.
         
         Args:
-            should_continue: Function that returns False when connection 
-                             should end
+            timeout: Optional maximum number of seconds to stay connected
         """
         try:
-            while should_continue() and self.is_connected:
-                time.sleep(0.5)
+            if self.is_connected:
+                self.stop_event.wait(timeout)
         except Exception as e:
             logger.error(f"Error maintaining connection: {e}")
         finally:
@@ -0,0 +1,273 @@
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from convolingo.utils.config import (
+    OUTBOUND_QUEUE_SIZE, OUTBOUND_COALESCE_SECONDS, OUTBOUND_MAX_LINES,
+    OUTBOUND_MAX_RETRIES, OUTBOUND_RETRY_DELAY
+)
+from convolingo.utils.telemetry import percentile
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Number of recent sends kept for the latency percentiles
+LATENCY_SAMPLES = 1000
+
+
+class OutboundQueue:
+    """
+    Bounded queue of outgoing messages, sent by a background worker
+
+    Lets a session hand its messages off without waiting for the SDK. The
+    worker joins lines queued in quick succession (within
+    ``coalesce_window`` seconds, at most ``max_lines``) into one message,
+    and retries failed sends with exponential backoff. When the queue is
+    full, put blocks until there is room instead of dropping the line.
+
+    Works with any send function returning True on success, such as
+    VapiClient.send_message.
+    """
+
+    def __init__(self, send: Callable[[str], bool],
+                 capacity: int = OUTBOUND_QUEUE_SIZE,
+                 coalesce_window: float = OUTBOUND_COALESCE_SECONDS,
+                 max_lines: int = OUTBOUND_MAX_LINES,
+                 max_retries: int = OUTBOUND_MAX_RETRIES,
+                 retry_delay: float = OUTBOUND_RETRY_DELAY,
+                 on_failed: Optional[Callable[[str], None]] = None):
+        """
+        Initialize the queue and start its worker
+
+        Args:
+            send: Sends one message, returning True on success
+            capacity: Maximum number of queued lines
+            coalesce_window: Seconds to wait for more lines to join into
+                             the same message (0 only joins lines that
+                             are already queued)
+            max_lines: Maximum number of lines joined into one message
+                       (1 disables coalescing)
+            max_retries: Number of retries of a failed send
+            retry_delay: Seconds before the first retry, doubled for each
+                         further one
+            on_failed: Optional callback with the message text when a
+                       send still fails after all retries
+        """
+        self.send = send
+        self.capacity = max(1, capacity)
+        self.coalesce_window = coalesce_window
+        self.max_lines = max(1, max_lines)
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.on_failed = on_failed
+
+        self._lines: Deque[Tuple[str, float]] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._discard = False
+        self._in_flight = 0
+
+        self.lines = 0
+        self.messages = 0
+        self.coalesced = 0
+        self.retries = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.blocked_seconds = 0.0
+        self._send_seconds: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+        self._latency_seconds: Deque[float] = deque(maxlen=LATENCY_SAMPLES)
+
+        self._worker = threading.Thread(
+            target=self._run, name="outbound-sender", daemon=True
+        )
+        self._worker.start()
+
+    def put(self, text: str, timeout: Optional[float] = None) -> bool:
+        """
+        Queue a line, waiting for room while the queue is full
+
+        Args:
+            text: The line to send
+            timeout: Optional maximum number of seconds to wait for room
+
+        Returns:
+            bool: True if queued, False if the queue is closed or stayed
+            full for the whole timeout
+        """
+        began = time.perf_counter()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while len(self._lines) >= self.capacity and not self._closed:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                self._cond.wait(remaining)
+            if self._closed:
+                return False
+            self._lines.append((text, time.perf_counter()))
+            self.lines += 1
+            self.max_depth = max(self.max_depth, len(self._lines))
+            self.blocked_seconds += time.perf_counter() - began
+            self._cond.notify_all()
+        return True
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every queued line has been sent (or given up on)
+
+        Args:
+            timeout: Optional maximum number of seconds to wait
+
+        Returns:
+            bool: True if the queue is idle
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._lines or self._in_flight:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, flush: bool = True,
+              timeout: Optional[float] = None) -> None:
+        """
+        Stop accepting lines and stop the worker
+
+        Args:
+            flush: Send the queued lines first; otherwise they are dropped
+            timeout: Optional maximum number of seconds to wait for the
+                     worker
+        """
+        with self._cond:
+            self._closed = True
+            if not flush:
+                # Also stops retrying the message being sent
+                self._discard = True
+                if self._lines:
+                    logger.warning(
+                        "Dropping %d unsent line(s)", len(self._lines)
+                    )
+                    self._lines.clear()
+            self._cond.notify_all()
+        if self._worker is not threading.current_thread():
+            self._worker.join(timeout)
+
+    def _next_batch(self) -> Optional[List[Tuple[str, float]]]:
+        """Wait for lines and take the ones to send as one message"""
+        with self._cond:
+            while not self._lines and not self._closed:
+                self._cond.wait()
+            if not self._lines:
+                return None
+
+            batch = [self._lines.popleft()]
+            deadline = time.monotonic() + self.coalesce_window
+            while True:
+                self._in_flight = len(batch)
+                # Wake up writers waiting for room
+                self._cond.notify_all()
+                if len(batch) >= self.max_lines:
+                    break
+                if self._lines:
+                    batch.append(self._lines.popleft())
+                    continue
+                remaining = deadline - time.monotonic()
+                if self._closed or remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return batch
+
+    def _run(self) -> None:
+        """Send queued lines until the queue is closed and empty"""
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            text = "\n".join(line for line, _ in batch)
+            try:
+                sent = self._send_with_retries(text)
+            except Exception as e:
+                logger.error(f"Error sending queued message: {e}")
+                sent = False
+            with self._cond:
+                now = time.perf_counter()
+                if sent:
+                    self.messages += 1
+                    self.coalesced += len(batch) - 1
+                    self._latency_seconds.extend(
+                        now - queued for _, queued in batch
+                    )
+                else:
+                    self.failed += 1
+                self._in_flight = 0
+                self._cond.notify_all()
+            if not sent and self.on_failed:
+                self.on_failed(text)
+
+    def _send_with_retries(self, text: str) -> bool:
+        """
+        Send one message, retrying failures with exponential backoff
+
+        Args:
+            text: The message text
+
+        Returns:
+            bool: True if a send succeeded
+        """
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                if self._discard:
+                    break
+                self.retries += 1
+                time.sleep(self.retry_delay * 2 ** (attempt - 1))
+            began = time.perf_counter()
+            sent = self.send(text)
+            self._send_seconds.append(time.perf_counter() - began)
+            if sent:
+                return True
+        logger.error("Giving up on a message after %d attempt(s)",
+                     attempt + 1)
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the queue and send statistics
+
+        Returns:
+            Dict with the current and largest queue depth, line, message,
+            coalescing, retry and failure counts, the total time writers
+            waited for room, and p50/p95 in milliseconds of the SDK send
+            time and of the time from queueing a line to sending it
+        """
+        with self._cond:
+            sends = sorted(self._send_seconds)
+            latencies = sorted(self._latency_seconds)
+            depth = len(self._lines)
+
+        def ms(values: List[float], fraction: float) -> Optional[float]:
+            value = percentile(values, fraction)
+            return None if value is None else round(value * 1000, 3)
+
+        return {
+            "depth": depth,
+            "max_depth": self.max_depth,
+            "capacity": self.capacity,
+            "lines": self.lines,
+            "messages": self.messages,
+            "coalesced": self.coalesced,
+            "retries": self.retries,
+            "failed": self.failed,
+            "blocked_seconds": round(self.blocked_seconds, 3),
+            "send_p50_ms": ms(sends, 0.50),
+            "send_p95_ms": ms(sends, 0.95),
+            "latency_p50_ms": ms(latencies, 0.50),
+            "latency_p95_ms": ms(latencies, 0.95),
+        }
@@ -0,0 +1,196 @@
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Dict, Optional
+
+from convolingo.utils.config import config, WEBHOOK_PORT
+from convolingo.utils.logging_setup import stop_logging
+from convolingo.api.server import WebhookServer, FLASK_MODE, ASYNC_MODE
+from convolingo.tools.storage import JSON_BACKEND
+from convolingo.tools.vocabulary import VocabularyTool
+from convolingo.utils.metrics import metrics
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class PreforkServer:
+    """
+    Supervisor running WebhookServer in several pre-forked worker processes
+
+    The supervisor binds one listening socket and forks the workers, which
+    all accept connections from that inherited socket so the kernel spreads
+    requests across them. Workers that die are restarted. Each worker opens
+    its own vocabulary store after forking. The JSON backend keeps its
+    vocabulary in process memory, so more than one worker needs the shared
+    SQLite backend.
+    """
+
+    def __init__(self, workers: int = 1, host: str = "127.0.0.1",
+                 port: int = WEBHOOK_PORT, mode: str = FLASK_MODE,
+                 backend: Optional[str] = None,
+                 restart_delay: float = 1.0):
+        """
+        Initialize the supervisor
+
+        Args:
+            workers: Number of worker processes
+            host: Interface to bind to
+            port: Port to listen on
+            mode: Serving mode for each worker (flask or async)
+            backend: Optional vocabulary storage backend override
+            restart_delay: Minimum seconds between restarts of a worker
+                           that keeps crashing right after starting
+
+        Raises:
+            ValueError: If several workers would use the json backend
+            RuntimeError: If the async mode is asked for without uvicorn
+        """
+        self.workers = max(1, workers)
+        self.host = host
+        self.port = port
+        self.mode = mode
+        self.restart_delay = restart_delay
+
+        self.backend = backend or config.vocabulary_backend
+        if self.workers > 1 and self.backend == JSON_BACKEND:
+            # Switching stores here would split the vocabulary between
+            # serve and the other commands, so let the user pick
+            raise ValueError(
+                "The json vocabulary backend is per process and cannot be "
+                f"shared by {self.workers} workers; set "
+                "VOCABULARY_BACKEND=sqlite (or pass --backend sqlite), or "
+                "run with --workers 1"
+            )
+
+        if self.mode == ASYNC_MODE:
+            # Fail before forking workers that would crash and restart
+            from convolingo.api.asgi import import_uvicorn
+            import_uvicorn()
+
+        self.sock: Optional[socket.socket] = None
+        self._children: Dict[int, int] = {}
+        self._started_at: Dict[int, float] = {}
+        self._stopping = False
+
+    def run(self) -> None:
+        """Bind the socket, start the workers and supervise until stopped"""
+        self.sock = self._bind()
+        logger.info(
+            f"Serving webhooks on {self.host}:{self.port} with "
+            f"{self.workers} {self.mode} worker(s)"
+        )
+
+        if not hasattr(os, "fork"):
+            logger.warning("Pre-forking is not supported here; "
+                           "running a single worker in-process")
+            self._run_worker(0)
+            return
+
+        previous_handlers = {
+            sig: signal.signal(sig, self._handle_stop)
+            for sig in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            for slot in range(self.workers):
+                self._spawn(slot)
+            self._supervise()
+        finally:
+            for sig, handler in previous_handlers.items():
+                signal.signal(sig, handler)
+            self.sock.close()
+            logger.info("Webhook server stopped")
+
+    def _bind(self) -> socket.socket:
+        """Create the shared listening socket"""
+        # asyncio only sets TCP_NODELAY on connections accepted from a
+        # socket created with IPPROTO_TCP; without it uvicorn's separate
+        # header and body writes stall on delayed ACKs
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM,
+                             socket.IPPROTO_TCP)
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind((self.host, self.port))
+        sock.listen(1024)
+        sock.set_inheritable(True)
+        self.port = sock.getsockname()[1]
+        return sock
+
+    def _spawn(self, slot: int) -> None:
+        """Fork a worker process for a slot"""
+        started = self._started_at.get(slot)
+        if started is not None and time.time() - started < self.restart_delay:
+            # Avoid a tight crash loop
+            time.sleep(self.restart_delay)
+
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                for sig in (signal.SIGINT, signal.SIGTERM):
+                    signal.signal(sig, _exit_worker)
+                self._run_worker(slot)
+            except (KeyboardInterrupt, SystemExit):
+                pass
+            except BaseException as e:
+                logger.error(f"Worker {slot} crashed: {e}")
+                code = 1
+            finally:
+                # os._exit skips atexit, so write out queued log records
+                stop_logging()
+                os._exit(code)
+
+        self._children[pid] = slot
+        self._started_at[slot] = time.time()
+        logger.info(f"Started worker {slot} (pid {pid})")
+
+    def _run_worker(self, slot: int) -> None:
+        """Serve requests in a worker process"""
+        # Each worker answers /metrics with its own counters; the label keeps
+        # their series apart. Slots are reused, so a restart is a reset
+        metrics.set_constant_labels({"worker": str(slot)})
+        vocabulary_tool = VocabularyTool(backend=self.backend)
+        server = WebhookServer(vocabulary_tool=vocabulary_tool)
+        server.port = self.port
+        try:
+            server.run(mode=self.mode, sock=self.sock)
+        finally:
+            vocabulary_tool.close()
+
+    def _supervise(self) -> None:
+        """Wait for workers to exit and restart them until stopped"""
+        while self._children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+
+            slot = self._children.pop(pid, None)
+            if slot is None:
+                continue
+            if self._stopping:
+                continue
+
+            logger.warning(
+                f"Worker {slot} (pid {pid}) exited with status "
+                f"{os.waitstatus_to_exitcode(status)}; restarting"
+            )
+            self._spawn(slot)
+
+    def _handle_stop(self, signum, frame) -> None:
+        """Stop supervising and terminate all workers"""
+        if self._stopping:
+            return
+        self._stopping = True
+        logger.info("Stopping webhook workers...")
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+def _exit_worker(signum, frame) -> None:
+    """Signal handler that unwinds a worker so its store is closed"""
+    raise SystemExit(0)
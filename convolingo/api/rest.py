@@ -0,0 +1,202 @@
+import logging
+import random
+import threading
+import time
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+from convolingo.utils.config import (
+    config, VAPI_CONNECT_TIMEOUT, VAPI_READ_TIMEOUT, VAPI_MAX_RETRIES
+)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying: rate limiting and transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Methods that are safe to resend after the request may have been processed
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+# Statuses meaning the server did not process the request, so any method
+# (including POST) can be resent
+NOT_PROCESSED_STATUSES = {429, 503}
+
+
+def _never_sent(error: requests.RequestException) -> bool:
+    """
+    Check whether a failed request provably never reached the server
+
+    Args:
+        error: The connection error or timeout
+
+    Returns:
+        bool: True for connect timeouts and refused or unresolvable
+        connections, False when the request may have been processed
+    """
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    reason = getattr(reason, "reason", reason)
+    return isinstance(reason, NewConnectionError)
+
+
+class VapiRestClient:
+    """
+    Pooled HTTP client for the VAPI REST API
+
+    Keeps one ``requests.Session`` with a connection pool, so calls reuse
+    keep-alive connections instead of opening a new TLS connection each
+    time. Auth headers are set once on the session. Every call has connect
+    and read timeouts, and 429/5xx responses and connection errors are
+    retried a bounded number of times with jittered exponential backoff.
+    Non-idempotent requests (POST) are only resent when the server
+    provably did not process them, so retries never create duplicates.
+    """
+
+    def __init__(self, api_key: Optional[str] = None,
+                 api_base: Optional[str] = None,
+                 connect_timeout: float = VAPI_CONNECT_TIMEOUT,
+                 read_timeout: float = VAPI_READ_TIMEOUT,
+                 max_retries: int = VAPI_MAX_RETRIES,
+                 backoff_factor: float = 0.5,
+                 max_backoff: float = 8.0,
+                 pool_size: int = 10):
+        """
+        Initialize the REST client
+
+        Args:
+            api_key: VAPI API key (default: from config)
+            api_base: Base URL of the API (default: from config)
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait for a response
+            max_retries: Maximum number of retries per call
+            backoff_factor: Base delay in seconds of the exponential backoff
+            max_backoff: Upper bound of a single backoff delay in seconds
+            pool_size: Maximum number of pooled connections per host
+        """
+        self.api_base = (api_base or config.api_base).rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            max_retries=0
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key or config.api_key}"
+        })
+
+    def request(self, method: str, path: str, **kwargs: Any) -> requests.Response:
+        """
+        Send a request to the API, retrying transient failures
+
+        Args:
+            method: HTTP method
+            path: Path relative to the API base (e.g. "/assistants")
+            **kwargs: Extra arguments for requests (json, params, ...)
+
+        Returns:
+            The final response (which may still be an error response)
+
+        Raises:
+            requests.RequestException: If the request failed after all
+                                       retries
+        """
+        method = method.upper()
+        url = f"{self.api_base}/{path.lstrip('/')}"
+        kwargs.setdefault("timeout", self.timeout)
+
+        attempt = 0
+        while True:
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                # A read timeout or a dropped connection may mean the
+                # server did process the request
+                resendable = method in IDEMPOTENT_METHODS or _never_sent(e)
+                if attempt >= self.max_retries or not resendable:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(
+                    f"{method} {path} failed ({e}); retrying in {delay:.2f}s"
+                )
+            else:
+                retry_statuses = (
+                    RETRY_STATUSES if method in IDEMPOTENT_METHODS
+                    else NOT_PROCESSED_STATUSES
+                )
+                if (response.status_code not in retry_statuses
+                        or attempt >= self.max_retries):
+                    return response
+                delay = self._backoff(attempt, response)
+                logger.warning(
+                    f"{method} {path} returned {response.status_code}; "
+                    f"retrying in {delay:.2f}s"
+                )
+                response.close()
+
+            time.sleep(delay)
+            attempt += 1
+
+    def _backoff(self, attempt: int,
+                 response: Optional[requests.Response] = None) -> float:
+        """
+        Compute the delay before the next retry
+
+        Uses full jitter over an exponentially growing window, or the
+        server's Retry-After header when it sends one.
+        """
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.max_backoff)
+                except ValueError:
+                    pass
+        window = min(self.max_backoff, self.backoff_factor * (2 ** attempt))
+        return random.uniform(0, window)
+
+    def get(self, path: str, **kwargs: Any) -> requests.Response:
+        """Send a GET request"""
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, **kwargs: Any) -> requests.Response:
+        """Send a POST request"""
+        return self.request("POST", path, **kwargs)
+
+    def patch(self, path: str, **kwargs: Any) -> requests.Response:
+        """Send a PATCH request"""
+        return self.request("PATCH", path, **kwargs)
+
+    def close(self) -> None:
+        """Close all pooled connections"""
+        self.session.close()
+
+
+_shared_client: Optional[VapiRestClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_rest_client() -> VapiRestClient:
+    """
+    Get the process-wide shared REST client, creating it on first use
+
+    Returns:
+        The shared VapiRestClient
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _shared_lock:
+            if _shared_client is None:
+                _shared_client = VapiRestClient()
+    return _shared_client
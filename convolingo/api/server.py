@@ -1,23 +1,59 @@
 import logging
 import json
-from typing import Dict, Any, Optional
-from flask import Flask, request, jsonify
+import socket
+import time
+from typing import Dict, Any, Optional, Tuple
+from flask import Flask, Response, request, jsonify
+from concurrent.futures import ThreadPoolExecutor
+from werkzeug.serving import make_server
 
-from convolingo.utils.config import WEBHOOK_PORT
+from convolingo.utils.config import (
+    WEBHOOK_PORT, FLASK_MODE, ASYNC_MODE, SERVER_MODES
+)
+from convolingo.tools.schema import TOOL_NAME
 from convolingo.tools.vocabulary import VocabularyTool
+from convolingo.utils.metrics import (
+    metrics, CONTENT_TYPE, REQUEST_SECONDS, REQUEST_ERRORS, REQUESTS_IN_FLIGHT
+)
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Maximum number of tool calls of one webhook processed at once
+TOOL_CALL_WORKERS = 8
+
+HOME_PAGE = """
+            <html>
+                <body>
+                    <h1>ConvoLingo Webhook Server</h1>
+                    <p>This server is ready to receive callbacks from VAPI.</p>
+                    <p>Use ngrok to expose this server to the internet.</p>
+                </body>
+            </html>
+            """
+
+
 class WebhookServer:
     """Server for handling webhooks and tool API endpoints"""
     
-    def __init__(self):
-        """Initialize the webhook server"""
+    def __init__(self, vocabulary_tool: Optional[VocabularyTool] = None):
+        """
+        Initialize the webhook server
+        
+        Args:
+            vocabulary_tool: Optional vocabulary tool (default: one using
+                             the configured storage backend)
+        """
         self.app = Flask(__name__)
-        self.vocabulary_tool = VocabularyTool()
+        self.vocabulary_tool = vocabulary_tool or VocabularyTool()
         self.port = WEBHOOK_PORT
         
+        # Pool for running the tool calls of one webhook concurrently
+        self.executor = ThreadPoolExecutor(
+            max_workers=TOOL_CALL_WORKERS,
+            thread_name_prefix="tool-call"
+        )
+        
         # Register routes
         self._register_routes()
     
@@ -27,94 +63,288 @@ class WebhookServer:
         @self.app.route('/callbacks', methods=['POST'])
         def handle_callback():
             """Handle webhook callbacks from VAPI"""
+            started = self.request_started()
+            status = 500
             try:
-                # Get the JSON data from the request
-                data = request.json
-                
-                # Log the received data
-                logger.info(f"Webhook callback received: {data.get('type', 'unknown')}")
-                
-                # If this is a tool call event, process it
-                if data.get('type') == 'tool-call':
-                    tool_id = data.get('toolId')
-                    tool_input = data.get('input', {})
-                    
-                    logger.info(f"Tool call received - Tool ID: {tool_id}")
-                    
-                    # Process the tool call
-                    if tool_id == self.vocabulary_tool.tool_id:
-                        result = self.vocabulary_tool.handle_tool_call(
-                            str(tool_input)
-                        )
-                        return jsonify({
-                            "success": True,
-                            "result": result
-                        })
-                
-                # For any other event type, just acknowledge receipt
-                return jsonify({"success": True})
-                
-            except Exception as e:
-                logger.error(f"Error processing webhook: {e}")
-                return jsonify({"success": False, "error": str(e)}), 500
+                payload, status = self.process_callback(
+                    request.get_json(silent=True)
+                )
+                return jsonify(payload), status
+            finally:
+                self.request_finished('/callbacks', started, status)
 
         @self.app.route('/api/vocabulary', methods=['POST'])
         def handle_vocabulary():
             """Handle vocabulary tool calls from VAPI"""
+            started = self.request_started()
+            status = 500
             try:
-                # Get the JSON data from the request
-                data = request.json
-                
-                # Log the received data
-                logger.info(f"Vocabulary tool call received")
-                
-                # Extract text to process if available
-                text_to_process = ""
-                if isinstance(data, dict):
-                    text_to_process = data.get('text', '')
-                
-                # Process the tool call
-                result = self.vocabulary_tool.handle_tool_call(text_to_process)
-                
-                # Return a response that VAPI would use
-                return jsonify({
-                    "success": True,
-                    "result": result
-                })
-                
-            except Exception as e:
-                logger.error(f"Error processing vocabulary tool call: {e}")
-                return jsonify({"success": False, "error": str(e)}), 500
+                payload, status = self.process_vocabulary(
+                    request.get_json(silent=True)
+                )
+                return jsonify(payload), status
+            finally:
+                self.request_finished('/api/vocabulary', started, status)
+
+        @self.app.route('/metrics', methods=['GET'])
+        def handle_metrics():
+            """Expose the server metrics in the Prometheus text format"""
+            return Response(metrics.render(), content_type=CONTENT_TYPE)
 
         @self.app.route('/', methods=['GET', 'POST'])
         def home():
             """Simple home page to verify the server is running"""
             if request.method == 'POST':
-                try:
-                    data = request.json
-                    logger.info("POST request to root endpoint")
-                    return jsonify({"success": True})
-                except Exception as e:
-                    logger.error(f"Error processing root POST: {e}")
-                    return jsonify({"success": False, "error": str(e)}), 500
+                payload, status = self.process_root_post(
+                    request.get_json(silent=True)
+                )
+                return jsonify(payload), status
             
-            return """
-            <html>
-                <body>
-                    <h1>ConvoLingo Webhook Server</h1>
-                    <p>This server is ready to receive callbacks from VAPI.</p>
-                    <p>Use ngrok to expose this server to the internet.</p>
-                </body>
-            </html>
-            """
+            return HOME_PAGE
+    
+    @staticmethod
+    def request_started() -> float:
+        """
+        Count a request as in flight
+        
+        Returns:
+            The start time to pass to request_finished
+        """
+        metrics.inc(REQUESTS_IN_FLIGHT)
+        return time.perf_counter()
+    
+    @staticmethod
+    def request_finished(route: str, started: float, status: int) -> None:
+        """
+        Record the latency and outcome of a finished request
+        
+        Args:
+            route: The route that handled the request
+            started: Start time returned by request_started
+            status: HTTP status code of the response
+        """
+        metrics.observe(REQUEST_SECONDS, time.perf_counter() - started,
+                        (route,))
+        if status >= 400:
+            metrics.inc(REQUEST_ERRORS, (route,))
+        metrics.inc(REQUESTS_IN_FLIGHT, amount=-1)
     
-    def run(self, debug: bool = False) -> None:
+    def process_callback(self, data: Any) -> Tuple[Dict[str, Any], int]:
+        """
+        Process a webhook callback from VAPI
+        
+        Args:
+            data: The decoded JSON request body
+            
+        Returns:
+            Tuple of response payload and HTTP status code
+        """
+        try:
+            # Server messages are wrapped in a "message" object
+            message = data.get('message')
+            if not isinstance(message, dict):
+                message = data
+            event_type = message.get('type', 'unknown')
+            
+            # Log the received data
+            logger.info("Webhook callback received: %s", event_type)
+            
+            # Batched tool calls: run them all and answer in one response
+            if event_type == 'tool-calls':
+                return self._process_tool_call_list(message), 200
+            
+            # If this is a single tool call event, process it
+            if event_type == 'tool-call':
+                # Read from the message, wrapped or not, like its type
+                tool_id = message.get('toolId')
+                tool_input = message.get('input', {})
+                
+                logger.info("Tool call received - Tool ID: %s", tool_id)
+                
+                # Process the tool call
+                if tool_id == self.vocabulary_tool.tool_id:
+                    user_id = (_extract_user_id(message)
+                               or _extract_user_id(data))
+                    result = self.vocabulary_tool.handle_tool_call(
+                        tool_input, user_id=user_id
+                    )
+                    return {"success": True, "result": result}, 200
+            
+            # For any other event type, just acknowledge receipt
+            return {"success": True}, 200
+            
+        except Exception as e:
+            logger.error(f"Error processing webhook: {e}")
+            return {"success": False, "error": str(e)}, 500
+    
+    def process_vocabulary(self, data: Any) -> Tuple[Dict[str, Any], int]:
+        """
+        Process a vocabulary tool call from VAPI
+        
+        Args:
+            data: The decoded JSON request body
+            
+        Returns:
+            Tuple of response payload and HTTP status code
+        """
+        try:
+            # Log the received data
+            logger.info("Vocabulary tool call received")
+            
+            # Tool calls sent to the tool's server URL
+            message = data.get('message') if isinstance(data, dict) else None
+            if isinstance(message, dict) and message.get('type') == 'tool-calls':
+                return self._process_tool_call_list(message), 200
+            
+            # Otherwise take the arguments from the body (or its JSON text)
+            arguments: Any = {}
+            if isinstance(data, dict):
+                arguments = data.get('text', data.get('arguments', {}))
+            
+            # Process the tool call
+            result = self.vocabulary_tool.handle_tool_call(
+                arguments, user_id=_extract_user_id(data)
+            )
+            
+            # Return a response that VAPI would use
+            return {"success": True, "result": result}, 200
+            
+        except Exception as e:
+            logger.error(f"Error processing vocabulary tool call: {e}")
+            return {"success": False, "error": str(e)}, 500
+    
+    def _process_tool_call_list(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run every tool call of a "tool-calls" message concurrently
+        
+        Args:
+            message: The server message containing a toolCallList
+            
+        Returns:
+            Response payload with one result per tool call, in order
+        """
+        calls = message.get('toolCallList') or message.get('toolCalls') or []
+        user_id = _extract_user_id(message)
+        logger.info("Processing %d tool call(s)", len(calls))
+        
+        def run(call: Dict[str, Any]) -> Dict[str, Any]:
+            function = call.get('function') or {}
+            name = function.get('name')
+            try:
+                if name == TOOL_NAME:
+                    result = self.vocabulary_tool.handle_tool_call(
+                        function.get('arguments') or {}, user_id=user_id
+                    )
+                else:
+                    result = {"success": False, "message": f"Unknown tool '{name}'"}
+            except Exception as e:
+                logger.error("Error running tool call %s: %s", call.get('id'), e)
+                result = {"success": False, "message": str(e)}
+            return {
+                "toolCallId": call.get('id'),
+                "result": json.dumps(result, ensure_ascii=False)
+            }
+        
+        if len(calls) == 1:
+            results = [run(calls[0])]
+        else:
+            results = list(self.executor.map(run, calls))
+        return {"results": results}
+    
+    def process_root_post(self, data: Any) -> Tuple[Dict[str, Any], int]:
+        """
+        Process a POST to the root endpoint
+        
+        Args:
+            data: The decoded JSON request body
+            
+        Returns:
+            Tuple of response payload and HTTP status code
+        """
+        logger.info("POST request to root endpoint")
+        return {"success": True}, 200
+    
+    def run(self, debug: bool = False, mode: str = FLASK_MODE,
+            sock: Optional[socket.socket] = None) -> None:
         """
         Run the webhook server
         
         Args:
-            debug: Whether to run in debug mode
+            debug: Whether to run in debug mode (Flask mode only)
+            mode: Serving mode, "flask" for the Flask development server or
+                  "async" for uvicorn
+            sock: Optional already listening socket to serve on (e.g. one
+                  shared by several worker processes)
         """
-        logger.info(f"Starting webhook server on port {self.port}...")
+        logger.info(f"Starting webhook server on port {self.port} ({mode})...")
         logger.info("To expose this server, run: ngrok http 5000")
-        self.app.run(debug=debug, port=self.port) 
\ No newline at end of file
+        if mode == ASYNC_MODE:
+            from convolingo.api.asgi import serve
+            serve(self, port=self.port, sock=sock)
+        elif mode == FLASK_MODE and sock is not None:
+            host, port = sock.getsockname()[:2]
+            make_server(
+                host, port, self.app, threaded=True, fd=sock.fileno()
+            ).serve_forever()
+        elif mode == FLASK_MODE:
+            self.app.run(debug=debug, port=self.port)
+        else:
+            raise ValueError(
+                f"Unknown server mode '{mode}' "
+                f"(expected one of: {', '.join(SERVER_MODES)})"
+            )
+
+
+def _extract_user_id(data: Any) -> Optional[str]:
+    """
+    Find the learner's user ID in a webhook payload
+    
+    Args:
+        data: The webhook payload or server message
+        
+    Returns:
+        The user ID if the payload carries one, None otherwise
+    """
+    if not isinstance(data, dict):
+        return None
+    sections = [data]
+    for key in ('assistant', 'call'):
+        section = data.get(key)
+        if isinstance(section, dict):
+            sections.append(section)
+            sections.append(section.get('metadata'))
+    for section in sections:
+        if isinstance(section, dict):
+            user_id = _user_id_value(section.get('userId'))
+            if user_id:
+                return user_id
+    return None
+
+
+def _user_id_value(value: Any) -> Optional[str]:
+    """
+    Get a user ID from a JSON value
+    
+    Args:
+        value: The userId value as sent
+        
+    Returns:
+        The value if it is a string, an integer as a string, None for
+        anything else (objects, lists, booleans, floats)
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    return None
+    if data.get('userId'):
+        return data['userId']
+    for key in ('assistant', 'call'):
+        section = data.get(key)
+        if isinstance(section, dict):
+            if section.get('userId'):
+                return section['userId']
+            metadata = section.get('metadata')
+            if isinstance(metadata, dict) and metadata.get('userId'):
+                return metadata['userId']
+    return None
@@ -0,0 +1,416 @@
+import logging
+import queue
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+from convolingo.tools.schema import TOOL_ACTIONS, TOOL_NAME
+from convolingo.utils.telemetry import IMPORT_PHASE, SDK_INIT_PHASE
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Transport names
+VAPI_TRANSPORT = "vapi"
+FAKE_TRANSPORT = "fake"
+TRANSPORTS = (VAPI_TRANSPORT, FAKE_TRANSPORT)
+
+# Called with a webhook payload, returns the decoded response
+Webhook = Callable[[Dict[str, Any]], Any]
+
+# Private attribute of vapi_python.Vapi (``self.__client``, name mangled)
+# holding the DailyCall of the current call; see SdkTransport.on_call_end
+SDK_CALL_ATTRIBUTE = "_Vapi__client"
+
+
+class Transport:
+    """Base class of the ways a VapiClient runs its calls"""
+
+    # Name recorded in the session stats
+    name = "custom"
+
+    def start(self, assistant: Optional[Mapping[str, Any]] = None,
+              assistant_id: Optional[str] = None,
+              assistant_overrides: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Start a call
+
+        Args:
+            assistant: Inline assistant configuration
+            assistant_id: ID of a persisted assistant, used instead
+            assistant_overrides: Optional overrides of the persisted
+                                 assistant
+
+        Raises:
+            Exception: If the call could not be started
+        """
+        raise NotImplementedError
+
+    def send(self, text: str) -> None:
+        """
+        Send a text message to the assistant
+
+        Args:
+            text: The message text
+
+        Raises:
+            Exception: If the message could not be sent
+        """
+        raise NotImplementedError
+
+    def stop(self) -> None:
+        """End the call"""
+        raise NotImplementedError
+
+    def on_call_end(self, callback: Callable[[], None]) -> None:
+        """
+        Run a callback when the current call ends on its own
+
+        Args:
+            callback: Called without arguments, from any thread
+        """
+
+
+class SdkTransport(Transport):
+    """
+    Calls through the vapi_python SDK client
+
+    The SDK (checked against vapi_python 0.1.9) has no public hook or
+    state telling when the assistant hung up, so on_call_end wraps the
+    ``leave`` method of its private call object (SDK_CALL_ATTRIBUTE). If
+    an SDK update moves that object, a warning is logged and sessions
+    only end on exit, a signal or their duration.
+    """
+
+    name = VAPI_TRANSPORT
+
+    def __init__(self, sdk: Any = None, api_key: Optional[str] = None,
+                 timings=None):
+        """
+        Initialize the transport
+
+        Args:
+            sdk: Optional SDK client (default: a new vapi_python.Vapi)
+            api_key: API key of a new SDK client
+            timings: Optional SessionTimings recording how long importing
+                     and creating a new SDK client took
+        """
+        if sdk is None:
+            started = time.perf_counter()
+            # Imported here since the SDK pulls in the audio stack
+            from vapi_python import Vapi
+            imported = time.perf_counter()
+            sdk = Vapi(api_key=api_key)
+            if timings is not None:
+                timings.record(IMPORT_PHASE, imported - started)
+                timings.record(SDK_INIT_PHASE, time.perf_counter() - imported)
+        self.sdk = sdk
+
+        # The text method depends on the SDK version; look it up once
+        for name in ('send_text', 'user_message', 'message'):
+            method = getattr(sdk, name, None)
+            if callable(method):
+                self._send = method
+                break
+        else:
+            self._send = None
+
+    def start(self, assistant: Optional[Mapping[str, Any]] = None,
+              assistant_id: Optional[str] = None,
+              assistant_overrides: Optional[Dict[str, Any]] = None) -> None:
+        if assistant_id:
+            self.sdk.start(assistant_id=assistant_id,
+                           assistant_overrides=assistant_overrides)
+        else:
+            self.sdk.start(assistant=assistant)
+
+    def send(self, text: str) -> None:
+        if self._send is None:
+            raise RuntimeError("The VAPI SDK client cannot send text messages")
+        self._send(text)
+
+    def stop(self) -> None:
+        self.sdk.stop()
+
+    def on_call_end(self, callback: Callable[[], None]) -> None:
+        # The SDK has no disconnect callback, but its call object leaves
+        # the call itself when the assistant hangs up
+        call = getattr(self.sdk, SDK_CALL_ATTRIBUTE, None)
+        leave = getattr(call, "leave", None)
+        if not callable(leave):
+            logger.warning(
+                "Cannot detect when the call ends: the VAPI SDK has no "
+                "%s.leave (SDK changed?); type 'exit' to end the session",
+                SDK_CALL_ATTRIBUTE
+            )
+            return
+
+        def leave_and_stop(*args, **kwargs):
+            try:
+                return leave(*args, **kwargs)
+            finally:
+                callback()
+
+        call.leave = leave_and_stop
+
+
+class FakeTransport(Transport):
+    """
+    In-process stand-in for VAPI calls, for offline tests and benchmarks
+
+    Starting a call takes ``start_latency`` seconds. Sent messages are
+    delivered in order by a background thread, each ``message_latency``
+    seconds after the previous one, and a seeded random generator decides
+    which of them make the assistant call the vocabulary tool: those send
+    a "tool-calls" server message, like VAPI's, to the ``webhook``. With
+    ``call_seconds`` the assistant hangs up on its own after that long.
+
+    The same seed and messages always give the same tool calls. What
+    happened is recorded in ``events`` as (kind, detail) tuples.
+    """
+
+    name = FAKE_TRANSPORT
+
+    def __init__(self, seed: int = 0, start_latency: float = 0.0,
+                 message_latency: float = 0.0, tool_call_rate: float = 0.5,
+                 webhook: Optional[Webhook] = None,
+                 call_seconds: Optional[float] = None):
+        """
+        Initialize the fake transport
+
+        Args:
+            seed: Seed of the random tool calls
+            start_latency: Seconds it takes to start a call
+            message_latency: Seconds it takes to deliver a message
+            tool_call_rate: Share of messages answered with a tool call
+            webhook: Optional receiver of the server messages (status
+                     updates and tool calls); see call_webhook and
+                     post_webhook
+            call_seconds: Optional seconds after which calls end on their
+                          own
+        """
+        self.random = random.Random(seed)
+        self.start_latency = start_latency
+        self.message_latency = message_latency
+        self.tool_call_rate = tool_call_rate
+        self.webhook = webhook
+        self.call_seconds = call_seconds
+
+        self.events: List[Tuple[str, Any]] = []
+        self.turn_seconds: List[float] = []
+        self.calls = 0
+        self.tool_calls = 0
+        self.webhook_errors = 0
+        self._call: Optional[Dict[str, Any]] = None
+        self._messages: "queue.Queue[Optional[Tuple[str, float]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._ended: Optional[Callable[[], None]] = None
+        self._hung_up = False
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def start(self, assistant: Optional[Mapping[str, Any]] = None,
+              assistant_id: Optional[str] = None,
+              assistant_overrides: Optional[Dict[str, Any]] = None) -> None:
+        if self.start_latency:
+            time.sleep(self.start_latency)
+        with self._lock:
+            if self._call is not None:
+                raise RuntimeError("A call is already running")
+            self.calls += 1
+            user_id = None
+            if assistant_overrides:
+                user_id = (assistant_overrides.get("metadata") or {}).get("userId")
+            elif assistant:
+                user_id = assistant.get("userId")
+            self._call = {"id": f"fake-call-{self.calls}",
+                          "metadata": {"userId": user_id}}
+            self._ended = None
+            self._hung_up = False
+            self.events.append(("start", assistant_id or "inline"))
+            self._worker = threading.Thread(
+                target=self._deliver, args=(self._call,),
+                name=f"fake-transport-{self.calls}", daemon=True
+            )
+            self._worker.start()
+            if self.call_seconds is not None:
+                self._timer = threading.Timer(self.call_seconds, self._hang_up)
+                self._timer.daemon = True
+                self._timer.start()
+        self._server_message(self._call, {"type": "status-update",
+                                          "status": "in-progress"})
+
+    def send(self, text: str) -> None:
+        if self._call is None:
+            raise RuntimeError("No call is running")
+        self._messages.put((text, time.perf_counter()))
+
+    def stop(self) -> None:
+        with self._lock:
+            call, self._call = self._call, None
+            worker, self._worker = self._worker, None
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+        if call is None:
+            return
+        # Messages sent before the stop are still delivered
+        self._messages.put(None)
+        if worker is not threading.current_thread():
+            worker.join()
+        self.events.append(("stop", call["id"]))
+        self._server_message(call, {"type": "status-update",
+                                    "status": "ended"})
+
+    def on_call_end(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            self._ended = callback
+            hung_up = self._hung_up
+        if hung_up:
+            callback()
+
+    def wait_delivered(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every sent message has been delivered
+
+        Args:
+            timeout: Optional maximum number of seconds to wait
+
+        Returns:
+            bool: True if all messages were delivered in time
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        done = self._messages.all_tasks_done
+        with done:
+            while self._messages.unfinished_tasks:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                done.wait(remaining)
+        return True
+
+    def _hang_up(self) -> None:
+        """End the call from the assistant's side"""
+        with self._lock:
+            self._hung_up = True
+            callback = self._ended
+        self.events.append(("hang-up", None))
+        if callback:
+            callback()
+
+    def _deliver(self, call: Dict[str, Any]) -> None:
+        """Deliver the sent messages of a call, in order"""
+        while True:
+            item = self._messages.get()
+            try:
+                if item is None:
+                    return
+                text, sent_at = item
+                if self.message_latency:
+                    time.sleep(self.message_latency)
+                self.events.append(("message", text))
+                if self.random.random() < self.tool_call_rate:
+                    self._tool_call(call, text)
+                self.turn_seconds.append(time.perf_counter() - sent_at)
+            finally:
+                self._messages.task_done()
+
+    def _tool_call(self, call: Dict[str, Any], text: str) -> None:
+        """Answer a message with a vocabulary tool call"""
+        self.tool_calls += 1
+        action = self.random.choice(TOOL_ACTIONS)
+        word = text.split()[0] if text.split() else "Hallo"
+        arguments: Dict[str, Any] = {"action": action}
+        if action != "list":
+            arguments["word"] = word
+        if action == "add":
+            arguments["translation"] = f"translation of {word}"
+        self.events.append(("tool-call", action))
+        self._server_message(call, {
+            "type": "tool-calls",
+            "toolCallList": [{
+                "id": f"{call['id']}-tool-{self.tool_calls}",
+                "type": "function",
+                "function": {"name": TOOL_NAME, "arguments": arguments},
+            }],
+        })
+
+    def _server_message(self, call: Dict[str, Any],
+                        message: Dict[str, Any]) -> None:
+        """Send a server message about a call to the webhook"""
+        if self.webhook is None:
+            return
+        try:
+            self.webhook({"message": dict(message, call=call)})
+        except Exception as e:
+            self.webhook_errors += 1
+            logger.error(f"Fake transport webhook failed: {e}")
+
+
+def call_webhook(server) -> Webhook:
+    """
+    Deliver server messages straight to a WebhookServer in this process
+
+    Args:
+        server: The WebhookServer
+
+    Returns:
+        The webhook, returning the response payload
+    """
+    def webhook(payload: Dict[str, Any]) -> Any:
+        response, status = server.process_callback(payload)
+        if status >= 400:
+            raise RuntimeError(f"Webhook answered {status}: {response}")
+        return response
+    return webhook
+
+
+def post_webhook(url: str, timeout: float = 10.0) -> Webhook:
+    """
+    Deliver server messages over HTTP, e.g. to a local webhook server
+
+    Args:
+        url: URL of the webhook (e.g. http://127.0.0.1:5000/callbacks)
+        timeout: Request timeout in seconds
+
+    Returns:
+        The webhook, returning the decoded response
+    """
+    import requests
+    session = requests.Session()
+    lock = threading.Lock()
+
+    def webhook(payload: Dict[str, Any]) -> Any:
+        # A requests session is not safe to share between threads
+        with lock:
+            response = session.post(url, json=payload, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+    return webhook
+
+
+def create_transport(name: str, api_key: Optional[str] = None,
+                     timings=None) -> Transport:
+    """
+    Create a transport
+
+    Args:
+        name: Transport name (vapi or fake)
+        api_key: API key of the VAPI SDK client
+        timings: Optional SessionTimings recording how long creating the
+                 SDK client took
+
+    Returns:
+        The transport
+    """
+    if name == VAPI_TRANSPORT:
+        return SdkTransport(api_key=api_key, timings=timings)
+    if name == FAKE_TRANSPORT:
+        return FakeTransport()
+    raise ValueError(
+        f"Unknown transport '{name}' "
+        f"(expected one of: {', '.join(TRANSPORTS)})"
+    )
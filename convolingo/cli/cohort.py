@@ -0,0 +1,463 @@
+import json
+import logging
+import signal
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from convolingo.api.client import VapiClient
+from convolingo.utils.config import (
+    DEFAULT_TARGET_LANGUAGE, DEFAULT_ORIGIN_LANGUAGE, DEFAULT_CHAPTER,
+    DEFAULT_ASSISTANT_PROFILE, COHORT_CONCURRENCY
+)
+from convolingo.utils.telemetry import percentile
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Lifecycle states of a cohort session
+PENDING = "pending"
+CONNECTING = "connecting"
+CONNECTED = "connected"
+ENDED = "ended"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# Spec file keys and the SessionSpec attributes they set
+SPEC_FIELDS = {
+    "name": "name",
+    "target": "target_language",
+    "origin": "origin_language",
+    "chapter": "chapter",
+    "user_id": "user_id",
+    "duration": "duration",
+    "profile": "profile",
+    "persist_assistant": "persist_assistant",
+    "messages": "messages",
+    "words": "words",
+}
+
+
+class SessionSpec:
+    """Settings of one session of a cohort"""
+
+    def __init__(self, name: str,
+                 target_language: str = DEFAULT_TARGET_LANGUAGE,
+                 origin_language: str = DEFAULT_ORIGIN_LANGUAGE,
+                 chapter: str = DEFAULT_CHAPTER,
+                 user_id: Optional[str] = None,
+                 duration: Optional[float] = None,
+                 profile: str = DEFAULT_ASSISTANT_PROFILE,
+                 persist_assistant: Optional[bool] = None,
+                 messages: Optional[List[str]] = None,
+                 words: Optional[List[Dict[str, str]]] = None):
+        """
+        Initialize the session settings
+
+        Args:
+            name: Name of the session in logs and stats
+            target_language: The language to learn
+            origin_language: The user's native language
+            chapter: The current chapter or module being studied
+            user_id: Optional user ID for personalization
+            duration: Optional duration in seconds (None until the call
+                      ends or the cohort is stopped)
+            profile: Name of the assistant profile
+            persist_assistant: Whether to start the call with a persisted
+                               assistant (default: the configured setting)
+            messages: Text messages to send once connected
+            words: Vocabulary words ({"word", "translation", "notes"}) to
+                   add to the learner's vocabulary before connecting
+        """
+        self.name = name
+        self.target_language = target_language
+        self.origin_language = origin_language
+        self.chapter = chapter
+        self.user_id = user_id
+        self.duration = duration
+        self.profile = profile
+        self.persist_assistant = persist_assistant
+        self.messages = list(messages or [])
+        self.words = list(words or [])
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any],
+                  defaults: Optional[Dict[str, Any]] = None,
+                  index: int = 0) -> "SessionSpec":
+        """
+        Create session settings from a spec file entry
+
+        Args:
+            data: The session entry
+            defaults: Values used for keys the entry does not set
+            index: Position of the entry, for the default name
+
+        Returns:
+            The session settings
+
+        Raises:
+            ValueError: If the entry has unknown keys
+        """
+        merged = dict(defaults or {}, **data)
+        unknown = set(merged) - set(SPEC_FIELDS)
+        if unknown:
+            raise ValueError(
+                f"Unknown session spec keys: {', '.join(sorted(unknown))} "
+                f"(expected: {', '.join(SPEC_FIELDS)})"
+            )
+        merged.setdefault("name", merged.get("user_id") or f"session-{index + 1}")
+        return cls(**{SPEC_FIELDS[key]: value for key, value in merged.items()})
+
+
+def load_spec_file(path: Path) -> Dict[str, Any]:
+    """
+    Load a cohort spec file
+
+    The file is JSON: either a list of session entries, or an object with
+    "sessions" (the list), optional "defaults" applied to every entry and
+    an optional "concurrency".
+
+    Args:
+        path: Path of the spec file
+
+    Returns:
+        Dict with "sessions" (list of SessionSpec) and "concurrency" (None
+        if the file does not set it)
+
+    Raises:
+        ValueError: If the file is not a valid spec
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {"sessions": data}
+    if not isinstance(data, dict) or not isinstance(data.get("sessions"), list):
+        raise ValueError("A cohort spec needs a list of sessions")
+
+    defaults = data.get("defaults") or {}
+    specs = [
+        SessionSpec.from_dict(entry, defaults, index)
+        for index, entry in enumerate(data["sessions"])
+    ]
+    names = [spec.name for spec in specs]
+    if len(set(names)) != len(names):
+        raise ValueError("Session names in a cohort spec must be unique")
+    return {"sessions": specs, "concurrency": data.get("concurrency")}
+
+
+class CohortSession:
+    """One session of a cohort, with its lifecycle and stats"""
+
+    def __init__(self, spec: SessionSpec, client: VapiClient):
+        """
+        Initialize the session
+
+        Args:
+            spec: The session settings
+            client: The VapiClient owned by this session
+        """
+        self.spec = spec
+        self.client = client
+        self.state = PENDING
+        self.error: Optional[str] = None
+        self.messages_sent = 0
+        self.queued_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self.connected_at: Optional[float] = None
+        self.ended_at: Optional[float] = None
+        self._stopped = threading.Event()
+
+    def run(self, vocabulary_tool=None) -> None:
+        """
+        Connect, send the spec's messages and stay connected until done
+
+        Args:
+            vocabulary_tool: Shared vocabulary tool for the spec's words
+        """
+        if self._stopped.is_set():
+            self._finish(CANCELLED)
+            return
+
+        self.started_at = time.monotonic()
+        self.state = CONNECTING
+        try:
+            for entry in self.spec.words:
+                vocabulary_tool.add_word(
+                    self.spec.target_language, entry["word"],
+                    entry["translation"], entry.get("notes"),
+                    user_id=self.spec.user_id
+                )
+
+            if not self.client.connect(
+                target_language=self.spec.target_language,
+                native_language=self.spec.origin_language,
+                chapter=self.spec.chapter,
+                user_id=self.spec.user_id,
+                profile=self.spec.profile,
+                persist=self.spec.persist_assistant
+            ):
+                self._finish(FAILED, "could not connect")
+                return
+            self.connected_at = time.monotonic()
+            self.state = CONNECTED
+
+            for text in self.spec.messages:
+                if self._stopped.is_set():
+                    break
+                if self.client.send_message(text):
+                    self.messages_sent += 1
+
+            # connect() resets the client's stop event, so a stop that
+            # arrived while connecting is applied here
+            if self._stopped.is_set():
+                self.client.request_stop("cohort stopped")
+            self.client.maintain_connection(timeout=self.spec.duration)
+            self._finish(ENDED)
+        except Exception as e:
+            logger.error(f"Session {self.spec.name} failed: {e}")
+            self.client.disconnect()
+            self._finish(FAILED, str(e))
+
+    def stop(self, reason: str) -> None:
+        """
+        End the session, or cancel it if it has not started
+
+        Args:
+            reason: Reason for the log
+        """
+        self._stopped.set()
+        self.client.request_stop(reason)
+
+    def _finish(self, state: str, error: Optional[str] = None) -> None:
+        """Record the final state of the session"""
+        self.state = state
+        self.error = error
+        self.ended_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the lifecycle stats of the session
+
+        Returns:
+            Dict with the state, timings in seconds and messages sent
+        """
+        def span(start, end):
+            if start is None or end is None:
+                return None
+            return round(end - start, 4)
+
+        return {
+            "name": self.spec.name,
+            "user_id": self.spec.user_id,
+            "state": self.state,
+            "error": self.error,
+            "queued_seconds": span(self.queued_at, self.started_at),
+            "connect_seconds": span(self.started_at, self.connected_at),
+            "connected_seconds": span(self.connected_at, self.ended_at),
+            "messages_sent": self.messages_sent,
+        }
+
+
+class SessionManager:
+    """
+    Run many sessions concurrently in one process
+
+    At most ``concurrency`` sessions are active at once; the rest wait in
+    order. Every session has its own VapiClient, while the REST connection
+    pool, the assistant configuration cache and the vocabulary store are
+    shared. Sessions are threads that block on their stop event, so an idle
+    session costs a thread and no CPU.
+    """
+
+    def __init__(self, specs: List[SessionSpec],
+                 concurrency: int = COHORT_CONCURRENCY,
+                 client_factory: Optional[Callable[[], VapiClient]] = None,
+                 vocabulary_tool=None):
+        """
+        Initialize the session manager
+
+        Args:
+            specs: Settings of the sessions to run
+            concurrency: Maximum number of sessions active at once
+            client_factory: Optional factory of session clients (default:
+                            VapiClient sharing the process-wide caches)
+            vocabulary_tool: Optional vocabulary tool for the spec's words
+                             (default: one using the configured store,
+                             created if any session adds words)
+        """
+        self.concurrency = max(1, concurrency)
+        client_factory = client_factory or VapiClient
+        self.sessions = [CohortSession(spec, client_factory()) for spec in specs]
+        self.vocabulary_tool = vocabulary_tool
+        self._owns_vocabulary_tool = False
+        self._stopping = threading.Event()
+        self._active = 0
+        self.peak_active = 0
+        self._lock = threading.Lock()
+        self.started_at: Optional[float] = None
+        self.ended_at: Optional[float] = None
+
+    def run(self) -> List[Dict[str, Any]]:
+        """
+        Run all sessions and wait until they are done
+
+        In the main thread, SIGINT and SIGTERM stop the whole cohort.
+
+        Returns:
+            The stats of every session, in spec order
+        """
+        if self.vocabulary_tool is None and any(
+                session.spec.words for session in self.sessions):
+            from convolingo.tools.vocabulary import VocabularyTool
+            self.vocabulary_tool = VocabularyTool()
+            self._owns_vocabulary_tool = True
+
+        self.started_at = time.monotonic()
+        previous = self._install_signal_handlers()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency,
+                                    thread_name_prefix="cohort") as executor:
+                futures = [
+                    executor.submit(self._run_session, session)
+                    for session in self.sessions
+                ]
+                wait(futures)
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            if self._owns_vocabulary_tool:
+                self.vocabulary_tool.close()
+            self.ended_at = time.monotonic()
+        return [session.stats() for session in self.sessions]
+
+    def _run_session(self, session: CohortSession) -> None:
+        """Run one session while counting the active sessions"""
+        with self._lock:
+            self._active += 1
+            self.peak_active = max(self.peak_active, self._active)
+        try:
+            session.run(self.vocabulary_tool)
+        finally:
+            with self._lock:
+                self._active -= 1
+        logger.info("Session %s %s", session.spec.name, session.state)
+
+    def stop(self, reason: str = "stopped") -> None:
+        """
+        Stop all running sessions and cancel the waiting ones
+
+        Args:
+            reason: Reason for the log
+        """
+        if self._stopping.is_set():
+            return
+        self._stopping.set()
+        logger.info(f"Stopping cohort: {reason}")
+        for session in self.sessions:
+            session.stop(reason)
+
+    def _install_signal_handlers(self) -> Dict[int, Any]:
+        """Turn SIGINT and SIGTERM into a cohort stop (main thread only)"""
+        if threading.current_thread() is not threading.main_thread():
+            return {}
+        previous = {}
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            previous[sig] = signal.signal(
+                sig, lambda signum, frame: self.stop(
+                    signal.Signals(signum).name
+                )
+            )
+        return previous
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Summarize the cohort run
+
+        Returns:
+            Dict with session counts by state, connect latency percentiles
+            in milliseconds, the peak number of active sessions and the
+            wall-clock time in seconds
+        """
+        states: Dict[str, int] = {}
+        for session in self.sessions:
+            states[session.state] = states.get(session.state, 0) + 1
+
+        connects = sorted(
+            (session.connected_at - session.started_at) * 1000
+            for session in self.sessions if session.connected_at is not None
+        )
+
+        def connect_ms(fraction: float) -> Optional[float]:
+            value = percentile(connects, fraction)
+            return None if value is None else round(value, 2)
+
+        elapsed = None
+        if self.started_at is not None and self.ended_at is not None:
+            elapsed = round(self.ended_at - self.started_at, 3)
+        return {
+            "sessions": len(self.sessions),
+            "states": states,
+            "connect_p50_ms": connect_ms(0.50),
+            "connect_p95_ms": connect_ms(0.95),
+            "connect_mean_ms": (round(statistics.mean(connects), 2)
+                                if connects else None),
+            "peak_active": self.peak_active,
+            "concurrency": self.concurrency,
+            "elapsed_seconds": elapsed,
+        }
+
+
+class Cohort:
+    """Command running the sessions of a cohort spec file"""
+
+    def start(self, spec_file: str, concurrency: Optional[int] = None,
+              output: Optional[str] = None) -> bool:
+        """
+        Run a cohort and print its stats
+
+        Args:
+            spec_file: Path of the JSON spec file
+            concurrency: Maximum number of sessions at once (default: the
+                         spec's value, or COHORT_CONCURRENCY)
+            output: Optional path to write the stats to as JSON
+
+        Returns:
+            bool: True if every session ended without failing
+        """
+        try:
+            spec = load_spec_file(Path(spec_file))
+        except (OSError, ValueError) as e:
+            logger.error(f"Invalid cohort spec {spec_file}: {e}")
+            return False
+
+        concurrency = concurrency or spec["concurrency"] or COHORT_CONCURRENCY
+        manager = SessionManager(spec["sessions"], concurrency=concurrency)
+        print(f"Running {len(manager.sessions)} sessions, "
+              f"{manager.concurrency} at a time. Press Ctrl+C to stop.")
+        stats = manager.run()
+        summary = manager.summary()
+
+        print(f"\n{'session':<20} {'state':<10} {'connect':>9} "
+              f"{'connected':>10} {'messages':>8}")
+        for entry in stats:
+            connect = entry["connect_seconds"]
+            connected = entry["connected_seconds"]
+            print(f"{entry['name'][:20]:<20} {entry['state']:<10} "
+                  f"{'-' if connect is None else f'{connect:.2f}s':>9} "
+                  f"{'-' if connected is None else f'{connected:.1f}s':>10} "
+                  f"{entry['messages_sent']:>8}"
+                  + (f"  {entry['error']}" if entry["error"] else ""))
+        states = ", ".join(f"{count} {state}"
+                           for state, count in summary["states"].items())
+        print(f"\n{summary['sessions']} sessions ({states}) in "
+              f"{summary['elapsed_seconds']}s, at most "
+              f"{summary['peak_active']} at once")
+
+        if output:
+            with open(output, 'w', encoding='utf-8') as f:
+                json.dump({"summary": summary, "sessions": stats}, f,
+                          indent=2)
+        return summary["states"].get(FAILED, 0) == 0
@@ -4,9 +4,11 @@ import sys
 from typing import Callable, Dict, Any, Optional
 
 from convolingo.api.client import VapiClient
+from convolingo.api.outbound import OutboundQueue
 from convolingo.tools.vocabulary import VocabularyTool
 from convolingo.utils.config import (
-    DEFAULT_TARGET_LANGUAGE, DEFAULT_ORIGIN_LANGUAGE, DEFAULT_CHAPTER
+    DEFAULT_TARGET_LANGUAGE, DEFAULT_ORIGIN_LANGUAGE, DEFAULT_CHAPTER,
+    OUTBOUND_COALESCE_SECONDS, OUTBOUND_FLUSH_TIMEOUT
 )
 
 # Set up logging
@@ -16,18 +18,31 @@ logger = logging.getLogger(__name__)
 class InteractiveSession:
     """Interactive language learning session with text input"""
     
-    def __init__(self):
-        """Initialize the interactive session"""
-        self.client = VapiClient()
+    def __init__(self, client: Optional[VapiClient] = None,
+                 coalesce_window: float = OUTBOUND_COALESCE_SECONDS):
+        """
+        Initialize the interactive session
+        
+        Args:
+            client: Optional VAPI client, e.g. one already pre-warming
+            coalesce_window: Seconds to wait for more typed or pasted
+                             lines to send together as one message
+        """
+        self.client = client or VapiClient()
         self.vocabulary_tool = VocabularyTool()
+        self.coalesce_window = coalesce_window
+        # Messages are sent by a worker so typing never waits on the SDK
+        self.outbound: Optional[OutboundQueue] = None
         self.running = False
+        self.user_id = None
     
     def start(
         self, 
         target_language: str = DEFAULT_TARGET_LANGUAGE,
         origin_language: str = DEFAULT_ORIGIN_LANGUAGE,
         chapter: str = DEFAULT_CHAPTER,
-        user_id: Optional[str] = None
+        user_id: Optional[str] = None,
+        persist_assistant: Optional[bool] = None
     ) -> None:
         """
         Start an interactive session
@@ -37,8 +52,12 @@ class InteractiveSession:
             origin_language: The user's native language
             chapter: The current chapter or module being studied
             user_id: Optional user ID for personalization
+            persist_assistant: Whether to start the call with an assistant
+                               persisted in VAPI (default: the
+                               VAPI_PERSIST_ASSISTANTS setting)
         """
         self.running = True
+        self.user_id = user_id
         
         logger.info(f"Starting {origin_language} to {target_language} "
                   f"learning session...")
@@ -48,7 +67,8 @@ class InteractiveSession:
             target_language=target_language,
             native_language=origin_language,
             chapter=chapter,
-            user_id=user_id
+            user_id=user_id,
+            persist=persist_assistant
         ):
             logger.error("Failed to connect to VAPI. Exiting.")
             return
@@ -57,6 +77,12 @@ class InteractiveSession:
         print(f"Current chapter: {chapter}")
         print("Type 'exit' to quit, 'help' for commands.")
         
+        self.outbound = OutboundQueue(
+            self.client.send_message,
+            coalesce_window=self.coalesce_window,
+            on_failed=self._message_failed
+        )
+        
         # Start input thread
         input_thread = threading.Thread(
             target=self._handle_input,
@@ -66,11 +92,16 @@ class InteractiveSession:
         
         # Maintain connection in main thread
         try:
-            self.client.maintain_connection(lambda: self.running)
+            with self.client.stop_on_signals():
+                self.client.maintain_connection()
         except KeyboardInterrupt:
             logger.info("Session interrupted by user")
         finally:
             self.running = False
+            # Anything still queued after a signal or hang-up is dropped
+            self.outbound.close(flush=False)
+            logger.info("Outbound messages: %s", self.outbound.stats())
+            self.vocabulary_tool.close()
             print("Session ended.")
     
     def _handle_input(self) -> None:
@@ -83,35 +114,81 @@ class InteractiveSession:
                     continue
                     
                 if text.lower() == 'exit':
-                    self.running = False
+                    self._finish("exit")
                     return
                 
                 if text.lower() == 'help':
                     self._show_help()
                     continue
                 
+                if text.lower() == 'stats':
+                    self._show_stats()
+                    continue
+                
                 # Check for vocabulary commands
                 if text.lower().startswith('vocab '):
                     self._handle_vocabulary_command(text[6:])
                     continue
                 
-                # Send message to assistant
-                self.client.send_message(text)
+                # Queue the message for the assistant; waits only while
+                # the queue is full
+                self.outbound.put(text)
                 
             except EOFError:
-                self.running = False
+                self._finish("end of input")
                 return
             except Exception as e:
                 logger.error(f"Error handling input: {e}")
     
+    def _finish(self, reason: str) -> None:
+        """
+        Send what is still queued, then end the session
+        
+        Waits at most OUTBOUND_FLUSH_TIMEOUT seconds, so failing sends
+        and their retries do not hold up the exit; lines still queued
+        then are dropped when the session closes the queue.
+        
+        Args:
+            reason: Reason for the log
+        """
+        self.running = False
+        if not self.outbound.wait_idle(timeout=OUTBOUND_FLUSH_TIMEOUT):
+            logger.warning("Queued messages not sent within %.1f s",
+                           OUTBOUND_FLUSH_TIMEOUT)
+        self.client.request_stop(reason)
+    
+    def _message_failed(self, text: str) -> None:
+        """
+        Tell the user a message could not be sent
+        
+        Args:
+            text: The message text
+        """
+        print(f"\nCould not send: {text[:60]}")
+    
+    def _show_stats(self) -> None:
+        """Show outbound message statistics"""
+        stats = self.outbound.stats()
+        print(f"\nQueued now: {stats['depth']} (most: {stats['max_depth']} "
+              f"of {stats['capacity']})")
+        print(f"Sent: {stats['messages']} messages from {stats['lines']} "
+              f"lines ({stats['coalesced']} joined), {stats['retries']} "
+              f"retries, {stats['failed']} failed")
+        if stats['send_p50_ms'] is not None:
+            print(f"Send time: p50 {stats['send_p50_ms']:.1f} ms, "
+                  f"p95 {stats['send_p95_ms']:.1f} ms")
+    
     def _show_help(self) -> None:
         """Show help information"""
         print("\nAvailable commands:")
         print("  exit            - Exit the session")
         print("  help            - Show this help information")
+        print("  stats           - Show message sending statistics")
         print("  vocab add       - Add a new vocabulary word")
         print("  vocab list      - List all vocabulary words")
         print("  vocab search    - Search for a vocabulary word")
+        print("  vocab review    - Review the words that are due (or grade one:")
+        print("                    vocab review word 0-5)")
     
     def _handle_vocabulary_command(self, command: str) -> None:
         """
@@ -134,12 +211,15 @@ class InteractiveSession:
             notes = " ".join(parts[3:]) if len(parts) > 3 else None
             
             result = self.vocabulary_tool.add_word(
-                DEFAULT_TARGET_LANGUAGE, word, translation, notes
+                DEFAULT_TARGET_LANGUAGE, word, translation, notes,
+                user_id=self.user_id
             )
             print(result["message"])
             
         elif action == 'list':
-            result = self.vocabulary_tool.list_words(DEFAULT_TARGET_LANGUAGE)
+            result = self.vocabulary_tool.list_words(
+                DEFAULT_TARGET_LANGUAGE, user_id=self.user_id
+            )
             print(result["message"])
             
             if result["words"]:
@@ -149,7 +229,7 @@ class InteractiveSession:
         elif action == 'search' and len(parts) >= 2:
             query = " ".join(parts[1:])
             result = self.vocabulary_tool.search_word(
-                DEFAULT_TARGET_LANGUAGE, query
+                DEFAULT_TARGET_LANGUAGE, query, user_id=self.user_id
             )
             print(result["message"])
             
@@ -157,5 +237,37 @@ class InteractiveSession:
                 for word in result["results"]:
                     print(f"  {word['word']} - {word['translation']}")
         
+        elif action == 'review' and len(parts) == 1:
+            self._review_due_words()
+            
+        elif action == 'review' and len(parts) == 3 and parts[2].isdigit():
+            # Format: vocab review word quality
+            result = self.vocabulary_tool.review_word(
+                DEFAULT_TARGET_LANGUAGE, parts[1], int(parts[2]),
+                user_id=self.user_id
+            )
+            print(result["message"])
+        
         else:
-            print("Invalid vocabulary command. Type 'help' for usage.") 
\ No newline at end of file
+            print("Invalid vocabulary command. Type 'help' for usage.") 
+    
+    def _review_due_words(self) -> None:
+        """Quiz the user on the words due for review and grade each one"""
+        result = self.vocabulary_tool.due_words(
+            DEFAULT_TARGET_LANGUAGE, user_id=self.user_id
+        )
+        print(result["message"])
+        
+        for entry in result["words"]:
+            answer = input(f"\n  {entry['word']} (Enter to show, q to stop) ")
+            if answer.strip().lower() == 'q':
+                return
+            print(f"  {entry['translation']}")
+            grade = input("  How well did you know it (0-5, Enter to skip)? ")
+            if not grade.strip().isdigit():
+                continue
+            reviewed = self.vocabulary_tool.review_word(
+                DEFAULT_TARGET_LANGUAGE, entry['word'], int(grade),
+                user_id=self.user_id
+            )
+            print(f"  {reviewed['message']}")
@@ -1,6 +1,5 @@
 import logging
 import sys
-import time
 from typing import Optional
 
 from convolingo.api.client import VapiClient
@@ -15,9 +14,14 @@ logger = logging.getLogger(__name__)
 class Session:
     """Basic language learning session with VAPI"""
     
-    def __init__(self):
-        """Initialize the basic session"""
-        self.client = VapiClient()
+    def __init__(self, client: Optional[VapiClient] = None):
+        """
+        Initialize the basic session
+        
+        Args:
+            client: Optional VAPI client, e.g. one already pre-warming
+        """
+        self.client = client or VapiClient()
         self.running = False
     
     def start(
@@ -26,7 +30,8 @@ class Session:
         origin_language: str = DEFAULT_ORIGIN_LANGUAGE,
         chapter: str = DEFAULT_CHAPTER,
         user_id: Optional[str] = None,
-        duration: Optional[int] = None
+        duration: Optional[int] = None,
+        persist_assistant: Optional[bool] = None
     ) -> None:
         """
         Start a basic session
@@ -37,6 +42,9 @@ class Session:
             chapter: The current chapter or module being studied
             user_id: Optional user ID for personalization
             duration: Optional duration in seconds (None for indefinite)
+            persist_assistant: Whether to start the call with an assistant
+                               persisted in VAPI (default: the
+                               VAPI_PERSIST_ASSISTANTS setting)
         """
         self.running = True
         
@@ -47,7 +55,8 @@ class Session:
             target_language=target_language,
             native_language=origin_language,
             chapter=chapter,
-            user_id=user_id
+            user_id=user_id,
+            persist=persist_assistant
         ):
             logger.error("Failed to connect to VAPI. Exiting.")
             return
@@ -60,20 +69,14 @@ class Session:
         # If duration is specified, run for that time
         if duration:
             print(f"Session will run for {duration} seconds.")
-            try:
-                time.sleep(duration)
-            except KeyboardInterrupt:
-                logger.info("Session interrupted by user")
-            finally:
-                self.running = False
-                self.client.disconnect()
-                print("Session ended.")
-        else:
-            # Otherwise, maintain connection until interrupted
-            try:
-                self.client.maintain_connection(lambda: self.running)
-            except KeyboardInterrupt:
-                logger.info("Session interrupted by user")
-            finally:
-                self.running = False
-                print("Session ended.")
\ No newline at end of file
+        
+        # Maintain connection until the duration is up, the call ends or
+        # the user interrupts
+        try:
+            with self.client.stop_on_signals():
+                self.client.maintain_connection(timeout=duration)
+        except KeyboardInterrupt:
+            logger.info("Session interrupted by user")
+        finally:
+            self.running = False
+            print("Session ended.")
\ No newline at end of file
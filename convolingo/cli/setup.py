@@ -1,49 +1,24 @@
 import logging
 import sys
 import json
-import requests
 import time
 import signal
 import os
+import threading
 from typing import Dict, Any, Optional
 
-from convolingo.utils.config import config
+from convolingo.utils.config import config, FLASK_MODE, ASYNC_MODE
 from convolingo.utils.ngrok_helper import NgrokTunnel
-from convolingo.api.server import WebhookServer
+from convolingo.api.rest import get_rest_client
+from convolingo.utils.pipeline import Pipeline, StepFailed
+from convolingo.utils.setup_state import SetupState, SETUP_STATE_FILE_NAME
+from convolingo.tools.schema import (
+    TOOL_NAME, TOOL_DESCRIPTION, TOOL_PARAMETERS, tool_spec_hash
+)
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
-# Constants
-TOOL_NAME = 'vocabularyTool'
-TOOL_DESCRIPTION = 'Tool to add, review and search vocabulary words'
-TOOL_PARAMETERS = {
-    "type": "object",
-    "required": ["action"],
-    "properties": {
-        "word": {
-            "type": "string",
-            "description": "The vocabulary word to add or search for"
-        },
-        "action": {
-            "type": "string",
-            "description": "The action to perform (add, list, search)"
-        },
-        "language": {
-            "type": "string",
-            "description": "The language the word is in"
-        },
-        "translation": {
-            "type": "string",
-            "description": "The translation of the word"
-        },
-        "notes": {
-            "type": "string",
-            "description": "Additional notes about the word"
-        }
-    }
-}
-
 
 class SetupTool:
     """Tool for setting up and configuring the vocabulary tool with VAPI"""
@@ -52,6 +27,11 @@ class SetupTool:
         """Initialize the setup tool"""
         self.api_key = config.api_key
         self.api_base = config.api_base
+        self.rest = get_rest_client()
+        self.state = SetupState(
+            config.history_dir / SETUP_STATE_FILE_NAME,
+            self.api_key, self.api_base
+        )
         self.server = None
         self.server_process = None
         self.ngrok = NgrokTunnel()
@@ -65,16 +45,11 @@ class SetupTool:
         """
         try:
             # Make a simple API call to validate the key
-            headers = {
-                "Authorization": f"Bearer {self.api_key}"
-            }
-            response = requests.get(
-                f"{self.api_base}/assistants",
-                headers=headers
-            )
+            response = self.rest.get("/assistants")
             
             if response.status_code == 200:
                 logger.info("API key is valid")
+                self.state.mark_key_validated()
                 return True
             else:
                 logger.error(
@@ -93,28 +68,17 @@ class SetupTool:
             str: Tool ID if successful, None otherwise
         """
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
             # Create the tool
-            payload = {
-                "name": TOOL_NAME,
-                "description": TOOL_DESCRIPTION,
-                "input_schema": TOOL_PARAMETERS
-            }
-            
-            response = requests.post(
-                f"{self.api_base}/tools",
-                headers=headers,
-                json=payload
-            )
+            response = self.rest.post("/tools", json=self._tool_definition())
             
             if response.status_code == 201:
                 data = response.json()
                 tool_id = data.get("id")
                 logger.info(f"Vocabulary tool created with ID: {tool_id}")
+                if tool_id:
+                    self.state.set_tool(
+                        tool_id, managed=True, spec_hash=tool_spec_hash()
+                    )
                 return tool_id
             else:
                 logger.error(
@@ -125,45 +89,131 @@ class SetupTool:
             logger.error(f"Error creating vocabulary tool: {e}")
             return None
     
-    def update_server_url(self, tool_id: str, server_url: str) -> bool:
+    def _tool_definition(self) -> Dict[str, Any]:
+        """Get the desired definition of the vocabulary tool"""
+        return {
+            "name": TOOL_NAME,
+            "description": TOOL_DESCRIPTION,
+            "input_schema": TOOL_PARAMETERS
+        }
+    
+    def _patch_tool(self, tool_id: str, payload: Dict[str, Any],
+                    what: str) -> Optional[int]:
         """
-        Update the server URL for the tool
+        Update fields of a tool
         
         Args:
             tool_id: The tool ID
-            server_url: The server URL
+            payload: Fields to update
+            what: Description of the update for log messages
             
         Returns:
-            bool: True if successful, False otherwise
+            int: The response status code, or None if the request failed
         """
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            # Update the tool
-            payload = {
-                "server_url": server_url
-            }
-            
-            response = requests.patch(
-                f"{self.api_base}/tools/{tool_id}",
-                headers=headers,
-                json=payload
-            )
-            
-            if response.status_code == 200:
-                logger.info(f"Server URL updated to: {server_url}")
-                return True
-            else:
+            response = self.rest.patch(f"/tools/{tool_id}", json=payload)
+            if response.status_code != 200:
                 logger.error(
-                    f"Failed to update server URL: {response.status_code} {response.text}"
+                    f"Failed to update {what}: {response.status_code} {response.text}"
                 )
-                return False
+            return response.status_code
         except Exception as e:
-            logger.error(f"Error updating server URL: {e}")
-            return False
+            logger.error(f"Error updating {what}: {e}")
+            return None
+    
+    def ensure_api_key(self) -> bool:
+        """
+        Check the API key unless it was already validated
+        
+        Returns:
+            bool: True if the API key is valid, False otherwise
+        """
+        if self.state.key_validated:
+            logger.info("API key previously validated")
+            return True
+        return self.check_api_key()
+    
+    def reconcile_tool(self, tool_id: Optional[str] = None,
+                       server_url: Optional[str] = None) -> Optional[str]:
+        """
+        Make sure the vocabulary tool exists as desired
+        
+        The desired state is compared against the local setup state, and
+        the API is only called for what differs: the tool is created if
+        setup has not created one yet, its definition is updated if
+        TOOL_NAME, TOOL_DESCRIPTION or TOOL_PARAMETERS changed, and its
+        server URL is updated if it changed. A cached tool that no longer
+        exists in VAPI is forgotten and created again.
+        
+        Args:
+            tool_id: Optional explicit tool ID (default: the tool created
+                     by setup)
+            server_url: Optional server URL the tool should call
+            
+        Returns:
+            str: Tool ID if successful, None otherwise
+        """
+        managed = tool_id is None
+        if managed:
+            tool_id = self.state.managed_tool_id
+        
+        if managed and tool_id:
+            spec_hash = tool_spec_hash()
+            if self.state.get_tool(tool_id).get("spec_hash") != spec_hash:
+                status = self._patch_tool(
+                    tool_id, self._tool_definition(), "tool definition"
+                )
+                if status == 404:
+                    logger.warning(f"Cached tool {tool_id} no longer exists")
+                    self.state.forget_tool(tool_id)
+                    tool_id = None
+                elif status != 200:
+                    return None
+                else:
+                    logger.info(f"Tool definition of {tool_id} updated")
+                    self.state.set_tool(tool_id, spec_hash=spec_hash)
+        
+        if not tool_id:
+            tool_id = self.create_vocabulary_tool()
+            if not tool_id:
+                return None
+        else:
+            logger.info(f"Using vocabulary tool {tool_id}")
+        
+        if server_url:
+            return self.reconcile_server_url(tool_id, server_url, managed)
+        return tool_id
+    
+    def reconcile_server_url(self, tool_id: str, server_url: str,
+                             managed: bool = True) -> Optional[str]:
+        """
+        Make sure the tool calls the given server URL
+        
+        Args:
+            tool_id: The tool ID
+            server_url: The server URL the tool should call
+            managed: Whether the tool was created by setup, in which case
+                     it is created again if it no longer exists
+            
+        Returns:
+            str: ID of the tool now calling the URL (a new one if it had
+                 to be created again), None if unsuccessful
+        """
+        if self.state.get_tool(tool_id).get("server_url") == server_url:
+            return tool_id
+        
+        status = self._patch_tool(
+            tool_id, {"server_url": server_url}, "server URL"
+        )
+        if status == 404 and managed:
+            logger.warning(f"Cached tool {tool_id} no longer exists")
+            self.state.forget_tool(tool_id)
+            return self.reconcile_tool(None, server_url)
+        if status != 200:
+            return None
+        logger.info(f"Server URL updated to: {server_url}")
+        self.state.set_tool(tool_id, server_url=server_url)
+        return tool_id
     
     def assign_tool_to_assistant(self, tool_id: str) -> bool:
         """
@@ -178,16 +228,12 @@ class SetupTool:
         try:
             from convolingo.utils.config import ASSISTANT_ID
             
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
+            if self.state.is_assigned(ASSISTANT_ID, tool_id):
+                logger.info("Tool already assigned to assistant")
+                return True
             
             # Get current assistant tools
-            response = requests.get(
-                f"{self.api_base}/assistants/{ASSISTANT_ID}",
-                headers=headers
-            )
+            response = self.rest.get(f"/assistants/{ASSISTANT_ID}")
             
             if response.status_code != 200:
                 logger.error(
@@ -202,6 +248,7 @@ class SetupTool:
             for tool in current_tools:
                 if tool.get("id") == tool_id:
                     logger.info("Tool already assigned to assistant")
+                    self.state.mark_assigned(ASSISTANT_ID, tool_id)
                     return True
             
             # Add the new tool
@@ -212,14 +259,13 @@ class SetupTool:
                 "tools": current_tools
             }
             
-            response = requests.patch(
-                f"{self.api_base}/assistants/{ASSISTANT_ID}",
-                headers=headers,
-                json=payload
+            response = self.rest.patch(
+                f"/assistants/{ASSISTANT_ID}", json=payload
             )
             
             if response.status_code == 200:
                 logger.info(f"Tool assigned to assistant {ASSISTANT_ID}")
+                self.state.mark_assigned(ASSISTANT_ID, tool_id)
                 return True
             else:
                 logger.error(
@@ -230,87 +276,148 @@ class SetupTool:
             logger.error(f"Error assigning tool to assistant: {e}")
             return False
     
-    def run_setup(self, run_server: bool = True, tool_id: str = None) -> None:
+    def build_pipeline(self, run_server: bool = True, tool_id: str = None,
+                       server_mode: str = FLASK_MODE,
+                       adopt_tunnel: bool = True) -> Pipeline:
         """
-        Run the complete setup process
+        Build the dependency graph of the setup steps
+        
+        Key validation, the ngrok tunnel, the webhook server and the tool
+        run concurrently; only the server URL update (which needs the tool
+        and the tunnel) and the assignment (which needs the tool) wait.
         
         Args:
             run_server: Whether to run the webhook server
-            tool_id: Optional tool ID (if not provided, will create a new tool)
+            tool_id: Optional explicit tool ID
+            server_mode: Serving mode for the webhook server (flask or async)
+            adopt_tunnel: Whether to reuse a running ngrok tunnel to the
+                          webhook port
+            
+        Returns:
+            Pipeline: The setup pipeline
         """
-        # Check API key
-        if not self.check_api_key():
-            logger.error("API key is invalid. Please check your .env file.")
-            return
-
-        # Start webhook server if requested
+        managed = tool_id is None
+        pipeline = Pipeline("setup")
+        
+        def check_key():
+            if not self.ensure_api_key():
+                raise StepFailed(
+                    "API key is invalid. Please check your .env file."
+                )
+        
+        def reconcile_tool():
+            result = self.reconcile_tool(tool_id)
+            if not result:
+                raise StepFailed("Failed to set up vocabulary tool")
+            return result
+        
+        def assign(tool):
+            if not self.assign_tool_to_assistant(tool):
+                raise StepFailed("Failed to assign tool to assistant")
+        
+        pipeline.add("key", check_key)
+        pipeline.add("tool", reconcile_tool)
+        pipeline.add("assign", assign, requires=("tool",))
+        
         if run_server:
-            # Start ngrok tunnel
-            server_url = self.ngrok.start()
-            if not server_url:
-                logger.error("Failed to start ngrok tunnel. Exiting.")
-                return
-                
-            # Add API path to URL
-            webhook_url = self.ngrok.get_api_url("api/vocabulary")
-            
-            # Create server
-            self.server = WebhookServer()
+            def start_tunnel():
+                if not self.ngrok.start(adopt=adopt_tunnel):
+                    raise StepFailed("Failed to start ngrok tunnel")
+                # Add API path to URL
+                return self.ngrok.get_api_url("api/vocabulary")
             
-            # Start server in a thread
-            import threading
-            server_thread = threading.Thread(
-                target=self.server.run,
-                kwargs={"debug": False},
-                daemon=True
-            )
-            server_thread.start()
-            
-            logger.info(f"Webhook server running at {webhook_url}")
-            
-            # Create or update tool
-            if not tool_id:
-                tool_id = self.create_vocabulary_tool()
-                if not tool_id:
-                    logger.error("Failed to create vocabulary tool. Exiting.")
-                    self.ngrok.stop()
-                    return
-            
-            # Update server URL
-            if not self.update_server_url(tool_id, webhook_url):
-                logger.error("Failed to update server URL. Exiting.")
-                self.ngrok.stop()
-                return
-            
-            # Assign tool to assistant
-            if not self.assign_tool_to_assistant(tool_id):
-                logger.error("Failed to assign tool to assistant. Exiting.")
-                self.ngrok.stop()
-                return
+            def start_server():
+                # Imported here so setup --no-server does not load Flask
+                from convolingo.api.server import WebhookServer
+                
+                if server_mode == ASYNC_MODE:
+                    # Fail here rather than in the server thread
+                    from convolingo.api.asgi import import_uvicorn
+                    try:
+                        import_uvicorn()
+                    except RuntimeError as e:
+                        raise StepFailed(str(e))
+                
+                self.server = WebhookServer()
+                threading.Thread(
+                    target=self.server.run,
+                    kwargs={"debug": False, "mode": server_mode},
+                    daemon=True
+                ).start()
+                return self.server
             
-            # Setup complete
-            logger.info("Setup complete! The webhook server is running.")
-            logger.info("Press Ctrl+C to stop.")
+            def update_url(tool, tunnel):
+                result = self.reconcile_server_url(tool, tunnel, managed)
+                if not result:
+                    raise StepFailed("Failed to update server URL")
+                return result
             
-            # Keep running until interrupted
-            try:
-                while True:
-                    time.sleep(1)
-            except KeyboardInterrupt:
-                logger.info("Stopping webhook server...")
-            finally:
+            pipeline.add("tunnel", start_tunnel)
+            pipeline.add("server", start_server)
+            pipeline.add("url", update_url, requires=("tool", "tunnel"))
+        
+        return pipeline
+    
+    def run_setup(self, run_server: bool = True, tool_id: str = None,
+                  server_mode: str = FLASK_MODE,
+                  refresh: bool = False,
+                  adopt_tunnel: bool = True) -> None:
+        """
+        Run the complete setup process
+        
+        The setup steps run concurrently as a dependency graph (see
+        build_pipeline), and only what differs from the cached setup state
+        is sent to VAPI, so repeated setups reuse the tool created the
+        first time.
+        
+        Args:
+            run_server: Whether to run the webhook server
+            tool_id: Optional tool ID (if not provided, will reuse the tool
+                     created by an earlier setup or create a new one)
+            server_mode: Serving mode for the webhook server (flask or async)
+            refresh: Whether to discard the cached setup state first
+            adopt_tunnel: Whether to reuse a running ngrok tunnel to the
+                          webhook port, which keeps its URL unchanged
+        """
+        if refresh:
+            self.state.clear()
+        
+        pipeline = self.build_pipeline(
+            run_server, tool_id, server_mode, adopt_tunnel
+        )
+        ok = pipeline.run()
+        results = pipeline.results
+        
+        # The tool is created again if the cached one was deleted while
+        # its server URL was updated; the new one still needs assigning
+        final_tool_id = results.get("url", results.get("tool"))
+        if ok and final_tool_id != results["tool"]:
+            ok = self.assign_tool_to_assistant(final_tool_id)
+        
+        if not ok:
+            logger.error("Setup failed. Exiting.")
+            if run_server:
                 self.ngrok.stop()
-        else:
-            # Just create and configure the tool without running the server
-            if not tool_id:
-                tool_id = self.create_vocabulary_tool()
-                if not tool_id:
-                    logger.error("Failed to create vocabulary tool. Exiting.")
-                    return
-            
-            # Assign tool to assistant
-            if not self.assign_tool_to_assistant(tool_id):
-                logger.error("Failed to assign tool to assistant. Exiting.")
-                return
-            
-            logger.info("Tool setup complete!") 
\ No newline at end of file
+                if self.server:
+                    self.server.vocabulary_tool.close()
+            return
+        
+        if not run_server:
+            logger.info("Tool setup complete!")
+            return
+        
+        # Setup complete
+        logger.info(f"Webhook server running at {results['tunnel']}")
+        logger.info("Setup complete! The webhook server is running.")
+        logger.info("Press Ctrl+C to stop.")
+        
+        # Keep running until interrupted
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            logger.info("Stopping webhook server...")
+        finally:
+            self.ngrok.stop()
+            # Flush write-behind vocabulary changes before exiting
+            self.server.vocabulary_tool.close()
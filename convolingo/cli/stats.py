@@ -0,0 +1,56 @@
+import json
+import logging
+from typing import Optional
+
+from convolingo.utils.config import config
+from convolingo.utils.telemetry import (
+    PHASES, SESSION_STATS_FILE_NAME, load_session_stats,
+    summarize_session_stats
+)
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+
+class SessionStats:
+    """Command reporting how long sessions took to get ready"""
+
+    def report(self, last: Optional[int] = None,
+               transport: Optional[str] = None,
+               as_json: bool = False) -> None:
+        """
+        Print the p50 and p95 duration of each phase across sessions
+
+        Args:
+            last: Optional number of most recent sessions to include
+            transport: Optional transport name to include sessions of
+            as_json: Print the summary as JSON instead of a table
+        """
+        path = config.history_dir / SESSION_STATS_FILE_NAME
+        records = load_session_stats(path)
+        if transport:
+            records = [record for record in records
+                       if record.get("transport") == transport]
+        if last:
+            records = records[-last:]
+        summary = summarize_session_stats(records)
+        failed = sum(1 for record in records if not record.get("ok"))
+
+        if as_json:
+            print(json.dumps({"sessions": len(records), "failed": failed,
+                              "phases": summary}, indent=2))
+            return
+
+        if not records:
+            print(f"No sessions recorded yet in {path}")
+            return
+
+        print(f"{len(records)} sessions ({failed} failed to start), "
+              f"{records[0].get('at')} to {records[-1].get('at')}")
+        print(f"\n{'phase':<16} {'sessions':>8} {'p50':>10} {'p95':>10}")
+        for phase in PHASES:
+            entry = summary[phase]
+            if not entry["count"]:
+                continue
+            print(f"{phase:<16} {entry['count']:>8} "
+                  f"{entry['p50_ms']:>8.1f}ms {entry['p95_ms']:>8.1f}ms")
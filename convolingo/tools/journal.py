@@ -0,0 +1,385 @@
+import atexit
+import logging
+import json
+import os
+import threading
+import time
+from typing import Dict, Any, Callable, List, Optional, Tuple
+from pathlib import Path
+
+from convolingo.utils.metrics import metrics, PERSIST_SECONDS
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+Vocabulary = Dict[str, List[Dict[str, Any]]]
+
+
+class VocabularyJournal:
+    """
+    Append-only journal with snapshot compaction for vocabulary data
+
+    Every mutation is appended as one JSON line to the journal file, so a
+    write costs O(1) regardless of how many words are stored. Once the
+    journal holds at least as many records as the snapshot holds entries
+    (and never fewer than the threshold) it is folded into the snapshot
+    file, written to a temporary file and atomically renamed into place,
+    and truncated. Growing the trigger with the snapshot keeps compaction
+    amortized O(1) per write. Loading replays the journal on top of the
+    snapshot.
+
+    With a flush interval the journal works write-behind: appends only
+    buffer the record, and a background flusher thread group-commits the
+    buffer with one write and fsync every interval or as soon as a batch is
+    full, and runs compactions off the caller's thread.
+    """
+
+    def __init__(self, snapshot_file: Path,
+                 journal_file: Optional[Path] = None,
+                 compact_threshold: int = 1000,
+                 flush_interval: float = 0.0,
+                 flush_batch_size: int = 100):
+        """
+        Initialize the journal
+
+        Args:
+            snapshot_file: Path of the JSON snapshot (e.g. vocabulary.json)
+            journal_file: Path of the journal (default: snapshot with a
+                          .journal suffix)
+            compact_threshold: Minimum number of journal records that
+                               triggers a compaction into the snapshot
+            flush_interval: Seconds between background group commits (0
+                            writes every record synchronously)
+            flush_batch_size: Number of buffered records that triggers an
+                              early group commit
+        """
+        self.snapshot_file = Path(snapshot_file)
+        self.journal_file = (
+            Path(journal_file) if journal_file
+            else self.snapshot_file.with_suffix(".journal")
+        )
+        self.compact_threshold = compact_threshold
+        self.pending = 0
+        self.snapshot_entries = 0
+        self.flush_interval = flush_interval
+        self.flush_batch_size = flush_batch_size
+        self._lock = threading.Lock()
+        self._handle = None
+
+        # Write-behind state
+        self._buffer: List[str] = []
+        self._cond = threading.Condition()
+        self._flusher: Optional[threading.Thread] = None
+        self._stopping = False
+        self._compact_source: Optional[Callable[[], Vocabulary]] = None
+        self._state_lock = None
+
+    @property
+    def write_behind(self) -> bool:
+        """Whether appends are buffered and committed in the background"""
+        return self.flush_interval > 0
+
+    def load(self) -> Vocabulary:
+        """
+        Load the snapshot and replay the journal on top of it
+
+        Returns:
+            The vocabulary as a dict of language -> list of word entries
+        """
+        vocabulary = self._load_snapshot()
+        self.snapshot_entries = _count_entries(vocabulary)
+        records = self._read_journal()
+        if records:
+            self._replay(vocabulary, records)
+        self.pending = len(records)
+        return vocabulary
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """
+        Append a mutation record to the journal
+
+        The record is on disk when this returns, unless the journal is in
+        write-behind mode, where it is buffered for the flusher thread.
+
+        Args:
+            record: The mutation record (must be JSON serializable)
+        """
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        if self.write_behind:
+            with self._cond:
+                self._buffer.append(line)
+                self.pending += 1
+                if (len(self._buffer) >= self.flush_batch_size
+                        or self.should_compact()):
+                    self._cond.notify()
+            return
+
+        with self._lock:
+            self._write_lines([line])
+            self.pending += 1
+
+    def flush(self) -> bool:
+        """
+        Write all buffered records to disk in one group commit
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        with self._lock:
+            with self._cond:
+                lines, self._buffer = self._buffer, []
+            if not lines:
+                return True
+            try:
+                self._write_lines(lines)
+                return True
+            except Exception as e:
+                logger.error(f"Error flushing vocabulary journal: {e}")
+                # Put the records back so the next flush retries them
+                with self._cond:
+                    self._buffer[:0] = lines
+                return False
+
+    def start_flusher(self, source: Callable[[], Vocabulary],
+                      state_lock) -> None:
+        """
+        Start the background flusher thread for write-behind mode
+
+        Args:
+            source: Returns a copy of the vocabulary to snapshot; called
+                    while holding state_lock
+            state_lock: Lock the owner holds while mutating the vocabulary
+                        and appending to the journal
+        """
+        if not self.write_behind or self._flusher is not None:
+            return
+        self._compact_source = source
+        self._state_lock = state_lock
+        self._stopping = False
+        self._flusher = threading.Thread(
+            target=self._flush_loop,
+            name="vocabulary-flusher",
+            daemon=True
+        )
+        self._flusher.start()
+        atexit.register(self.stop_flusher)
+
+    def stop_flusher(self) -> None:
+        """Stop the flusher thread and flush everything it had buffered"""
+        flusher = self._flusher
+        if flusher is not None:
+            with self._cond:
+                self._stopping = True
+                self._cond.notify()
+            flusher.join()
+            self._flusher = None
+            atexit.unregister(self.stop_flusher)
+        self.flush()
+
+    def _flush_loop(self) -> None:
+        """Group-commit buffered records until stopped"""
+        while True:
+            with self._cond:
+                if not self._stopping and (
+                        len(self._buffer) < self.flush_batch_size
+                        and not self.should_compact()):
+                    self._cond.wait(self.flush_interval)
+                stopping = self._stopping
+
+            if self.should_compact():
+                self._compact_consistent()
+            else:
+                self.flush()
+
+            if stopping:
+                return
+
+    def _compact_consistent(self) -> bool:
+        """
+        Compact from a consistent copy of the vocabulary
+
+        The copy is taken together with the buffered records it already
+        contains, so those records are dropped instead of written. Records
+        appended afterwards stay buffered for the next group commit.
+        """
+        with self._lock:
+            with self._state_lock:
+                vocabulary = self._compact_source()
+                with self._cond:
+                    lines, self._buffer = self._buffer, []
+            if self._compact_unlocked(vocabulary):
+                with self._cond:
+                    self.pending = len(self._buffer)
+                return True
+            try:
+                self._write_lines(lines)
+            except Exception as e:
+                logger.error(f"Error flushing vocabulary journal: {e}")
+                with self._cond:
+                    self._buffer[:0] = lines
+            return False
+
+    def should_compact(self) -> bool:
+        """Check whether the journal has grown enough to be compacted"""
+        return self.pending >= max(self.compact_threshold,
+                                   self.snapshot_entries)
+
+    def compact(self, vocabulary: Vocabulary) -> bool:
+        """
+        Write a fresh snapshot and truncate the journal
+
+        Args:
+            vocabulary: The full in-memory vocabulary to snapshot
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        with self._lock:
+            if self._compact_unlocked(vocabulary):
+                with self._cond:
+                    self._buffer = []
+                    self.pending = 0
+                return True
+            return False
+
+    def _compact_unlocked(self, vocabulary: Vocabulary) -> bool:
+        """Write the snapshot and truncate the journal without the lock"""
+        started = time.perf_counter()
+        try:
+            self._write_snapshot(vocabulary)
+            # Truncate only after the snapshot is durable. A crash in
+            # between leaves records that replay idempotently.
+            self._close_handle()
+            with open(self.journal_file, 'w', encoding='utf-8') as f:
+                f.flush()
+                os.fsync(f.fileno())
+            self.snapshot_entries = _count_entries(vocabulary)
+            metrics.observe(PERSIST_SECONDS, time.perf_counter() - started,
+                            ("snapshot",))
+            return True
+        except Exception as e:
+            logger.error(f"Error compacting vocabulary journal: {e}")
+            return False
+
+    def close(self) -> None:
+        """Flush buffered records and close the journal file handle"""
+        self.stop_flusher()
+        with self._lock:
+            self._close_handle()
+
+    def _write_lines(self, lines: List[str]) -> None:
+        """Append lines to the journal file and fsync without the lock"""
+        started = time.perf_counter()
+        handle = self._open()
+        handle.write("".join(lines))
+        handle.flush()
+        os.fsync(handle.fileno())
+        metrics.observe(PERSIST_SECONDS, time.perf_counter() - started,
+                        ("journal",))
+
+    def _open(self):
+        """Open the journal for appending if it is not already open"""
+        if self._handle is None:
+            self._handle = open(self.journal_file, 'a', encoding='utf-8')
+        return self._handle
+
+    def _close_handle(self) -> None:
+        """Close the journal handle without taking the lock"""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def _load_snapshot(self) -> Vocabulary:
+        """Load the snapshot file or return an empty vocabulary"""
+        if not self.snapshot_file.exists():
+            return {}
+
+        try:
+            with open(self.snapshot_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading vocabulary snapshot: {e}")
+            return {}
+
+    def _write_snapshot(self, vocabulary: Vocabulary) -> None:
+        """Atomically replace the snapshot file"""
+        tmp_file = self.snapshot_file.with_name(
+            self.snapshot_file.name + ".tmp"
+        )
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(vocabulary, f, indent=2, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+
+    def _read_journal(self) -> List[Dict[str, Any]]:
+        """
+        Read all complete records from the journal
+
+        A torn trailing line left by a crash mid-append is discarded and cut
+        off the file so later appends start on a clean line.
+        """
+        if not self.journal_file.exists():
+            return []
+
+        records = []
+        valid_bytes = 0
+        try:
+            with open(self.journal_file, 'rb') as f:
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break
+                    try:
+                        records.append(json.loads(raw.decode('utf-8')))
+                    except ValueError:
+                        break
+                    valid_bytes += len(raw)
+
+            if valid_bytes != self.journal_file.stat().st_size:
+                logger.warning(
+                    f"Discarding torn records at end of {self.journal_file}"
+                )
+                with open(self.journal_file, 'r+b') as f:
+                    f.truncate(valid_bytes)
+        except Exception as e:
+            logger.error(f"Error reading vocabulary journal: {e}")
+        return records
+
+    def _replay(self, vocabulary: Vocabulary,
+                records: List[Dict[str, Any]]) -> None:
+        """Apply journal records to the vocabulary, skipping ones it has"""
+        # Position of each (word, added_at) in its language's list
+        positions: Dict[str, Dict[Tuple[str, str], int]] = {}
+        for record in records:
+            op = record.get("op")
+            if op not in ("add", "update"):
+                logger.warning(f"Skipping unknown journal op: {op}")
+                continue
+
+            language = record["language"]
+            entry = record["entry"]
+            if language not in positions:
+                positions[language] = {}
+                for i, e in enumerate(vocabulary.get(language, [])):
+                    positions[language].setdefault(
+                        (e.get("word"), e.get("added_at")), i
+                    )
+            key = (entry.get("word"), entry.get("added_at"))
+            position = positions[language].get(key)
+            if op == "update":
+                # Updates carry the whole entry, so replaying one twice is
+                # harmless
+                if position is None:
+                    logger.warning(f"Skipping update of unknown word: {key[0]}")
+                else:
+                    vocabulary[language][position] = entry
+                continue
+            if position is not None:
+                continue
+            entries = vocabulary.setdefault(language, [])
+            positions[language][key] = len(entries)
+            entries.append(entry)
+
+def _count_entries(vocabulary: Vocabulary) -> int:
+    """Count the word entries across all languages"""
+    return sum(len(words) for words in vocabulary.values())
@@ -0,0 +1,176 @@
+import heapq
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+# SM-2 ease factor of a new word and the lowest it can drop to
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+
+# Review grades: 0 (forgot completely) to 5 (perfect recall); grades
+# below PASSING_GRADE start the word over
+MIN_GRADE = 0
+MAX_GRADE = 5
+PASSING_GRADE = 3
+
+
+def due_at(entry: Dict[str, Any]) -> str:
+    """
+    Get when a word entry is due for review
+
+    Args:
+        entry: The word entry
+
+    Returns:
+        ISO timestamp of the next review; words never reviewed are due
+        from when they were added
+    """
+    return entry.get("due") or entry.get("added_at") or ""
+
+
+def schedule_review(entry: Dict[str, Any], grade: int,
+                    now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Schedule the next review of a word with the SM-2 algorithm
+
+    A passing grade moves the word to the next interval (1 day, 6 days,
+    then the previous interval times the ease factor); a failing grade
+    starts it over at 1 day. The ease factor moves with the grade.
+
+    Args:
+        entry: The word entry (not modified)
+        grade: How well the word was recalled, 0 to 5
+        now: Time of the review (default: now)
+
+    Returns:
+        A new entry with the updated review fields
+
+    Raises:
+        ValueError: If the grade is out of range
+    """
+    if not MIN_GRADE <= grade <= MAX_GRADE:
+        raise ValueError(
+            f"Review grade must be between {MIN_GRADE} and {MAX_GRADE}"
+        )
+    now = now or datetime.now()
+    ease = entry.get("ease", INITIAL_EASE)
+    repetitions = entry.get("repetitions", 0)
+    interval = entry.get("interval", 0)
+
+    if grade >= PASSING_GRADE:
+        if repetitions == 0:
+            interval = 1
+        elif repetitions == 1:
+            interval = 6
+        else:
+            interval = round(interval * ease)
+        repetitions += 1
+    else:
+        repetitions = 0
+        interval = 1
+
+    miss = MAX_GRADE - grade
+    ease = max(MIN_EASE, ease + 0.1 - miss * (0.08 + miss * 0.02))
+
+    # Copy on write: readers and snapshots may still hold the old entry
+    reviewed = dict(entry)
+    reviewed.update({
+        "review_count": entry.get("review_count", 0) + 1,
+        "last_reviewed": now.isoformat(),
+        "repetitions": repetitions,
+        "interval": interval,
+        "ease": round(ease, 4),
+        "due": (now + timedelta(days=interval)).isoformat(),
+    })
+    return reviewed
+
+
+class DueQueue:
+    """
+    Min-heap of one language's word entries keyed by due time
+
+    Entries are identified by their position in the language's word list,
+    like TrigramIndex. Rescheduling pushes the new due time and leaves the
+    old heap item behind; stale items are skipped when they surface and
+    dropped by a rebuild once they outnumber the live ones. Fetching the
+    next k due words costs O(k log n) instead of sorting the list.
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]]):
+        """
+        Build the queue over an existing list of entries
+
+        Args:
+            entries: The word entries of one language (kept by reference)
+        """
+        self.entries = entries
+        self.due: List[str] = []
+        self.by_word: Dict[str, int] = {}
+        for entry in entries:
+            self.by_word.setdefault(entry["word"], len(self.due))
+            self.due.append(due_at(entry))
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        """Rebuild the heap from the current due times"""
+        self.heap: List[Tuple[str, int]] = [
+            (due, position) for position, due in enumerate(self.due)
+        ]
+        heapq.heapify(self.heap)
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """
+        Queue an entry that was appended to the entries list
+
+        Args:
+            entry: The word entry (must be the last entry in the list)
+        """
+        position = len(self.due)
+        due = due_at(entry)
+        self.due.append(due)
+        self.by_word.setdefault(entry["word"], position)
+        heapq.heappush(self.heap, (due, position))
+
+    def update(self, position: int, entry: Dict[str, Any]) -> None:
+        """
+        Requeue an entry that was replaced in the entries list
+
+        Args:
+            position: Position of the entry
+            entry: The new word entry
+        """
+        due = due_at(entry)
+        if due == self.due[position]:
+            return
+        self.due[position] = due
+        heapq.heappush(self.heap, (due, position))
+        if len(self.heap) > 2 * len(self.due):
+            self._rebuild()
+
+    def due_positions(self, now: str, limit: int) -> List[int]:
+        """
+        Get the positions of the entries due soonest, at most ``now``
+
+        Args:
+            now: ISO timestamp to compare due times against
+            limit: Maximum number of positions
+
+        Returns:
+            Positions of due entries, earliest due first
+        """
+        heap = self.heap
+        taken: List[Tuple[str, int]] = []
+        while heap and len(taken) < limit:
+            item = heap[0]
+            due, position = item
+            if due != self.due[position] or (taken and item == taken[-1]):
+                # Stale item left behind by a reschedule, or a duplicate of
+                # one rescheduled back to an earlier due time
+                heapq.heappop(heap)
+                continue
+            if due > now:
+                break
+            taken.append(heapq.heappop(heap))
+        # The entries stay due until they are reviewed
+        for item in taken:
+            heapq.heappush(heap, item)
+        return [position for _, position in taken]
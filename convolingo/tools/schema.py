@@ -0,0 +1,62 @@
+import hashlib
+import json
+
+# Definition of the vocabulary tool as registered with VAPI
+TOOL_NAME = 'vocabularyTool'
+TOOL_DESCRIPTION = 'Tool to add, review and search vocabulary words'
+TOOL_PARAMETERS = {
+    "type": "object",
+    "required": ["action"],
+    "properties": {
+        "word": {
+            "type": "string",
+            "description": "The vocabulary word to add, search for or review"
+        },
+        "action": {
+            "type": "string",
+            "description": "The action to perform (add, list, search, review). "
+                           "Review without a word lists the words due for "
+                           "review; with a word and a quality it records how "
+                           "well the learner recalled it"
+        },
+        "language": {
+            "type": "string",
+            "description": "The language the word is in"
+        },
+        "translation": {
+            "type": "string",
+            "description": "The translation of the word"
+        },
+        "notes": {
+            "type": "string",
+            "description": "Additional notes about the word"
+        },
+        "quality": {
+            "type": "integer",
+            "description": "How well the learner recalled the word when "
+                           "reviewing it, from 0 (forgot) to 5 (perfect)"
+        }
+    }
+}
+
+# Actions the vocabulary tool can dispatch
+TOOL_ACTIONS = ("add", "list", "search", "review")
+
+
+def tool_spec_hash() -> str:
+    """
+    Get a hash of the vocabulary tool definition
+
+    Returns:
+        Hex digest that changes whenever the name, description or
+        parameters of the tool change
+    """
+    spec = json.dumps(
+        {
+            "name": TOOL_NAME,
+            "description": TOOL_DESCRIPTION,
+            "parameters": TOOL_PARAMETERS
+        },
+        sort_keys=True
+    )
+    return hashlib.sha256(spec.encode("utf-8")).hexdigest()
@@ -0,0 +1,209 @@
+import logging
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from pathlib import Path
+
+from convolingo.tools.storage import VocabularyStore, create_store
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# User IDs that can be used as directory names unchanged
+SAFE_USER_ID = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+def shard_name(user_id: str) -> str:
+    """
+    Get the directory name of a user's vocabulary shard
+
+    Args:
+        user_id: The user ID
+
+    Returns:
+        The user ID itself if it is filesystem safe, otherwise a hash of it
+    """
+    if SAFE_USER_ID.match(user_id):
+        return user_id
+    return "u-" + hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+
+
+class VocabularyShards:
+    """
+    Per-user vocabulary stores held in a bounded LRU cache
+
+    Each user gets their own store under ``<directory>/<user_id>/``. Shards
+    are loaded lazily on first access, and when more than ``capacity`` are
+    loaded the least recently used idle shard is closed, which writes back
+    any pending state. Loading and closing run outside the cache lock, so
+    one user's slow load or write-back does not hold up other users; a
+    per-user placeholder makes requests for that same user wait until it
+    is done, so a shard is never read before its write-back finished.
+    Requests without a user ID go to the shared default store, which is
+    never evicted.
+    """
+
+    def __init__(self, backend: str, directory: Path,
+                 default_store: VocabularyStore, capacity: int = 64):
+        """
+        Initialize the shard cache
+
+        Args:
+            backend: Storage backend name used for user shards
+            directory: Directory holding one sub-directory per user
+            default_store: Store used when no user ID is given
+            capacity: Maximum number of idle user shards kept loaded
+        """
+        self.backend = backend
+        self.directory = Path(directory)
+        self.default_store = default_store
+        self.capacity = capacity
+        self._shards: "OrderedDict[str, VocabularyStore]" = OrderedDict()
+        self._in_use: Dict[str, int] = {}
+        # Users whose shard is being loaded or closed, set when done
+        self._pending: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def use(self, user_id: Optional[str] = None) -> Iterator[VocabularyStore]:
+        """
+        Borrow the store of a user
+
+        A borrowed shard is never evicted until it is released.
+
+        Args:
+            user_id: The user ID (None for the shared default store)
+
+        Yields:
+            The user's vocabulary store
+        """
+        if not user_id:
+            yield self.default_store
+            return
+
+        store = self._acquire(user_id)
+        try:
+            yield store
+        finally:
+            self._release(user_id)
+
+    def _acquire(self, user_id: str) -> VocabularyStore:
+        """Load or look up a shard and mark it as in use"""
+        while True:
+            with self._lock:
+                store = self._shards.get(user_id)
+                if store is not None:
+                    self._shards.move_to_end(user_id)
+                    self._in_use[user_id] = self._in_use.get(user_id, 0) + 1
+                    return store
+                pending = self._pending.get(user_id)
+                if pending is None:
+                    loading = threading.Event()
+                    self._pending[user_id] = loading
+            if pending is None:
+                break
+            # Another thread is loading or writing back this user's shard
+            pending.wait()
+
+        try:
+            shard_dir = self.directory / shard_name(user_id)
+            shard_dir.mkdir(parents=True, exist_ok=True)
+            store = create_store(self.backend, shard_dir)
+        except BaseException:
+            with self._lock:
+                del self._pending[user_id]
+            loading.set()
+            raise
+
+        with self._lock:
+            self._shards[user_id] = store
+            self._in_use[user_id] = self._in_use.get(user_id, 0) + 1
+            del self._pending[user_id]
+        loading.set()
+        logger.debug("Loaded vocabulary shard for user %s", user_id)
+        return store
+
+    def _release(self, user_id: str) -> None:
+        """Mark a shard as idle and evict shards over capacity"""
+        evicted = []
+        with self._lock:
+            self._in_use[user_id] -= 1
+            if not self._in_use[user_id]:
+                del self._in_use[user_id]
+
+            excess = len(self._shards) - self.capacity
+            for key in list(self._shards):
+                if excess <= 0:
+                    break
+                if key in self._in_use:
+                    continue
+                evicted.append((key, self._shards.pop(key)))
+                excess -= 1
+            closing = self._mark_closing(evicted)
+        self._close_shards(evicted, closing)
+
+    def _mark_closing(
+            self, shards: List[Tuple[str, VocabularyStore]]
+    ) -> List[threading.Event]:
+        """
+        Put placeholders for shards about to be closed
+
+        Must be called with the lock held, in the same critical section
+        that removed the shards from the cache.
+
+        Args:
+            shards: The removed (user ID, store) pairs
+
+        Returns:
+            The placeholders, set by _close_shards
+        """
+        closing = []
+        for key, _ in shards:
+            event = threading.Event()
+            self._pending[key] = event
+            closing.append(event)
+        return closing
+
+    def _close_shards(self, shards: List[Tuple[str, VocabularyStore]],
+                      closing: List[threading.Event]) -> None:
+        """Write back and close removed shards, then drop their placeholders"""
+        for (key, store), event in zip(shards, closing):
+            self._close_store(key, store)
+            with self._lock:
+                del self._pending[key]
+            event.set()
+
+    @staticmethod
+    def _close_store(user_id: str, store: VocabularyStore) -> None:
+        """Write back and close a shard"""
+        try:
+            store.close()
+            logger.debug("Evicted vocabulary shard for user %s", user_id)
+        except Exception as e:
+            logger.error(f"Error writing back vocabulary shard {user_id}: {e}")
+
+    def flush(self) -> bool:
+        """
+        Persist buffered writes of every loaded shard and the default store
+
+        Returns:
+            bool: True if all stores flushed successfully, False otherwise
+        """
+        with self._lock:
+            stores = list(self._shards.values())
+        ok = self.default_store.flush()
+        for store in stores:
+            ok = store.flush() and ok
+        return ok
+
+    def close(self) -> None:
+        """Write back and close every loaded shard and the default store"""
+        with self._lock:
+            shards = list(self._shards.items())
+            self._shards.clear()
+            closing = self._mark_closing(shards)
+        self._close_shards(shards, closing)
+        self.default_store.close()
@@ -0,0 +1,673 @@
+import logging
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Callable, Iterable, List, Optional, Set
+from pathlib import Path
+
+from convolingo.utils.config import (
+    VOCABULARY_COMPACT_THRESHOLD, VOCABULARY_FLUSH_INTERVAL,
+    VOCABULARY_FLUSH_BATCH_SIZE
+)
+from convolingo.tools.journal import VocabularyJournal
+from convolingo.tools.review import DueQueue, due_at
+from convolingo.tools.trigram import TrigramIndex, scan
+from convolingo.utils.metrics import metrics, PERSIST_SECONDS
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Available storage backends
+JSON_BACKEND = "json"
+SQLITE_BACKEND = "sqlite"
+STORAGE_BACKENDS = (JSON_BACKEND, SQLITE_BACKEND)
+
+# File names used by the backends inside the storage directory
+JSON_FILE_NAME = "vocabulary.json"
+SQLITE_FILE_NAME = "vocabulary.db"
+
+
+class VocabularyStore:
+    """Base class for vocabulary storage backends"""
+
+    def has_language(self, language: str) -> bool:
+        """
+        Check whether any words are stored for a language
+
+        Args:
+            language: The language to check
+
+        Returns:
+            bool: True if the language has words, False otherwise
+        """
+        raise NotImplementedError
+
+    def add_entry(self, language: str, entry: Dict[str, Any]) -> bool:
+        """
+        Store a new word entry
+
+        Args:
+            language: The language of the word
+            entry: The word entry
+
+        Returns:
+            bool: True if the entry was persisted, False otherwise
+        """
+        raise NotImplementedError
+
+    def list_entries(self, language: str) -> List[Dict[str, Any]]:
+        """
+        List all word entries of a language in the order they were added
+
+        Args:
+            language: The language to list
+
+        Returns:
+            List of word entries
+        """
+        raise NotImplementedError
+
+    def search_entries(self, language: str,
+                       query: str) -> List[Dict[str, Any]]:
+        """
+        Find entries whose word or translation contains the query
+
+        Args:
+            language: The language to search in
+            query: The search query (case-insensitive)
+
+        Returns:
+            Matching word entries in the order they were added
+        """
+        raise NotImplementedError
+
+    def update_entry(
+            self, language: str, word: str,
+            update: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Replace the first entry of a word with an updated copy
+
+        Args:
+            language: The language of the word
+            word: The word to update
+            update: Returns the updated copy of the current entry; called
+                    while the store holds its write lock
+
+        Returns:
+            The updated entry, or None if the word is not stored
+        """
+        raise NotImplementedError
+
+    def due_entries(self, language: str, now: str,
+                    limit: int) -> List[Dict[str, Any]]:
+        """
+        Get the entries due for review soonest
+
+        Args:
+            language: The language to review
+            now: ISO timestamp; entries due later are left out
+            limit: Maximum number of entries
+
+        Returns:
+            Due word entries, earliest due first
+        """
+        raise NotImplementedError
+
+    def flush(self) -> bool:
+        """
+        Persist buffered writes now
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return True
+
+    def close(self) -> None:
+        """Persist any pending state and release resources"""
+
+
+class JsonVocabularyStore(VocabularyStore):
+    """
+    Vocabulary held in memory and persisted as a JSON snapshot plus journal
+
+    This is the default backend. Searches are answered from a per-language
+    trigram index and reviews from a per-language due queue. The indexes
+    are built on a background thread right after loading, without holding
+    the store lock; searches scan the language until its index is ready.
+    By default writes are write-behind: mutations apply in memory at once
+    and a background thread group-commits them to the journal, so callers
+    never wait on disk I/O.
+    """
+
+    def __init__(self, vocabulary_file: Path,
+                 flush_interval: float = VOCABULARY_FLUSH_INTERVAL,
+                 build_index: bool = True):
+        """
+        Initialize the store
+
+        Args:
+            vocabulary_file: Path of the JSON snapshot
+            flush_interval: Seconds between background group commits (0 to
+                            write every mutation synchronously)
+            build_index: Start building the search indexes in the
+                         background after loading (otherwise a language's
+                         index is started by its first search, or built
+                         with build_search_index)
+        """
+        self.vocabulary_file = Path(vocabulary_file)
+        self.journal = VocabularyJournal(
+            self.vocabulary_file,
+            compact_threshold=VOCABULARY_COMPACT_THRESHOLD,
+            flush_interval=flush_interval,
+            flush_batch_size=VOCABULARY_FLUSH_BATCH_SIZE
+        )
+        self._lock = threading.Lock()
+        self.vocabulary = self._load_vocabulary()
+        self._search_index: Dict[str, TrigramIndex] = {}
+        self._index_building: Set[str] = set()
+        self._due_queue: Dict[str, DueQueue] = {}
+        self.journal.start_flusher(self._copy_vocabulary, self._lock)
+        if build_index:
+            self._start_index_build(list(self.vocabulary))
+
+    def _load_vocabulary(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Load the vocabulary snapshot and replay the journal on top of it"""
+        vocabulary = self.journal.load()
+
+        # Fold a replayed journal into the snapshot so startup stays cheap
+        if self.journal.pending:
+            self.journal.compact(vocabulary)
+        return vocabulary
+
+    def _save_vocabulary(self) -> bool:
+        """Write a full snapshot of the vocabulary and truncate the journal"""
+        return self.journal.compact(self.vocabulary)
+
+    def _copy_vocabulary(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Copy the word lists so they can be snapshotted off the lock"""
+        return {
+            language: list(entries)
+            for language, entries in self.vocabulary.items()
+        }
+
+    def _record(self, record: Dict[str, Any]) -> bool:
+        """
+        Append a mutation record to the journal
+
+        Args:
+            record: The mutation record
+
+        Returns:
+            bool: True if the record was persisted, False otherwise
+        """
+        try:
+            self.journal.append(record)
+        except Exception as e:
+            logger.error(f"Error saving vocabulary: {e}")
+            return False
+
+        # The flusher thread compacts in write-behind mode
+        if not self.journal.write_behind and self.journal.should_compact():
+            self._save_vocabulary()
+        return True
+
+    def build_search_index(self, language: str) -> TrigramIndex:
+        """
+        Build the trigram index of a language and start using it
+
+        The entries present when the build starts are indexed without
+        holding the lock, so adds and searches go on meanwhile; entries
+        added during the build are indexed under the lock at the end.
+
+        Args:
+            language: The language to index
+
+        Returns:
+            The language's trigram index
+        """
+        entries = self.vocabulary[language]
+        index = TrigramIndex(entries, count=len(entries))
+        with self._lock:
+            for position in range(len(index), len(entries)):
+                index.add(entries[position])
+            self._search_index[language] = index
+            self._index_building.discard(language)
+        return index
+
+    def _start_index_build(self, languages: Iterable[str]) -> None:
+        """
+        Build the trigram indexes of languages on a background thread
+
+        Args:
+            languages: The languages to index; ones already indexed or
+                       being indexed are skipped
+        """
+        with self._lock:
+            languages = [
+                language for language in languages
+                if language not in self._search_index
+                and language not in self._index_building
+            ]
+            self._index_building.update(languages)
+        if not languages:
+            return
+
+        def build() -> None:
+            for language in languages:
+                try:
+                    self.build_search_index(language)
+                except Exception as e:
+                    logger.error(f"Error indexing {language} vocabulary: {e}")
+                    with self._lock:
+                        self._index_building.discard(language)
+
+        threading.Thread(
+            target=build, name="vocabulary-index", daemon=True
+        ).start()
+
+    def _get_due_queue(self, language: str) -> DueQueue:
+        """
+        Get the due queue for a language, building it on first use
+
+        Must be called with the lock held.
+
+        Args:
+            language: The language to queue
+
+        Returns:
+            The language's due queue
+        """
+        queue = self._due_queue.get(language)
+        if queue is None:
+            queue = DueQueue(self.vocabulary[language])
+            self._due_queue[language] = queue
+        return queue
+
+    def has_language(self, language: str) -> bool:
+        """Check whether any words are stored for a language"""
+        return language in self.vocabulary
+
+    def add_entry(self, language: str, entry: Dict[str, Any]) -> bool:
+        """Append the entry in memory, index it and journal the mutation"""
+        with self._lock:
+            self.vocabulary.setdefault(language, []).append(entry)
+            if language in self._search_index:
+                self._search_index[language].add(entry)
+            if language in self._due_queue:
+                self._due_queue[language].add(entry)
+
+            return self._record({
+                "op": "add",
+                "language": language,
+                "entry": entry
+            })
+
+    def list_entries(self, language: str) -> List[Dict[str, Any]]:
+        """List all word entries of a language"""
+        return self.vocabulary.get(language, [])
+
+    def search_entries(self, language: str,
+                       query: str) -> List[Dict[str, Any]]:
+        """Search a language through its trigram index, scanning until built"""
+        if language not in self.vocabulary:
+            return []
+        index = self._search_index.get(language)
+        if index is None:
+            self._start_index_build((language,))
+            return scan(self.vocabulary[language], query)
+        return index.search(query)
+
+    def update_entry(
+            self, language: str, word: str,
+            update: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Replace the entry in memory, requeue it and journal the mutation"""
+        with self._lock:
+            if language not in self.vocabulary:
+                return None
+            queue = self._get_due_queue(language)
+            position = queue.by_word.get(word)
+            if position is None:
+                return None
+
+            # Replaced rather than mutated: snapshots and readers may still
+            # hold the old entry
+            entries = self.vocabulary[language]
+            entry = update(entries[position])
+            entries[position] = entry
+            queue.update(position, entry)
+            self._record({
+                "op": "update",
+                "language": language,
+                "entry": entry
+            })
+            return entry
+
+    def due_entries(self, language: str, now: str,
+                    limit: int) -> List[Dict[str, Any]]:
+        """Get the entries due soonest from the language's due queue"""
+        with self._lock:
+            if language not in self.vocabulary:
+                return []
+            entries = self.vocabulary[language]
+            positions = self._get_due_queue(language).due_positions(now, limit)
+            return [entries[position] for position in positions]
+
+    def flush(self) -> bool:
+        """Group-commit buffered mutations to the journal now"""
+        return self.journal.flush()
+
+    def close(self) -> None:
+        """Flush, compact the journal and release the file handle"""
+        # Stop the flusher before taking the lock it may be waiting on
+        self.journal.stop_flusher()
+        with self._lock:
+            if self.journal.pending:
+                self._save_vocabulary()
+            self.journal.close()
+
+
+class SqliteVocabularyStore(VocabularyStore):
+    """
+    Vocabulary stored in a shared SQLite database
+
+    The database runs in WAL mode so readers never block the writer, which
+    lets several server threads and processes share one store. Entries live
+    in a ``words`` table indexed on ``(language, word)`` and
+    ``(language, due)``, and are mirrored into an FTS5 trigram table used
+    by searches. Each thread gets its own connection; closing the store
+    closes the connections of all threads.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS words (
+            id INTEGER PRIMARY KEY,
+            language TEXT NOT NULL,
+            word TEXT NOT NULL,
+            translation TEXT NOT NULL,
+            entry TEXT NOT NULL,
+            due TEXT NOT NULL DEFAULT ''
+        );
+        CREATE INDEX IF NOT EXISTS idx_words_language_word
+            ON words (language, word);
+        CREATE VIRTUAL TABLE IF NOT EXISTS words_fts USING fts5(
+            word, translation,
+            content='words', content_rowid='id', tokenize='trigram'
+        );
+        CREATE TRIGGER IF NOT EXISTS words_ai AFTER INSERT ON words BEGIN
+            INSERT INTO words_fts (rowid, word, translation)
+            VALUES (new.id, new.word, new.translation);
+        END;
+        CREATE TRIGGER IF NOT EXISTS words_ad AFTER DELETE ON words BEGIN
+            INSERT INTO words_fts (words_fts, rowid, word, translation)
+            VALUES ('delete', old.id, old.word, old.translation);
+        END;
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    # Only word and translation changes touch the search table, so
+    # rescheduling reviews does not reindex the word
+    UPDATE_TRIGGER = """
+        CREATE TRIGGER IF NOT EXISTS words_au
+        AFTER UPDATE OF word, translation ON words BEGIN
+            INSERT INTO words_fts (words_fts, rowid, word, translation)
+            VALUES ('delete', old.id, old.word, old.translation);
+            INSERT INTO words_fts (rowid, word, translation)
+            VALUES (new.id, new.word, new.translation);
+        END
+    """
+
+    def __init__(self, database_file: Path,
+                 migrate_from: Optional[Path] = None):
+        """
+        Initialize the store
+
+        Args:
+            database_file: Path of the SQLite database
+            migrate_from: Optional JSON snapshot to import once into an
+                          empty database
+        """
+        self.database_file = Path(database_file)
+        self._local = threading.local()
+        # Every thread's connection, so close() can close them all; a
+        # thread holding a connection of an older generation reconnects
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._generation = 0
+
+        conn = self._connect()
+        conn.executescript(self.SCHEMA)
+        self._add_due_column()
+        if migrate_from is not None:
+            self._migrate_json(Path(migrate_from))
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get the calling thread's connection, opening it if needed"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.generation != self._generation:
+            # Only used by this thread, but closed by whichever thread
+            # closes the store
+            conn = sqlite3.connect(self.database_file, timeout=30.0,
+                                   check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._connections_lock:
+                self._connections.append(conn)
+                self._local.generation = self._generation
+            self._local.conn = conn
+        return conn
+
+    def _add_due_column(self) -> None:
+        """
+        Add and fill the due column of databases created without it
+
+        Also creates the update trigger, which older databases have in a
+        form firing on every update.
+        """
+        conn = self._connect()
+        with conn:
+            # Take the write lock first so concurrent processes add it once
+            conn.execute("BEGIN IMMEDIATE")
+            columns = [row[1] for row in
+                       conn.execute("PRAGMA table_info(words)")]
+            if "due" not in columns:
+                # Older databases reindex every updated row
+                conn.execute("DROP TRIGGER IF EXISTS words_au")
+                conn.execute(
+                    "ALTER TABLE words ADD COLUMN due TEXT NOT NULL DEFAULT ''"
+                )
+                conn.execute(
+                    "UPDATE words SET due = COALESCE("
+                    "json_extract(entry, '$.due'), "
+                    "json_extract(entry, '$.added_at'), '')"
+                )
+            conn.execute(self.UPDATE_TRIGGER)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_words_language_due "
+                "ON words (language, due)"
+            )
+
+    def _migrate_json(self, vocabulary_file: Path) -> None:
+        """
+        Import a JSON vocabulary (snapshot plus journal) exactly once
+
+        Args:
+            vocabulary_file: Path of the JSON snapshot
+        """
+        conn = self._connect()
+        with conn:
+            # Take the write lock first so concurrent processes migrate once
+            conn.execute("BEGIN IMMEDIATE")
+            migrated = conn.execute(
+                "SELECT value FROM meta WHERE key = 'migrated_from'"
+            ).fetchone()
+            if migrated:
+                return
+
+            count = 0
+            journal = VocabularyJournal(vocabulary_file)
+            vocabulary = journal.load()
+            journal.close()
+            for language, entries in vocabulary.items():
+                for entry in entries:
+                    self._insert(conn, language, entry)
+                    count += 1
+
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('migrated_from', ?)",
+                (str(vocabulary_file),)
+            )
+        if count:
+            logger.info(
+                f"Migrated {count} words from {vocabulary_file} "
+                f"to {self.database_file}"
+            )
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, language: str,
+                entry: Dict[str, Any]) -> None:
+        """Insert an entry without committing"""
+        conn.execute(
+            "INSERT INTO words (language, word, translation, entry, due) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (language, entry["word"], entry["translation"],
+             json.dumps(entry, ensure_ascii=False), due_at(entry))
+        )
+
+    def has_language(self, language: str) -> bool:
+        """Check whether any words are stored for a language"""
+        row = self._connect().execute(
+            "SELECT 1 FROM words WHERE language = ? LIMIT 1", (language,)
+        ).fetchone()
+        return row is not None
+
+    def add_entry(self, language: str, entry: Dict[str, Any]) -> bool:
+        """Insert the entry in its own transaction"""
+        started = time.perf_counter()
+        try:
+            conn = self._connect()
+            with conn:
+                self._insert(conn, language, entry)
+            metrics.observe(PERSIST_SECONDS, time.perf_counter() - started,
+                            ("sqlite",))
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"Error saving vocabulary: {e}")
+            return False
+
+    def list_entries(self, language: str) -> List[Dict[str, Any]]:
+        """List all word entries of a language"""
+        rows = self._connect().execute(
+            "SELECT entry FROM words WHERE language = ? ORDER BY id",
+            (language,)
+        )
+        return [json.loads(entry) for (entry,) in rows]
+
+    def search_entries(self, language: str,
+                       query: str) -> List[Dict[str, Any]]:
+        """
+        Search a language through the FTS5 trigram table
+
+        Candidates are re-checked with Python's case folding so results are
+        identical to the JSON backend. Queries shorter than a trigram fall
+        back to scanning the language.
+        """
+        needle = query.lower()
+        conn = self._connect()
+        if len(query) >= 3:
+            phrase = '"' + query.replace('"', '""') + '"'
+            rows = conn.execute(
+                "SELECT w.word, w.translation, w.entry FROM words_fts "
+                "JOIN words w ON w.id = words_fts.rowid "
+                "WHERE words_fts MATCH ? AND w.language = ? ORDER BY w.id",
+                (phrase, language)
+            )
+        else:
+            rows = conn.execute(
+                "SELECT word, translation, entry FROM words "
+                "WHERE language = ? ORDER BY id",
+                (language,)
+            )
+        return [
+            json.loads(entry) for word, translation, entry in rows
+            if needle in word.lower() or needle in translation.lower()
+        ]
+
+    def update_entry(
+            self, language: str, word: str,
+            update: Callable[[Dict[str, Any]], Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        """Read, update and write back the entry in one transaction"""
+        try:
+            conn = self._connect()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT id, entry FROM words "
+                    "WHERE language = ? AND word = ? ORDER BY id LIMIT 1",
+                    (language, word)
+                ).fetchone()
+                if row is None:
+                    return None
+                entry = update(json.loads(row[1]))
+                conn.execute(
+                    "UPDATE words SET entry = ?, due = ? WHERE id = ?",
+                    (json.dumps(entry, ensure_ascii=False), due_at(entry),
+                     row[0])
+                )
+            return entry
+        except sqlite3.Error as e:
+            logger.error(f"Error saving vocabulary: {e}")
+            return None
+
+    def due_entries(self, language: str, now: str,
+                    limit: int) -> List[Dict[str, Any]]:
+        """Get the entries due soonest through the (language, due) index"""
+        rows = self._connect().execute(
+            "SELECT entry FROM words WHERE language = ? AND due <= ? "
+            "ORDER BY due, id LIMIT ?",
+            (language, now, limit)
+        )
+        return [json.loads(entry) for (entry,) in rows]
+
+    def close(self) -> None:
+        """Close the connections of all threads"""
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logger.warning(f"Error closing vocabulary database: {e}")
+        self._local.conn = None
+
+
+def create_store(backend: str, directory: Path) -> VocabularyStore:
+    """
+    Create a vocabulary store
+
+    Args:
+        backend: Storage backend name (json or sqlite)
+        directory: Directory holding the vocabulary files
+
+    Returns:
+        The vocabulary store
+    """
+    directory = Path(directory)
+    if backend == JSON_BACKEND:
+        return JsonVocabularyStore(directory / JSON_FILE_NAME)
+    if backend == SQLITE_BACKEND:
+        return SqliteVocabularyStore(
+            directory / SQLITE_FILE_NAME,
+            migrate_from=directory / JSON_FILE_NAME
+        )
+    raise ValueError(
+        f"Unknown vocabulary backend '{backend}' "
+        f"(expected one of: {', '.join(STORAGE_BACKENDS)})"
+    )
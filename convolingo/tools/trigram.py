@@ -0,0 +1,144 @@
+from array import array
+from typing import Dict, Any, List, Optional, Set
+
+# Joins an entry's lowered word and translation into one string; queries
+# containing it cannot match
+SEPARATOR = "\x00"
+
+
+def trigrams(text: str) -> Set[str]:
+    """
+    Split text into its set of overlapping three-character substrings
+
+    Args:
+        text: The (already lowercased) text
+
+    Returns:
+        Set of trigrams (empty if text is shorter than three characters)
+    """
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def entry_text(entry: Dict[str, Any]) -> str:
+    """
+    Get the lowered text of an entry that queries are matched against
+
+    Args:
+        entry: The word entry
+
+    Returns:
+        The lowered word and translation joined by SEPARATOR
+    """
+    return f"{entry['word']}{SEPARATOR}{entry['translation']}".lower()
+
+
+def scan(entries: List[Dict[str, Any]],
+         query: str) -> List[Dict[str, Any]]:
+    """
+    Find entries whose word or translation contains the query by scanning
+
+    Gives the same matches as TrigramIndex.search; used while a language's
+    index is still being built.
+
+    Args:
+        entries: The word entries of one language
+        query: The search query (case-insensitive)
+
+    Returns:
+        Matching entries in the order they were added
+    """
+    query = query.lower()
+    return [
+        entry for entry in entries
+        if query in entry["word"].lower()
+        or query in entry["translation"].lower()
+    ]
+
+
+class TrigramIndex:
+    """
+    Inverted trigram index over the word and translation of vocabulary entries
+
+    Entries are identified by their position in the language's word list, so
+    the index is append-only like the list it mirrors. Each trigram's
+    postings are a sorted ``array('I')`` of positions (4 bytes each). A
+    substring query takes the postings of its rarest trigram as candidates
+    and verifies each one; queries shorter than three characters scan the
+    lowered texts instead. Both give exactly the same matches as
+    ``query.lower() in word.lower() or query.lower() in translation.lower()``
+    in list order.
+    """
+
+    def __init__(self, entries: List[Dict[str, Any]],
+                 count: Optional[int] = None):
+        """
+        Build the index over an existing list of entries
+
+        Args:
+            entries: The word entries of one language (kept by reference)
+            count: Index only the first ``count`` entries (default: all);
+                   the rest are added later with add
+        """
+        self.entries = entries
+        self.postings: Dict[str, array] = {}
+        self.lowered: List[str] = []
+        count = len(entries) if count is None else count
+        for i in range(count):
+            self.add(entries[i])
+
+    def __len__(self) -> int:
+        return len(self.lowered)
+
+    def add(self, entry: Dict[str, Any]) -> None:
+        """
+        Index an entry that was appended to the entries list
+
+        Args:
+            entry: The word entry (must be the next entry in the list)
+        """
+        position = len(self.lowered)
+        text = entry_text(entry)
+        self.lowered.append(text)
+
+        # Positions only grow, so appending keeps the postings sorted
+        postings = self.postings
+        for gram in trigrams(text):
+            if SEPARATOR in gram:
+                continue
+            bucket = postings.get(gram)
+            if bucket is None:
+                postings[gram] = array('I', (position,))
+            else:
+                bucket.append(position)
+
+    def search(self, query: str) -> List[Dict[str, Any]]:
+        """
+        Find entries whose word or translation contains the query
+
+        Args:
+            query: The search query (case-insensitive)
+
+        Returns:
+            Matching entries in the order they were added
+        """
+        query = query.lower()
+        lowered = self.lowered
+
+        if SEPARATOR in query:
+            return []
+        if len(query) < 3:
+            positions = [
+                i for i, text in enumerate(lowered) if query in text
+            ]
+        else:
+            rarest = None
+            for gram in trigrams(query):
+                bucket = self.postings.get(gram)
+                if not bucket:
+                    return []
+                if rarest is None or len(bucket) < len(rarest):
+                    rarest = bucket
+            positions = [i for i in rarest if query in lowered[i]]
+
+        entries = self.entries
+        return [entries[i] for i in positions]
@@ -1,11 +1,20 @@
 import logging
 import json
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Union
 from pathlib import Path
 import os
+import time
 from datetime import datetime
 
-from convolingo.utils.config import config
+from convolingo.utils.config import (
+    config, VOCABULARY_SHARD_CACHE_SIZE, DEFAULT_TARGET_LANGUAGE,
+    REVIEW_BATCH_SIZE
+)
+from convolingo.tools.review import MIN_GRADE, MAX_GRADE, schedule_review
+from convolingo.tools.schema import TOOL_ACTIONS
+from convolingo.tools.storage import VocabularyStore, create_store
+from convolingo.tools.shards import VocabularyShards
+from convolingo.utils.metrics import metrics, TOOL_CALL_SECONDS, TOOL_CALL_ERRORS
 
 # Set up logging
 logger = logging.getLogger(__name__)
@@ -13,61 +22,163 @@ logger = logging.getLogger(__name__)
 class VocabularyTool:
     """Tool for managing vocabulary words during language learning sessions"""
     
-    def __init__(self, tool_id: Optional[str] = None):
+    def __init__(self, tool_id: Optional[str] = None,
+                 store: Optional[VocabularyStore] = None,
+                 backend: Optional[str] = None):
         """
         Initialize the vocabulary tool
         
         Args:
             tool_id: Optional tool ID (if None, will use a default value)
+            store: Optional storage backend for words without a user ID
+                   (default: the configured backend in the history
+                   directory)
+            backend: Optional storage backend name overriding the
+                     configured one (json or sqlite)
         """
         self.tool_id = tool_id or "vocabulary-tool"
-        self.vocabulary_file = config.history_dir / "vocabulary.json"
-        self.vocabulary = self._load_vocabulary()
+        backend = backend or config.vocabulary_backend
+        self.store = store or create_store(backend, config.history_dir)
+        
+        # Per-user vocabulary shards under history_dir/users/<user_id>/
+        self.shards = VocabularyShards(
+            backend,
+            config.history_dir / "users",
+            default_store=self.store,
+            capacity=VOCABULARY_SHARD_CACHE_SIZE
+        )
     
-    def _load_vocabulary(self) -> Dict[str, List[Dict[str, Any]]]:
-        """Load vocabulary from file or create new if doesn't exist"""
-        if not self.vocabulary_file.exists():
-            return {}
-            
-        try:
-            with open(self.vocabulary_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Error loading vocabulary: {e}")
-            return {}
+    def flush(self) -> bool:
+        """
+        Persist buffered vocabulary writes now
+        
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        return self.shards.flush()
     
-    def _save_vocabulary(self) -> bool:
-        """Save vocabulary to file"""
-        try:
-            with open(self.vocabulary_file, 'w', encoding='utf-8') as f:
-                json.dump(self.vocabulary, f, indent=2, ensure_ascii=False)
-            return True
-        except Exception as e:
-            logger.error(f"Error saving vocabulary: {e}")
-            return False
+    def close(self) -> None:
+        """Persist pending vocabulary state and release all stores"""
+        self.shards.close()
     
-    def handle_tool_call(self, text: str) -> Dict[str, Any]:
+    def handle_tool_call(self, arguments: Union[Dict[str, Any], str],
+                         user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Handle a vocabulary tool call
         
+        Routes the structured tool arguments (action, word, language,
+        translation, notes and quality, see TOOL_PARAMETERS) to add_word,
+        list_words, search_word, due_words or review_word.
+        
+        Args:
+            arguments: The tool call arguments, or a JSON string of them
+            user_id: Optional user whose vocabulary to use
+            
+        Returns:
+            Dict containing response data
+        """
+        if isinstance(arguments, str):
+            try:
+                arguments = json.loads(arguments) if arguments.strip() else {}
+            except ValueError:
+                arguments = None
+        if not isinstance(arguments, dict):
+            return self._tool_result(
+                False, "Vocabulary request must be an object of arguments"
+            )
+        
+        action = str(arguments.get("action") or "").strip().lower()
+        language = arguments.get("language") or DEFAULT_TARGET_LANGUAGE
+        logger.info(
+            "Vocabulary tool called: action=%s language=%s", action, language
+        )
+        
+        started = time.perf_counter()
+        result = self._run_action(action, language, arguments, user_id)
+        
+        # Unknown actions share one label to bound the number of series
+        label = action if action in TOOL_ACTIONS else "invalid"
+        metrics.observe(TOOL_CALL_SECONDS, time.perf_counter() - started,
+                        (label,))
+        if not result.get("success"):
+            metrics.inc(TOOL_CALL_ERRORS, (label,))
+        
+        result["tool_id"] = self.tool_id
+        return result
+    
+    def _run_action(self, action: str, language: str,
+                    arguments: Dict[str, Any],
+                    user_id: Optional[str]) -> Dict[str, Any]:
+        """
+        Run one vocabulary action
+        
         Args:
-            text: Text containing vocabulary request
+            action: The requested action
+            language: The language to use
+            arguments: The tool call arguments
+            user_id: Optional user whose vocabulary to use
             
         Returns:
             Dict containing response data
         """
-        logger.info(f"Vocabulary tool called with: {text}")
+        word = arguments.get("word")
+        if action == "add":
+            translation = arguments.get("translation")
+            if not word or not translation:
+                return self._tool_result(
+                    False, "Adding a word needs both 'word' and 'translation'"
+                )
+            return self.add_word(
+                language, word, translation,
+                notes=arguments.get("notes"), user_id=user_id
+            )
+        if action == "list":
+            return self.list_words(language, user_id=user_id)
+        if action == "search":
+            if not word:
+                return self._tool_result(
+                    False, "Searching needs a 'word' to search for"
+                )
+            return self.search_word(language, word, user_id=user_id)
+        if action == "review":
+            if not word:
+                return self.due_words(language, user_id=user_id)
+            quality = arguments.get("quality")
+            try:
+                quality = int(quality)
+            except (TypeError, ValueError):
+                return self._tool_result(
+                    False,
+                    f"Reviewing a word needs a 'quality' from {MIN_GRADE} "
+                    f"to {MAX_GRADE}"
+                )
+            return self.review_word(language, word, quality, user_id=user_id)
+        return self._tool_result(
+            False,
+            f"Unknown vocabulary action '{action}' "
+            f"(expected one of: {', '.join(TOOL_ACTIONS)})"
+        )
+    
+    def _tool_result(self, success: bool, message: str) -> Dict[str, Any]:
+        """
+        Build a tool call response without data
         
-        # In a real implementation, this would parse the text and perform
-        # the requested action. For now, it just logs the call.
+        Args:
+            success: Whether the call succeeded
+            message: Message for the assistant
+            
+        Returns:
+            Dict containing response data
+        """
         return {
-            "success": True,
-            "message": f"Processed vocabulary request: {text}",
+            "success": success,
+            "message": message,
             "tool_id": self.tool_id
         }
     
     def add_word(self, language: str, word: str, 
-                translation: str, notes: Optional[str] = None) -> Dict[str, Any]:
+                translation: str, notes: Optional[str] = None,
+                user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Add a word to the vocabulary
         
@@ -76,13 +187,11 @@ class VocabularyTool:
             word: The word to add
             translation: The translation of the word
             notes: Optional notes about the word
+            user_id: Optional user whose vocabulary to use
             
         Returns:
             Dict containing response data
         """
-        if language not in self.vocabulary:
-            self.vocabulary[language] = []
-            
         # Create word entry
         word_entry = {
             "word": word,
@@ -96,10 +205,8 @@ class VocabularyTool:
             word_entry["notes"] = notes
             
         # Add to vocabulary
-        self.vocabulary[language].append(word_entry)
-        
-        # Save vocabulary
-        self._save_vocabulary()
+        with self.shards.use(user_id) as store:
+            store.add_entry(language, word_entry)
         
         return {
             "success": True,
@@ -107,56 +214,125 @@ class VocabularyTool:
             "word_entry": word_entry
         }
     
-    def list_words(self, language: str) -> Dict[str, Any]:
+    def list_words(self, language: str,
+                   user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         List all words in a language
         
         Args:
             language: The language to list words for
+            user_id: Optional user whose vocabulary to use
             
         Returns:
             Dict containing response data with word list
         """
-        if language not in self.vocabulary:
-            return {
-                "success": True,
-                "message": f"No words found for {language}",
-                "words": []
-            }
+        with self.shards.use(user_id) as store:
+            if not store.has_language(language):
+                return {
+                    "success": True,
+                    "message": f"No words found for {language}",
+                    "words": []
+                }
             
+            words = store.list_entries(language)
         return {
             "success": True,
-            "message": f"Found {len(self.vocabulary[language])} words for {language}",
-            "words": self.vocabulary[language]
+            "message": f"Found {len(words)} words for {language}",
+            "words": words
         }
     
-    def search_word(self, language: str, query: str) -> Dict[str, Any]:
+    def search_word(self, language: str, query: str,
+                    user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Search for a word in the vocabulary
         
         Args:
             language: The language to search in
             query: The search query
+            user_id: Optional user whose vocabulary to use
             
         Returns:
             Dict containing response data with search results
         """
-        if language not in self.vocabulary:
-            return {
-                "success": True,
-                "message": f"No words found for {language}",
-                "results": []
-            }
-            
-        # Simple case-insensitive search
-        results = [
-            word for word in self.vocabulary[language]
-            if query.lower() in word["word"].lower() or 
-               query.lower() in word["translation"].lower()
-        ]
+        with self.shards.use(user_id) as store:
+            if not store.has_language(language):
+                return {
+                    "success": True,
+                    "message": f"No words found for {language}",
+                    "results": []
+                }
+                
+            # Case-insensitive substring search
+            results = store.search_entries(language, query)
         
         return {
             "success": True,
             "message": f"Found {len(results)} matches for '{query}' in {language}",
             "results": results
-        } 
\ No newline at end of file
+        } 
+    
+    def due_words(self, language: str, limit: int = REVIEW_BATCH_SIZE,
+                  user_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Get the words due for review, earliest due first
+        
+        Args:
+            language: The language to review
+            limit: Maximum number of words
+            user_id: Optional user whose vocabulary to use
+            
+        Returns:
+            Dict containing response data with the due words
+        """
+        now = datetime.now().isoformat()
+        with self.shards.use(user_id) as store:
+            words = store.due_entries(language, now, limit)
+        
+        if not words:
+            message = f"No {language} words are due for review"
+        else:
+            message = f"{len(words)} {language} words are due for review"
+        return {
+            "success": True,
+            "message": message,
+            "words": words
+        }
+    
+    def review_word(self, language: str, word: str, quality: int,
+                    user_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Record a review of a word and schedule the next one (SM-2)
+        
+        Args:
+            language: The language of the word
+            word: The word reviewed
+            quality: How well the word was recalled, 0 (forgot) to 5
+                     (perfect)
+            user_id: Optional user whose vocabulary to use
+            
+        Returns:
+            Dict containing response data with the updated word entry
+        """
+        if not MIN_GRADE <= quality <= MAX_GRADE:
+            return self._tool_result(
+                False, f"Review quality must be from {MIN_GRADE} to {MAX_GRADE}"
+            )
+        
+        now = datetime.now()
+        with self.shards.use(user_id) as store:
+            word_entry = store.update_entry(
+                language, word, lambda entry: schedule_review(entry, quality, now)
+            )
+        
+        if word_entry is None:
+            return self._tool_result(
+                False, f"Word '{word}' is not in the {language} vocabulary"
+            )
+        return {
+            "success": True,
+            "message": (
+                f"Reviewed '{word}'; next review in "
+                f"{word_entry['interval']} day(s)"
+            ),
+            "word_entry": word_entry
+        }
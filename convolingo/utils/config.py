@@ -1,6 +1,6 @@
 import os
+import threading
 from pathlib import Path
-from dotenv import load_dotenv
 
 # Constants
 DEFAULT_TARGET_LANGUAGE = "German"
@@ -10,10 +10,62 @@ DEFAULT_CHAPTER = "Chapter 3 - Ordering a donner (cost, cash/card, getting chang
 # VOCABULARY_TOOL_ID = "b7bf97bf-c4cb-4d41-9db2-038460f17870"
 WEBHOOK_PORT = 5000
 
-# Default system prompt template
-# Note: This template is for documentation purposes only.
-# The assistant configuration shows that the system prompt is set in the 
-# model.messages array rather than directly as systemPrompt.
+# Webhook server modes: Flask (threaded WSGI) or asyncio (ASGI)
+FLASK_MODE = "flask"
+ASYNC_MODE = "async"
+SERVER_MODES = (FLASK_MODE, ASYNC_MODE)
+
+# Number of journaled vocabulary mutations before compacting into a snapshot
+VOCABULARY_COMPACT_THRESHOLD = 1000
+
+# Write-behind persistence: seconds between background group commits of
+# vocabulary mutations (0 writes each one synchronously), and the number of
+# buffered mutations that triggers an early commit
+VOCABULARY_FLUSH_INTERVAL = 1.0
+VOCABULARY_FLUSH_BATCH_SIZE = 100
+
+# Maximum number of per-user vocabulary shards kept loaded at once
+VOCABULARY_SHARD_CACHE_SIZE = 64
+
+# Maximum number of due words handed out for one review round
+REVIEW_BATCH_SIZE = 10
+
+# Assistant model/voice/transcriber profile used unless one is given, and
+# the maximum number of prebuilt assistant configurations kept in memory
+DEFAULT_ASSISTANT_PROFILE = "default"
+ASSISTANT_CONFIG_CACHE_SIZE = 128
+
+# Maximum number of sessions of a cohort run at once
+COHORT_CONCURRENCY = 8
+
+# Outgoing session messages: maximum number of queued lines, seconds to
+# wait for more lines to join into one message and the most lines joined,
+# the retries of a failed send with the delay before the first one, and
+# the most seconds an ending session waits for queued lines to be sent
+OUTBOUND_QUEUE_SIZE = 64
+OUTBOUND_COALESCE_SECONDS = 0.05
+OUTBOUND_MAX_LINES = 10
+OUTBOUND_MAX_RETRIES = 3
+OUTBOUND_RETRY_DELAY = 0.2
+OUTBOUND_FLUSH_TIMEOUT = 1.0
+
+# Maximum INFO/DEBUG log records per second per message from the loggers
+# on the webhook request path; the rest are dropped under load
+LOG_RATE_LIMITS = {
+    "convolingo.api.server": 20.0,
+    "convolingo.api.asgi": 20.0,
+    "convolingo.tools.vocabulary": 20.0,
+}
+
+# VAPI REST calls: connect and read timeouts in seconds, and the number of
+# retries of rate-limited (429) or failed (5xx) calls
+VAPI_CONNECT_TIMEOUT = 5.0
+VAPI_READ_TIMEOUT = 30.0
+VAPI_MAX_RETRIES = 3
+
+# Default system prompt template, sent as the system message in the
+# model.messages array of the assistant configuration (see
+# convolingo.api.assistants) rather than directly as systemPrompt
 DEFAULT_SYSTEM_PROMPT = """
 You are a language learning teaching assistant named Emma.
 You will begin a lesson plan starting in {native_language} and begin role playing speaking in {target_language}.
@@ -30,6 +82,8 @@ class Config:
     
     def __init__(self):
         """Initialize configuration by loading environment variables"""
+        from dotenv import load_dotenv
+        
         # Determine the repository root directory
         self.root_dir = Path(os.path.dirname(os.path.dirname(
             os.path.dirname(os.path.abspath(__file__)))))
@@ -50,12 +104,63 @@ class Config:
         # API settings
         self.api_base = os.getenv('VAPI_API_BASE', 'https://api.vapi.ai')
         
-        # History directory
-        self.history_dir = self.root_dir / "conversation_history"
+        # History directory (vocabulary, setup state and session logs)
+        self.history_dir = Path(os.getenv(
+            'CONVOLINGO_HISTORY_DIR', self.root_dir / "conversation_history"
+        ))
         
         # Ensure history directory exists
-        self.history_dir.mkdir(exist_ok=True)
+        self.history_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Vocabulary storage backend (json or sqlite)
+        self.vocabulary_backend = os.getenv('VOCABULARY_BACKEND', 'json')
+        
+        # Start calls with assistants created once in VAPI instead of
+        # sending the whole assistant configuration with every call
+        self.persist_assistants = os.getenv(
+            'VAPI_PERSIST_ASSISTANTS', ''
+        ).lower() in ('1', 'true', 'yes')
+        
+        # How calls are run: vapi (the SDK) or fake (in-process, offline)
+        self.transport = os.getenv('VAPI_TRANSPORT', 'vapi')
+
+
+_config = None
+_config_lock = threading.Lock()
+
+
+def get_config() -> Config:
+    """
+    Get the configuration singleton, creating it on first use
+    
+    Creating it loads .env, validates the API key and creates the history
+    directory, so this is deferred until a setting is first needed.
+    
+    Returns:
+        Config: The configuration
+    """
+    global _config
+    if _config is None:
+        with _config_lock:
+            if _config is None:
+                _config = Config()
+    return _config
+
+
+class LazyConfig:
+    """
+    Stand-in for the Config singleton that creates it on first attribute access
+    
+    Modules can import ``config`` at load time without loading .env or
+    requiring an API key until a setting is actually read.
+    """
+    
+    def __getattr__(self, name: str):
+        return getattr(get_config(), name)
+    
+    def __setattr__(self, name: str, value) -> None:
+        setattr(get_config(), name, value)
 
 
-# Create singleton instance
-config = Config() 
\ No newline at end of file
+# Lazily created singleton instance
+config = LazyConfig()
\ No newline at end of file
@@ -1,68 +1,238 @@
+import atexit
 import logging
 import os
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+
+# Background listener of the queued logging mode (None when logging is
+# synchronous) and the handler feeding it
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+_fork_hook_registered = False
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Drop high-volume log records beyond a maximum rate
+
+    Records below WARNING from the configured loggers (and their children)
+    pass at most ``rate`` times per second per message template, with
+    bursts of up to ``rate`` records. Warnings and errors always pass. The
+    number of dropped records is appended to the next record that passes.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        """
+        Initialize the filter
+
+        Args:
+            rates: Maximum records per second, by logger name
+        """
+        super().__init__()
+        self.rates = dict(rates)
+        self._rate_cache: Dict[str, Optional[float]] = {}
+        self._buckets: Dict[Tuple[str, str], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def _rate_for(self, name: str) -> Optional[float]:
+        """Get the rate limit of a logger, inherited from its parents"""
+        try:
+            return self._rate_cache[name]
+        except KeyError:
+            pass
+        rate = None
+        current = name
+        while current:
+            if current in self.rates:
+                rate = self.rates[current]
+                break
+            current = current.rpartition(".")[0]
+        self._rate_cache[name] = rate
+        return rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # Decide once per record even if several handlers share the filter
+        decision = getattr(record, "_rate_limit_passed", None)
+        if decision is not None:
+            return decision
+
+        decision = self._allow(record)
+        record._rate_limit_passed = decision
+        return decision
+
+    def _allow(self, record: logging.LogRecord) -> bool:
+        """Take a token from the record's bucket if one is available"""
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self._rate_for(record.name)
+        if rate is None:
+            return True
+
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [rate, now, 0]
+            tokens = min(rate, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+            if tokens < 1:
+                bucket[0] = tokens
+                bucket[2] += 1
+                return False
+            bucket[0] = tokens - 1
+            dropped, bucket[2] = bucket[2], 0
+
+        if dropped and isinstance(record.args, tuple):
+            msg = str(record.msg)
+            if not record.args:
+                # Without arguments the message is not %-formatted
+                msg = msg.replace("%", "%%")
+            record.msg = f"{msg} (%d similar messages suppressed)"
+            record.args = record.args + (dropped,)
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that leaves message formatting to the listener thread
+
+    The stock QueueHandler formats every record on the logging thread
+    before enqueueing it. This one only renders tracebacks there and
+    enqueues the record as is, so ``%``-style arguments are formatted in
+    the background. Arguments should therefore not be mutated after they
+    are logged.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(
+                    record.exc_info
+                )
+            record.exc_info = None
+        return record
 
 
 def configure_logging(log_level: int = logging.INFO,
                      log_to_file: bool = False,
-                     log_file: Optional[str] = None) -> None:
+                     log_file: Optional[str] = None,
+                     queued: bool = False,
+                     rate_limits: Optional[Dict[str, float]] = None) -> None:
     """
     Configure logging for the application
-    
+
     Args:
         log_level: Logging level (default: INFO)
         log_to_file: Whether to log to a file
         log_file: Path to log file (default: convolingo.log in logs directory)
+        queued: Whether to hand records to a background listener thread
+                instead of writing them on the logging thread
+        rate_limits: Optional maximum records per second (below WARNING)
+                     per message, by logger name
     """
+    stop_logging()
+
     # Create formatter
     log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     formatter = logging.Formatter(log_format)
-    
+
     # Root logger
     root_logger = logging.getLogger()
     root_logger.setLevel(log_level)
-    
+
     # Clear any existing handlers
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
-    
+
     # Console handler
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
-    root_logger.addHandler(console_handler)
-    
+    handlers: List[logging.Handler] = [console_handler]
+
     # File handler if requested
     if log_to_file:
         if not log_file:
             # Get the repository root
             repo_root = Path(os.path.dirname(os.path.dirname(
                 os.path.dirname(os.path.abspath(__file__)))))
-            
+
             # Create logs directory if it doesn't exist
             logs_dir = repo_root / "logs"
             logs_dir.mkdir(exist_ok=True)
-            
+
             # Default log file
             log_file = str(logs_dir / "convolingo.log")
-        
+
         file_handler = logging.FileHandler(log_file)
         file_handler.setFormatter(formatter)
-        root_logger.addHandler(file_handler)
-    
+        handlers.append(file_handler)
+
+    if queued:
+        _start_listener(handlers)
+        handlers = [_queue_handler]
+
+    rate_filter = RateLimitFilter(rate_limits) if rate_limits else None
+    for handler in handlers:
+        if rate_filter:
+            handler.addFilter(rate_filter)
+        root_logger.addHandler(handler)
+
     # Suppress overly verbose loggers
     logging.getLogger('urllib3').setLevel(logging.WARNING)
     logging.getLogger('werkzeug').setLevel(logging.WARNING)
 
 
+def _start_listener(handlers: List[logging.Handler]) -> None:
+    """Start the background listener writing to the given handlers"""
+    global _listener, _queue_handler, _fork_hook_registered
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = DeferredQueueHandler(log_queue)
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+    if not _fork_hook_registered:
+        atexit.register(stop_logging)
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=_restart_listener_in_child)
+        _fork_hook_registered = True
+
+
+def _restart_listener_in_child() -> None:
+    """Give a forked process its own queue and listener thread"""
+    global _listener
+    if _listener is None:
+        return
+    # The listener thread does not survive the fork
+    log_queue = queue.SimpleQueue()
+    _queue_handler.queue = log_queue
+    _listener = QueueListener(
+        log_queue, *_listener.handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Write out queued log records and stop the background listener"""
+    global _listener
+    if _listener is not None:
+        listener, _listener = _listener, None
+        listener.stop()
+
+
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger with the given name
-    
+
     Args:
         name: Logger name
-        
+
     Returns:
         Logger instance
     """
-    return logging.getLogger(name) 
\ No newline at end of file
+    return logging.getLogger(name)
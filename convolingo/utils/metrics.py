@@ -0,0 +1,217 @@
+import threading
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+)
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+# Metric families recorded by the webhook server and the vocabulary tool
+REQUEST_SECONDS = "convolingo_http_request_duration_seconds"
+REQUEST_ERRORS = "convolingo_http_request_errors_total"
+REQUESTS_IN_FLIGHT = "convolingo_http_requests_in_flight"
+TOOL_CALL_SECONDS = "convolingo_tool_call_duration_seconds"
+TOOL_CALL_ERRORS = "convolingo_tool_call_errors_total"
+PERSIST_SECONDS = "convolingo_vocabulary_persist_duration_seconds"
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+Labels = Tuple[str, ...]
+
+
+class Metrics:
+    """
+    In-process counters, gauges and histograms in the Prometheus text format
+
+    Every thread records into its own shard (keyed by thread ID, so the
+    shards of finished threads are reused by new ones), which keeps the
+    hot path free of locks: recording is a dict lookup and an increment.
+    ``render`` sums the shards when the metrics are scraped. Each process
+    keeps its own metrics, so with several worker processes a scrape shows
+    the worker that answered it; workers set a constant ``worker`` label so
+    their series stay separate in Prometheus and can be summed there.
+    """
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        """
+        Initialize the metrics
+
+        Args:
+            buckets: Upper bounds of the histogram buckets, ascending
+        """
+        self.buckets = tuple(buckets)
+        # name -> (type, help text, label names)
+        self.families: Dict[str, Tuple[str, str, Labels]] = {}
+        self._shards: Dict[int, Dict[Tuple[str, Labels], List[float]]] = {}
+        self._lock = threading.Lock()
+        # Label pairs added to every series, e.g. the worker process
+        self.constant_labels: List[Tuple[str, str]] = []
+
+    def define(self, name: str, kind: str, help_text: str,
+               labelnames: Labels = ()) -> None:
+        """
+        Declare a metric family
+
+        Args:
+            name: Metric name
+            kind: COUNTER, GAUGE or HISTOGRAM
+            help_text: Description shown in the HELP line
+            labelnames: Names of the labels, in the order values are given
+        """
+        self.families[name] = (kind, help_text, tuple(labelnames))
+
+    def set_constant_labels(self, labels: Dict[str, str]) -> None:
+        """
+        Set labels added to every rendered series
+
+        Args:
+            labels: Label names and values (e.g. {"worker": "0"})
+        """
+        self.constant_labels = [
+            (name, str(value)) for name, value in labels.items()
+        ]
+
+    def _series(self, name: str, labels: Labels, size: int) -> List[float]:
+        """Get the calling thread's values of one series"""
+        ident = threading.get_ident()
+        shard = self._shards.get(ident)
+        if shard is None:
+            with self._lock:
+                shard = self._shards.setdefault(ident, {})
+        key = (name, labels)
+        series = shard.get(key)
+        if series is None:
+            series = shard[key] = [0] * size
+        return series
+
+    def inc(self, name: str, labels: Labels = (), amount: float = 1) -> None:
+        """
+        Add to a counter or gauge
+
+        Args:
+            name: Metric name
+            labels: Label values
+            amount: Amount to add (negative to decrease a gauge)
+        """
+        self._series(name, labels, 1)[0] += amount
+
+    def observe(self, name: str, value: float, labels: Labels = ()) -> None:
+        """
+        Record one observation in a histogram
+
+        Args:
+            name: Metric name
+            value: The observed value
+            labels: Label values
+        """
+        # One count per bucket (the last one is +Inf), then the sum
+        series = self._series(name, labels, len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def collect(self) -> Dict[Tuple[str, Labels], List[float]]:
+        """
+        Sum the values of all threads
+
+        Returns:
+            Dict of the summed values by metric name and label values
+        """
+        with self._lock:
+            shards = list(self._shards.values())
+        totals: Dict[Tuple[str, Labels], List[float]] = {}
+        for shard in shards:
+            for key, values in list(shard.items()):
+                total = totals.get(key)
+                if total is None:
+                    totals[key] = list(values)
+                else:
+                    for i, value in enumerate(values):
+                        total[i] += value
+        return totals
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format
+
+        Returns:
+            The metrics text
+        """
+        totals = self.collect()
+        constant = self.constant_labels
+        lines = []
+        for name, (kind, help_text, labelnames) in self.families.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            series = sorted(
+                (labels, values) for (metric, labels), values in totals.items()
+                if metric == name
+            )
+            if not series and not labelnames and kind != HISTOGRAM:
+                series = [((), [0])]
+            for labels, values in series:
+                pairs = constant + list(zip(labelnames, labels))
+                if kind != HISTOGRAM:
+                    lines.append(
+                        f"{name}{_format_labels(pairs)} {_number(values[0])}"
+                    )
+                    continue
+                count = 0
+                for bound, bucket in zip(self.buckets + (None,), values):
+                    count += bucket
+                    le = "+Inf" if bound is None else _number(bound)
+                    lines.append(
+                        f"{name}_bucket{_format_labels(pairs + [('le', le)])}"
+                        f" {_number(count)}"
+                    )
+                lines.append(
+                    f"{name}_sum{_format_labels(pairs)} {_number(values[-1])}"
+                )
+                lines.append(
+                    f"{name}_count{_format_labels(pairs)} {_number(count)}"
+                )
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(pairs: List[Tuple[str, str]]) -> str:
+    """Format label pairs as {name="value",...}"""
+    if not pairs:
+        return ""
+    return "{" + ",".join(
+        f'{name}="{_escape(value)}"' for name, value in pairs
+    ) + "}"
+
+
+def _escape(value: str) -> str:
+    """Escape a label value"""
+    return (str(value).replace("\\", "\\\\").replace('"', '\\"')
+            .replace("\n", "\\n"))
+
+
+def _number(value: float) -> str:
+    """Format a sample value"""
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# Metrics of this process
+metrics = Metrics()
+metrics.define(REQUEST_SECONDS, HISTOGRAM,
+               "Webhook request latency by route", ("route",))
+metrics.define(REQUEST_ERRORS, COUNTER,
+               "Webhook requests answered with an error status", ("route",))
+metrics.define(REQUESTS_IN_FLIGHT, GAUGE,
+               "Webhook requests being processed")
+metrics.define(TOOL_CALL_SECONDS, HISTOGRAM,
+               "Vocabulary tool call latency by action", ("action",))
+metrics.define(TOOL_CALL_ERRORS, COUNTER,
+               "Vocabulary tool calls that failed", ("action",))
+metrics.define(PERSIST_SECONDS, HISTOGRAM,
+               "Time spent writing vocabulary to disk", ("operation",))
@@ -5,12 +5,21 @@ import signal
 import logging
 import requests
 import re
+import shutil
 import sys
+import json
+import threading
 from typing import Optional, Dict, Any, Tuple
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Tunnel list of the local ngrok agent API
+NGROK_API_URL = "http://localhost:4040/api/tunnels"
+
+# Port at the end of a tunnel address such as "http://localhost:5000"
+ADDR_PORT = re.compile(r"(?:^|:)(\d+)/?$")
+
 
 class NgrokTunnel:
     """Helper class to manage ngrok tunnel"""
@@ -19,21 +28,44 @@ class NgrokTunnel:
         """Initialize the ngrok tunnel"""
         self.process = None
         self.public_url = None
+        self.adopted = False
+        self._log_url = None
+        self._ready = threading.Event()
     
     def start(self, port: int = 5000, 
              check_interval: float = 0.5,
-             timeout: float = 10.0) -> Optional[str]:
+             timeout: float = 10.0,
+             adopt: bool = True) -> Optional[str]:
         """
         Start ngrok tunnel for the specified port
         
+        If an ngrok agent is already running an https tunnel to the port,
+        that tunnel is adopted: its URL is reused and nothing is killed or
+        started, so the public URL stays the same across restarts.
+        
+        ngrok writes its log as JSON lines to stdout, which a reader thread
+        watches for the line announcing the tunnel URL, so start returns
+        as soon as the tunnel is up. Polling the local ngrok API every
+        check_interval remains as a fallback.
+        
         Args:
             port: The port to tunnel
             check_interval: How often to check if tunnel is ready (seconds)
             timeout: Maximum time to wait for tunnel (seconds)
+            adopt: Whether to reuse an existing tunnel to the port
             
         Returns:
             The public URL if successful, None otherwise
         """
+        self.adopted = False
+        if adopt:
+            existing_url = self._get_public_url(port)
+            if existing_url:
+                logger.info(f"Reusing existing ngrok tunnel at {existing_url}")
+                self.public_url = existing_url
+                self.adopted = True
+                return existing_url
+        
         # Check if ngrok is installed
         if not self._check_ngrok_installed():
             logger.error("ngrok is not installed. Please install it first.")
@@ -46,29 +78,44 @@ class NgrokTunnel:
         logger.info(f"Starting ngrok tunnel for port {port}...")
         try:
             # Start ngrok as a subprocess
+            self._log_url = None
+            self._ready.clear()
             self.process = subprocess.Popen(
-                ["ngrok", "http", str(port)],
+                ["ngrok", "http", str(port),
+                 "--log", "stdout", "--log-format", "json"],
                 stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
                 # Prevent the child process from receiving signals sent to the parent
                 preexec_fn=os.setpgrp if os.name != 'nt' else None
             )
+            threading.Thread(
+                target=self._read_log,
+                args=(self.process.stdout,),
+                name="ngrok-log",
+                daemon=True
+            ).start()
             
             # Wait for tunnel to be established
             start_time = time.time()
             while time.time() - start_time < timeout:
-                # Check if ngrok is running
-                if self.process.poll() is not None:
-                    logger.error("ngrok process exited unexpectedly")
-                    return None
+                # Wakes up as soon as the log announces the tunnel
+                self._ready.wait(check_interval)
                 
-                # Try to get the tunnel URL from the ngrok API
-                self.public_url = self._get_public_url()
+                # Try the log first, then the ngrok API
+                self.public_url = self._log_url or self._get_public_url(port)
                 if self.public_url:
                     logger.info(f"ngrok tunnel established at {self.public_url}")
                     return self.public_url
                 
-                time.sleep(check_interval)
+                # Check if ngrok is running
+                if self.process.poll() is not None:
+                    logger.error("ngrok process exited unexpectedly")
+                    self.process = None
+                    return None
+                
+                # The log closed without a URL; keep polling at the interval
+                if self._ready.is_set():
+                    time.sleep(check_interval)
             
             logger.error(f"Timed out waiting for ngrok tunnel after {timeout} seconds")
             self.stop()
@@ -81,6 +128,11 @@ class NgrokTunnel:
     
     def stop(self) -> None:
         """Stop the ngrok tunnel"""
+        if self.adopted:
+            # The tunnel belongs to another ngrok agent; leave it running
+            logger.info("Leaving the reused ngrok tunnel running")
+            self.adopted = False
+            self.public_url = None
         if self.process:
             logger.info("Stopping ngrok tunnel...")
             if os.name == 'nt':
@@ -98,16 +150,40 @@ class NgrokTunnel:
     
     def _check_ngrok_installed(self) -> bool:
         """Check if ngrok is installed"""
+        return shutil.which("ngrok") is not None
+    
+    def _read_log(self, stream) -> None:
+        """
+        Read ngrok's JSON log and signal when the tunnel URL appears
+        
+        Keeps draining the log until ngrok exits so its output pipe never
+        fills up and blocks it.
+        
+        Args:
+            stream: The stdout pipe of the ngrok process
+        """
         try:
-            subprocess.run(
-                ["ngrok", "--version"], 
-                stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE,
-                check=True
-            )
-            return True
-        except (subprocess.SubprocessError, FileNotFoundError):
-            return False
+            for raw in iter(stream.readline, b""):
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    logger.debug(f"ngrok: {raw.decode(errors='replace').rstrip()}")
+                    continue
+                if not isinstance(record, dict):
+                    continue
+                
+                url = record.get("url", "")
+                if (record.get("msg") == "started tunnel"
+                        and url.startswith("https://")):
+                    self._log_url = url
+                    self._ready.set()
+                elif record.get("lvl") in ("eror", "crit"):
+                    logger.error(f"ngrok: {record.get('msg')} {record.get('err', '')}")
+        except (OSError, ValueError):
+            pass
+        finally:
+            # Wake up start() so it notices ngrok exited
+            self._ready.set()
     
     def _kill_existing_ngrok(self) -> None:
         """Kill any existing ngrok processes"""
@@ -129,18 +205,32 @@ class NgrokTunnel:
         except subprocess.SubprocessError:
             pass  # Ignore errors if no processes exist
     
-    def _get_public_url(self) -> Optional[str]:
-        """Get the public URL from the ngrok API"""
+    def _get_public_url(self, port: Optional[int] = None) -> Optional[str]:
+        """
+        Get the public URL from the ngrok API
+        
+        Args:
+            port: Only consider tunnels to this local port (default: any)
+            
+        Returns:
+            The public https URL if a matching tunnel exists, None otherwise
+        """
         try:
-            response = requests.get("http://localhost:4040/api/tunnels")
+            response = requests.get(NGROK_API_URL, timeout=1.0)
             if response.status_code == 200:
                 data = response.json()
                 tunnels = data.get("tunnels", [])
                 for tunnel in tunnels:
-                    if tunnel.get("proto") == "https":
-                        return tunnel.get("public_url")
+                    if tunnel.get("proto") != "https":
+                        continue
+                    if port is not None:
+                        addr = str(tunnel.get("config", {}).get("addr", ""))
+                        match = ADDR_PORT.search(addr)
+                        if not match or int(match.group(1)) != port:
+                            continue
+                    return tunnel.get("public_url")
             return None
-        except requests.RequestException:
+        except (requests.RequestException, ValueError):
             return None
     
     def get_api_url(self, path: str = "") -> Optional[str]:
@@ -0,0 +1,235 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Step states
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+class StepFailed(Exception):
+    """Raised by a pipeline step to fail with a message instead of a traceback"""
+
+
+class Step:
+    """One step of a pipeline and the outcome of running it"""
+
+    def __init__(self, name: str, func: Callable[..., Any],
+                 requires: Iterable[str] = ()):
+        """
+        Initialize the step
+
+        Args:
+            name: Step name, also the keyword its result is passed as
+            func: Function run for the step; called with the results of
+                  the required steps as keyword arguments
+            requires: Names of the steps that must finish first
+        """
+        self.name = name
+        self.func = func
+        self.requires = tuple(requires)
+        self.state = PENDING
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Seconds the step took to run, if it ran"""
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+
+class Pipeline:
+    """
+    Dependency graph of steps run concurrently on a thread pool
+
+    Every step starts as soon as all the steps it requires have finished,
+    so independent steps overlap and the total time approaches that of the
+    longest dependency chain. When a step fails, the steps depending on it
+    are skipped while unrelated steps still run to completion.
+    """
+
+    def __init__(self, name: str = "pipeline"):
+        """
+        Initialize an empty pipeline
+
+        Args:
+            name: Name used in log messages
+        """
+        self.name = name
+        self.steps: Dict[str, Step] = {}
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+
+    def add(self, name: str, func: Callable[..., Any],
+            requires: Iterable[str] = ()) -> None:
+        """
+        Add a step
+
+        Args:
+            name: Step name (a valid Python identifier)
+            func: Function run for the step
+            requires: Names of the steps that must finish first
+        """
+        if name in self.steps:
+            raise ValueError(f"Duplicate pipeline step: {name}")
+        self.steps[name] = Step(name, func, requires)
+
+    @property
+    def results(self) -> Dict[str, Any]:
+        """Results of the steps that finished successfully"""
+        return {
+            name: step.result
+            for name, step in self.steps.items() if step.state == DONE
+        }
+
+    def run(self) -> bool:
+        """
+        Run all steps
+
+        Returns:
+            bool: True if every step finished successfully, False otherwise
+        """
+        self._validate()
+        self.started = time.perf_counter()
+        running = {}
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, len(self.steps)),
+            thread_name_prefix=self.name
+        ) as executor:
+            while True:
+                for step in self._ready(running):
+                    kwargs = {
+                        dep: self.steps[dep].result for dep in step.requires
+                    }
+                    step.started = time.perf_counter()
+                    running[executor.submit(step.func, **kwargs)] = step
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    self._complete(running.pop(future), future)
+
+        self.finished = time.perf_counter()
+        self._log_report()
+        return all(step.state == DONE for step in self.steps.values())
+
+    def _validate(self) -> None:
+        """Check that every requirement exists and there are no cycles"""
+        for step in self.steps.values():
+            for dep in step.requires:
+                if dep not in self.steps:
+                    raise ValueError(
+                        f"Step {step.name} requires unknown step {dep}"
+                    )
+
+        visiting, visited = set(), set()
+
+        def visit(name: str) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Pipeline has a cycle through {name}")
+            visiting.add(name)
+            for dep in self.steps[name].requires:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self.steps:
+            visit(name)
+
+    def _ready(self, running: Dict[Any, Step]) -> List[Step]:
+        """Get the pending steps whose requirements are all done"""
+        in_flight = set(running.values())
+        skipped = True
+        # Skipping one step may make its own dependents skippable
+        while skipped:
+            skipped = False
+            ready = []
+            for step in self.steps.values():
+                if step.state != PENDING or step in in_flight:
+                    continue
+                states = [self.steps[dep].state for dep in step.requires]
+                if any(state in (FAILED, SKIPPED) for state in states):
+                    step.state = SKIPPED
+                    skipped = True
+                    logger.info(
+                        f"Skipping {step.name}: a required step failed"
+                    )
+                elif all(state == DONE for state in states):
+                    ready.append(step)
+        return ready
+
+    def _complete(self, step: Step, future) -> None:
+        """Record the outcome of a finished step"""
+        step.finished = time.perf_counter()
+        try:
+            step.result = future.result()
+            step.state = DONE
+        except StepFailed as e:
+            step.error = e
+            step.state = FAILED
+            logger.error(f"{step.name} failed: {e}")
+        except Exception as e:
+            step.error = e
+            step.state = FAILED
+            logger.exception(f"{step.name} failed: {e}")
+
+    def critical_path(self) -> List[str]:
+        """
+        Get the chain of steps that determined the total run time
+
+        Returns:
+            Step names from the first to the last step of the chain
+        """
+        ran = [step for step in self.steps.values() if step.finished]
+        if not ran:
+            return []
+        step = max(ran, key=lambda s: s.finished)
+        path = [step.name]
+        while True:
+            deps = [self.steps[dep] for dep in step.requires
+                    if self.steps[dep].finished]
+            if not deps:
+                break
+            step = max(deps, key=lambda s: s.finished)
+            path.append(step.name)
+        return list(reversed(path))
+
+    def timings(self) -> Dict[str, Optional[float]]:
+        """
+        Get the duration of every step
+
+        Returns:
+            Seconds per step name (None for steps that did not run)
+        """
+        return {name: step.duration for name, step in self.steps.items()}
+
+    def _log_report(self) -> None:
+        """Log per-step timings and the critical path"""
+        logger.info(f"{self.name} step timings:")
+        for name, step in self.steps.items():
+            if step.duration is None:
+                logger.info(f"  {name:<12} {step.state}")
+            else:
+                offset = step.started - self.started
+                logger.info(
+                    f"  {name:<12} {step.state:<8} {step.duration:6.2f}s "
+                    f"(started at +{offset:.2f}s)"
+                )
+        logger.info(
+            f"{self.name} took {self.finished - self.started:.2f}s; "
+            f"critical path: {' -> '.join(self.critical_path())}"
+        )
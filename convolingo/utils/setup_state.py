@@ -0,0 +1,206 @@
+import hashlib
+import logging
+import json
+import os
+import threading
+from typing import Dict, Any, Optional
+from pathlib import Path
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Name of the setup state cache inside the history directory
+SETUP_STATE_FILE_NAME = "setup_state.json"
+
+
+def account_key(api_key: str, api_base: str) -> str:
+    """
+    Get the cache key of a VAPI account without storing the API key itself
+
+    Args:
+        api_key: The VAPI API key
+        api_base: Base URL of the API
+
+    Returns:
+        A short fingerprint of the API base and key
+    """
+    digest = hashlib.sha256(f"{api_base}\n{api_key}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+class SetupState:
+    """
+    Local cache of what setup has already configured in VAPI
+
+    Records, per account, whether the API key was validated, the tool
+    created by setup together with a hash of its definition and its
+    server URL, and which tools are assigned to which assistants. Setup
+    compares the desired state against this cache and only calls the API
+    for what differs. It also maps the hash of each persisted assistant
+    configuration to the ID of the assistant created from it.
+    """
+
+    def __init__(self, state_file: Path, api_key: str, api_base: str):
+        """
+        Initialize the setup state
+
+        Args:
+            state_file: Path of the JSON state file
+            api_key: The VAPI API key of the current account
+            api_base: Base URL of the API
+        """
+        self.state_file = Path(state_file)
+        self.account = account_key(api_key, api_base)
+        self.data = self._load()
+        # Setup steps may update the state from several threads at once
+        self._lock = threading.RLock()
+
+    def _load(self) -> Dict[str, Any]:
+        """Load the state file"""
+        if not self.state_file.exists():
+            return {"accounts": {}}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            data.setdefault("accounts", {})
+            return data
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable setup state: {e}")
+            return {"accounts": {}}
+
+    def save(self) -> None:
+        """Atomically write the state file"""
+        tmp_file = self.state_file.with_name(self.state_file.name + ".tmp")
+        with self._lock:
+            try:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.data, f, indent=2)
+                os.replace(tmp_file, self.state_file)
+            except Exception as e:
+                logger.error(f"Error saving setup state: {e}")
+
+    @property
+    def _current(self) -> Dict[str, Any]:
+        """State of the current account"""
+        return self.data["accounts"].setdefault(self.account, {
+            "key_validated": False,
+            "managed_tool_id": None,
+            "tools": {},
+            "assistants": {}
+        })
+
+    def clear(self) -> None:
+        """Forget everything cached for the current account"""
+        with self._lock:
+            self.data["accounts"].pop(self.account, None)
+            self.save()
+
+    @property
+    def key_validated(self) -> bool:
+        """Whether the API key of the current account was validated"""
+        with self._lock:
+            return self._current["key_validated"]
+
+    def mark_key_validated(self) -> None:
+        """Record that the API key is valid"""
+        with self._lock:
+            self._current["key_validated"] = True
+            self.save()
+
+    @property
+    def managed_tool_id(self) -> Optional[str]:
+        """ID of the tool created by setup, if any"""
+        with self._lock:
+            return self._current["managed_tool_id"]
+
+    def get_tool(self, tool_id: str) -> Dict[str, Any]:
+        """
+        Get the cached state of a tool
+
+        Args:
+            tool_id: The tool ID
+
+        Returns:
+            The cached fields of the tool (empty if unknown)
+        """
+        with self._lock:
+            return dict(self._current["tools"].get(tool_id, {}))
+
+    def set_tool(self, tool_id: str, managed: bool = False,
+                 **fields: Any) -> None:
+        """
+        Record the state of a tool
+
+        Args:
+            tool_id: The tool ID
+            managed: Whether setup created and owns this tool
+            **fields: Fields to record (spec_hash, server_url)
+        """
+        with self._lock:
+            current = self._current
+            current["tools"].setdefault(tool_id, {}).update(fields)
+            if managed:
+                current["managed_tool_id"] = tool_id
+            self.save()
+
+    def forget_tool(self, tool_id: str) -> None:
+        """
+        Drop a tool that no longer exists from the cache
+
+        Args:
+            tool_id: The tool ID
+        """
+        with self._lock:
+            current = self._current
+            current["tools"].pop(tool_id, None)
+            if current["managed_tool_id"] == tool_id:
+                current["managed_tool_id"] = None
+            for tool_ids in current["assistants"].values():
+                if tool_id in tool_ids:
+                    tool_ids.remove(tool_id)
+            self.save()
+
+    def persisted_assistant(self, config_hash: str) -> Optional[str]:
+        """
+        Get the assistant created from a configuration
+
+        Args:
+            config_hash: Hash of the assistant configuration
+
+        Returns:
+            The assistant ID, or None if none was created yet
+        """
+        with self._lock:
+            return self._current.get("persisted_assistants", {}).get(
+                config_hash
+            )
+
+    def set_persisted_assistant(self, config_hash: str,
+                                assistant_id: str) -> None:
+        """Record the assistant created from a configuration"""
+        with self._lock:
+            self._current.setdefault("persisted_assistants", {})[
+                config_hash
+            ] = assistant_id
+            self.save()
+
+    def forget_persisted_assistant(self, config_hash: str) -> None:
+        """Drop an assistant that no longer exists from the cache"""
+        with self._lock:
+            self._current.setdefault("persisted_assistants", {}).pop(
+                config_hash, None
+            )
+            self.save()
+
+    def is_assigned(self, assistant_id: str, tool_id: str) -> bool:
+        """Whether a tool is known to be assigned to an assistant"""
+        with self._lock:
+            return tool_id in self._current["assistants"].get(assistant_id, [])
+
+    def mark_assigned(self, assistant_id: str, tool_id: str) -> None:
+        """Record that a tool is assigned to an assistant"""
+        with self._lock:
+            tool_ids = self._current["assistants"].setdefault(assistant_id, [])
+            if tool_id not in tool_ids:
+                tool_ids.append(tool_id)
+                self.save()
@@ -0,0 +1,177 @@
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+# Set up logging
+logger = logging.getLogger(__name__)
+
+# Name of the session timings file inside the history directory
+SESSION_STATS_FILE_NAME = "session_stats.jsonl"
+
+# Phases of getting a call ready, in order, and the total time to ready
+IMPORT_PHASE = "import"
+SDK_INIT_PHASE = "sdk_init"
+ASSISTANT_BUILD_PHASE = "assistant_build"
+START_PHASE = "start"
+FIRST_MESSAGE_PHASE = "first_message"
+READY = "ready"
+PHASES = (IMPORT_PHASE, SDK_INIT_PHASE, ASSISTANT_BUILD_PHASE, START_PHASE,
+          FIRST_MESSAGE_PHASE, READY)
+
+_write_lock = threading.Lock()
+
+
+class SessionTimings:
+    """
+    How long each phase of getting one session's call ready took
+
+    Only the first measurement of a phase is kept, so work repeated after
+    pre-warming (e.g. a cache hit on the prebuilt assistant) does not
+    replace the time the phase really took.
+    """
+
+    def __init__(self):
+        """Start timing a session"""
+        self.started = time.perf_counter()
+        self.seconds: Dict[str, float] = {}
+
+    def record(self, phase: str, seconds: float) -> None:
+        """
+        Record how long a phase took, unless it was already recorded
+
+        Args:
+            phase: Name of the phase
+            seconds: Duration in seconds
+        """
+        self.seconds.setdefault(phase, seconds)
+
+    @contextmanager
+    def phase(self, phase: str) -> Iterator[None]:
+        """
+        Time the block as a phase
+
+        Args:
+            phase: Name of the phase
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(phase, time.perf_counter() - started)
+
+    def mark_ready(self) -> None:
+        """Record the time from the start of the session to a usable call"""
+        self.record(READY, time.perf_counter() - self.started)
+
+    def to_record(self, transport: str, ok: bool) -> Dict[str, Any]:
+        """
+        Build the stats file record of the session
+
+        Args:
+            transport: Name of the transport running the call
+            ok: Whether the call was started
+
+        Returns:
+            The JSON-serializable record
+        """
+        return {
+            "at": datetime.now().isoformat(timespec="seconds"),
+            "transport": transport,
+            "ok": ok,
+            "seconds": {phase: round(seconds, 6)
+                        for phase, seconds in self.seconds.items()},
+        }
+
+
+def append_session_stats(path: Path, record: Dict[str, Any]) -> bool:
+    """
+    Append a session record to the stats file
+
+    Args:
+        path: Path of the JSON lines stats file
+        record: The session record
+
+    Returns:
+        bool: True if the record was written
+    """
+    line = json.dumps(record, separators=(",", ":")) + "\n"
+    try:
+        with _write_lock, open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+        return True
+    except OSError as e:
+        logger.warning(f"Could not write session stats to {path}: {e}")
+        return False
+
+
+def load_session_stats(path: Path) -> List[Dict[str, Any]]:
+    """
+    Load the session records of the stats file
+
+    Args:
+        path: Path of the JSON lines stats file
+
+    Returns:
+        The records, oldest first; unreadable lines are skipped
+    """
+    if not Path(path).exists():
+        return []
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(record, dict):
+                records.append(record)
+    return records
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """
+    Get a nearest-rank percentile
+
+    Args:
+        values: The values, sorted
+        fraction: The percentile as a fraction (0.95 for p95)
+
+    Returns:
+        The percentile, or None without values
+    """
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, round(fraction * len(values)) - 1))
+    return values[index]
+
+
+def summarize_session_stats(
+        records: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Summarize the phase timings of sessions
+
+    Args:
+        records: Session records of the stats file
+
+    Returns:
+        Dict by phase of the number of sessions measured and the p50 and
+        p95 durations in milliseconds, for the sessions whose call started
+    """
+    summary = {}
+    for phase in PHASES:
+        values = sorted(
+            record["seconds"][phase] * 1000
+            for record in records
+            if record.get("ok") and phase in (record.get("seconds") or {})
+        )
+        summary[phase] = {
+            "count": len(values),
+            "p50_ms": percentile(values, 0.50),
+            "p95_ms": percentile(values, 0.95),
+        }
+    return summary
@@ -27,6 +27,10 @@ setup(
     ],
     python_requires=">=3.7",
     install_requires=requirements,
+    extras_require={
+        # Production ASGI server for --server-mode async
+        "async": ["uvicorn>=0.20"],
+    },
     entry_points={
         "console_scripts": [
             "convolingo=convolingo.__main__:main",